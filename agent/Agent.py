@@ -4,20 +4,29 @@ class Agent:
     每个函数都会有一个state编码当前player视角看到的桌面状态，这个状态是执行完操作之后的
     比如摸牌的response，在调用这个函数之前，摸的手牌已经加入到state中了
     """
+    # 是否需要state，不需要的agent收到的state是None，牌桌可以省去构造view的开销
+    need_view = True
 
     def draw_response(self, state, tile, lingshang=False):
         """
         摸牌之后的response
+        副露之后轮到自己的时候也会调用，这时tile是None，只能切牌
         :lingshang: 指示这张牌是否是岭上牌
         :return: 二元组，第一个指示操作，第二个指示操作对象
+                 ("zimo", None)，("liuju", None)九种九牌，("angang", 牌)，("jiagang", 牌)，
+                 ("lizhi", 打出的牌)，("qiepai", 打出的牌)
         """
         # 自摸? 暗杠? 立直? 流局? 切牌?
         raise NotImplementedError
 
     def discard_response(self, state, tile):
         """
-        有人切牌之后的response
+        有人切牌之后的response，只有能够荣和或者副露的时候才会调用
         :return: 二元组，第一个指示操作，第二个指示操作对象
+                 ("rong", None)，("peng", 手牌中的两张牌)，("minggang", 手牌中的三张牌)，("chi", 手牌中的两张牌)，
+                 ("pass", None)或者None表示不作反应
+                 副露的手牌可以是None，表示使用这种副露的第一个选项，能够进行的副露可以由call_options列举
+                 不能荣和的时候（没有役或者振听）回应"rong"，牌桌会报错
         """
         # 荣? 副露? 不作任何反应?
         raise NotImplementedError
@@ -0,0 +1,17 @@
+class BatchAgent:
+    """
+    批量作出决定的agent，由scheduler.BatchScheduler调用
+    scheduler同时运行很多张牌桌，收集所有牌桌上等待这个agent作出的决定，一次全部交给batch_response
+    适合神经网络之类单次调用开销大、批量调用开销小的agent
+    """
+
+    def batch_response(self, decisions):
+        """
+        批量作出决定
+        :param decisions: table.Decision的列表，可能来自不同的牌桌和座次
+                          decision.kind是"draw"、"discard"或者"meld"，分别对应Agent的三个函数
+                          decision.view()得到这个决定对应的view，不需要的话可以不调用
+                          decision.kind是"discard"的时候，decision.options是能够进行的副露
+        :return: 和decisions一一对应的回应，格式和Agent对应函数的返回值相同
+        """
+        raise NotImplementedError
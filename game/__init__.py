@@ -1,3 +1,4 @@
+from hand import Hand
 from meld import Meld
 from player import Player
 from table import Table, View
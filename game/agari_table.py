@@ -0,0 +1,177 @@
+"""
+数牌和字牌的和牌形查找表
+每一种花色的9种牌(字牌是7种)的数量看作一个5进制数，作为查找表的键
+表中记录能够完全分割成若干面子和至多一个雀头的牌型，值是雀头可能所在位置的掩码，只有面子的牌型值为0
+判断和牌只需要对三种数牌和字牌各查一次表
+
+查找表由本文件生成，保存在agari_table.bin中，第一次使用时加载:
+    python agari_table.py
+"""
+import os
+import struct
+import sys
+from array import array
+from itertools import combinations_with_replacement
+
+table_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "agari_table.bin")
+
+# 万、饼、索、字牌在34种牌编号中的范围
+part_ranges = ((0, 9), (9, 18), (18, 27), (27, 34))
+
+# 第i种牌在键中的权重
+weights = tuple(5 ** i for i in range(9))
+
+suit_table = None  # 数牌的查找表，第一次使用时加载
+character_table = None  # 字牌的查找表，第一次使用时加载
+
+
+def encode(counts, start, end):
+    """
+    将一种花色的牌的数量编码成查找表的键
+    :param counts: 34种牌的数量
+    :param start: 花色的起始编号
+    :param end: 花色的结束编号
+    :return:
+    """
+    key = 0
+    for i in range(end - start):
+        key += counts[start + i] * weights[i]
+    return key
+
+
+def build_table(n_kinds, has_string):
+    """
+    枚举至多四个面子和至多一个雀头的所有组合，生成一种花色的查找表
+    :param n_kinds: 这种花色有几种牌
+    :param has_string: 能否组成顺子
+    :return: 从键到雀头位置掩码的字典
+    """
+    mentsu_list = [(i, i, i) for i in range(n_kinds)]
+    if has_string:
+        mentsu_list += [(i, i + 1, i + 2) for i in range(n_kinds - 2)]
+
+    table = {}
+    for n_mentsu in range(5):
+        for mentsu_group in combinations_with_replacement(mentsu_list, n_mentsu):
+            counts = [0] * n_kinds
+            for mentsu in mentsu_group:
+                for i in mentsu:
+                    counts[i] += 1
+            if max(counts, default=0) > 4:
+                continue
+            key = encode(counts, 0, n_kinds)
+            table.setdefault(key, 0)
+            for pair in range(n_kinds):
+                if counts[pair] <= 2:
+                    pair_key = key + 2 * weights[pair]
+                    table[pair_key] = table.get(pair_key, 0) | 1 << pair
+    return table
+
+
+def save_tables(path=table_path):
+    """
+    生成查找表并保存
+    文件格式: 数牌和字牌的表项数目(两个uint32)，然后依次是数牌的键(uint32)、值(uint16)，字牌的键、值，全部小端序
+    """
+    data = b""
+    tables = (build_table(9, True), build_table(7, False))
+    data += struct.pack("<II", *map(len, tables))
+    for table in tables:
+        keys = array('I', sorted(table))
+        values = array('H', (table[key] for key in keys))
+        if sys.byteorder == "big":
+            keys.byteswap()
+            values.byteswap()
+        data += keys.tobytes() + values.tobytes()
+    with open(path, "wb") as f:
+        f.write(data)
+    return tables
+
+
+def load_tables(path=table_path):
+    """
+    加载查找表，只在第一次使用的时候调用
+    """
+    global suit_table, character_table
+    with open(path, "rb") as f:
+        data = f.read()
+    n_suit, n_character = struct.unpack_from("<II", data)
+    offset = 8
+    tables = []
+    for n in (n_suit, n_character):
+        keys = array('I', data[offset:offset + 4 * n])
+        offset += 4 * n
+        values = array('H', data[offset:offset + 2 * n])
+        offset += 2 * n
+        if sys.byteorder == "big":
+            keys.byteswap()
+            values.byteswap()
+        tables.append(dict(zip(keys, values)))
+    suit_table, character_table = tables
+
+
+def get_tables():
+    """
+    返回数牌和字牌的查找表，如果还没有加载则先加载
+    """
+    if suit_table is None:
+        load_tables()
+    return suit_table, character_table
+
+
+def is_agari(counts):
+    """
+    判断34种牌的数量是否满足普通牌型，四次查表
+    :param counts: 34种牌的数量，不包括副露
+    :return:
+    """
+    suit, character = get_tables()
+    n_pair = 0
+    for start, end in part_ranges:
+        table = character if start == 27 else suit
+        pair_mask = table.get(encode(counts, start, end))
+        if pair_mask is None:
+            return False
+        if pair_mask:
+            n_pair += 1
+    return n_pair == 1
+
+
+def agari_wait_indices(counts):
+    """
+    计算普通牌型的听牌
+    只有加入的牌所在的花色需要重新查表，其他花色的查表结果可以复用
+    :param counts: 34种牌的数量，不包括副露
+    :return: 听牌的编号列表
+    """
+    suit, character = get_tables()
+    keys = []
+    pair_masks = []
+    for start, end in part_ranges:
+        table = character if start == 27 else suit
+        key = encode(counts, start, end)
+        keys.append(key)
+        pair_masks.append(table.get(key))
+
+    result = []
+    for part, (start, end) in enumerate(part_ranges):
+        # 其他花色必须全部能够分割，并且加上这一种花色之后恰好有一个雀头
+        others = [mask for i, mask in enumerate(pair_masks) if i != part]
+        if None in others:
+            continue
+        n_pair = sum(1 for mask in others if mask)
+        if n_pair > 1:
+            continue
+        table = character if start == 27 else suit
+        for i in range(end - start):
+            if counts[start + i] == 4:
+                continue
+            pair_mask = table.get(keys[part] + weights[i])
+            if pair_mask is not None and n_pair + (1 if pair_mask else 0) == 1:
+                result.append(start + i)
+    return result
+
+
+if __name__ == "__main__":
+    suit, character = save_tables()
+    print(f"{len(suit)} suit patterns, {len(character)} character patterns, saved to {table_path}")
@@ -0,0 +1,91 @@
+"""
+列举一家能够进行的副露：别家切牌之后的吃、碰、大明杠，以及自己摸牌之后的暗杠和加杠
+选项的格式和Agent对应函数的返回值相同，agent可以直接把其中一个选项作为回应
+红宝牌和普通的5组成的不同组合是不同的选项
+"""
+from hand import Hand
+from tile import Tile, peng, no_tile, next_index, prev_index
+
+# chi_neighbors[牌种编号]是能够和这种牌组成顺子的另外两种牌的编号，字牌为空
+chi_neighbors = tuple(
+    tuple((low, high) for low, high in ((prev_index[prev_index[index]], prev_index[index]),
+                                        (prev_index[index], next_index[index]),
+                                        (next_index[index], next_index[next_index[index]]))
+          if low != no_tile and high != no_tile)
+    for index in range(34)
+)
+
+# 有红宝牌的三种5的编号，以及对应的花色
+red_five_categories = {4: 0, 13: 1, 22: 2}
+
+
+def tile_variants(hand: Hand, index, n):
+    """
+    从手牌中取出n张编号为index的牌的不同方式，只在是否包括红宝牌上有区别
+    :return: 牌的元组的列表，包括红宝牌的排在前面
+    """
+    count = hand[index]
+    if count < n:
+        return []
+    normal = Tile.from_index(index)
+    category = red_five_categories.get(index)
+    if category is None or not hand.red_mask >> category & 1:
+        return [(normal,) * n]
+    variants = [(Tile.from_index(index, 1),) + (normal,) * (n - 1)]
+    if count > n:
+        variants.append((normal,) * n)
+    return variants
+
+
+def discard_call_options(hand: Hand, tile, from_left=False, can_kan=True):
+    """
+    别家切出tile之后能够进行的吃、碰、大明杠
+    :param hand: 自己的手牌
+    :param from_left: tile是否是上家打出的，只有上家的牌可以吃
+    :param can_kan: 是否还能开杠
+    :return: [("chi", 两张手牌), ("peng", 两张手牌), ("minggang", 三张手牌)]
+    """
+    index = tile.index
+    options = []
+    if from_left:
+        for low, high in chi_neighbors[index]:
+            if hand[low] and hand[high]:
+                for low_tile, in tile_variants(hand, low, 1):
+                    for high_tile, in tile_variants(hand, high, 1):
+                        options.append(("chi", (low_tile, high_tile)))
+    for tiles in tile_variants(hand, index, 2):
+        options.append(("peng", tiles))
+    if can_kan:
+        for tiles in tile_variants(hand, index, 3):
+            options.append(("minggang", tiles))
+    return options
+
+
+def draw_call_options(hand: Hand, melds, can_kan=True):
+    """
+    摸牌之后能够进行的暗杠和加杠，不检查立直之后的限制
+    :param melds: 自己的副露
+    :return: [("angang", 牌), ("jiagang", 牌)]
+    """
+    if not can_kan:
+        return []
+    options = [("angang", Tile.from_index(index)) for index in range(34) if hand[index] == 4]
+    for meld in melds:
+        index = meld.tiles[0].index
+        if meld.meld_type == peng and hand[index]:
+            options.append(("jiagang", tile_variants(hand, index, 1)[0][0]))
+    return options
+
+
+def find_call_option(options, operation, tiles=None):
+    """
+    在选项中找到agent的回应对应的选项，比较的时候区分红宝牌
+    :param tiles: agent给出的手牌，None表示取这种操作的第一个选项
+    :return: 对应的选项，没有则返回None
+    """
+    key = None if tiles is None else sorted((tile.index, tile.red) for tile in tiles)
+    for option in options:
+        if option[0] == operation and \
+                (key is None or sorted((tile.index, tile.red) for tile in option[1]) == key):
+            return option
+    return None
@@ -0,0 +1,140 @@
+"""
+把View编码成固定形状的numpy张量，供神经网络agent使用
+张量的形状是(n_channels, 34)，每个通道是34种牌上的一个平面，标量特征广播到整个通道
+座位相关的通道都按照相对座次排列，第0家是自己，第1家是下家，依次类推
+
+    buffer = np.zeros((256,) + feature_shape, dtype=np.float32)
+    encode_views(views, out=buffer[:len(views)])
+
+传入out可以复用预先分配的缓冲区，避免每次决策都分配新的数组
+"""
+import numpy as np
+
+from tile import dora_index
+from yaku import field_wind_names
+
+hand_channel = 0  # 0-3：手牌的计数，第k个通道表示这种牌至少有k+1张
+red_channel = 4  # 手牌中的红宝牌
+action_tile_channel = 5  # 当前动作的牌
+dora_indicator_channel = 6  # 宝牌指示牌
+dora_channel = 7  # 宝牌
+seat_channel = 8  # 8-27：每一家占seat_stride个通道，按照相对座次排列
+seat_stride = 5
+discard_offset = 0  # 牌河中每种牌的数目
+tsumogiri_offset = 1  # 牌河中摸切的牌
+richi_tile_offset = 2  # 立直宣言牌
+meld_offset = 3  # 副露中每种牌的数目
+richi_offset = 4  # 是否立直，广播
+field_wind_channel = 28  # 场风牌
+seat_wind_channel = 29  # 自风牌
+n_pon_channel = 30  # 本场数，广播
+n_richi_bar_channel = 31  # 场上的立直棒数目，广播
+point_channel = 32  # 32-35：按照相对座次的点棒，以1000点为单位，广播
+n_wall_tiles_channel = 36  # 牌山剩余的牌数，广播
+n_channels = 37
+feature_shape = (n_channels, 34)
+
+# 广播到整个通道的标量特征所在的通道，顺序和view_scalars的返回值相同
+scalar_channels = [seat_channel + seat_stride * seat + richi_offset for seat in range(4)] + \
+                  [n_pon_channel, n_richi_bar_channel] + [point_channel + seat for seat in range(4)] + \
+                  [n_wall_tiles_channel]
+
+
+def view_positions(view, base=0):
+    """
+    计数类特征在展平的张量中的位置，同一个位置出现几次就加几
+    :param base: 这个view的张量在展平的缓冲区中的起点
+    :return: 位置的列表
+    """
+    positions = []
+    append = positions.append
+
+    seen = [0] * 34
+    for tile in view.hand_tiles:
+        index = tile.index
+        append(base + (hand_channel + seen[index]) * 34 + index)
+        seen[index] += 1
+        if tile.red:
+            append(base + red_channel * 34 + index)
+    if view.action_tile is not None:
+        append(base + action_tile_channel * 34 + view.action_tile.index)
+    for indicator in view.dora_indicator:
+        append(base + dora_indicator_channel * 34 + indicator.index)
+        append(base + dora_channel * 34 + dora_index[indicator.index])
+
+    tsumogiri_flags = view.all_player_tsumogiri_flags
+    richi_discard_index = view.richi_discard_index
+    for seat in range(4):
+        player_id = (view.player_id + seat) % 4
+        seat_base = base + (seat_channel + seat_stride * seat) * 34
+        discard_tiles = view.all_player_discard_tiles[player_id]
+        for tile in discard_tiles:
+            append(seat_base + discard_offset * 34 + tile.index)
+        if tsumogiri_flags is not None:
+            for tile, tsumogiri in zip(discard_tiles, tsumogiri_flags[player_id]):
+                if tsumogiri:
+                    append(seat_base + tsumogiri_offset * 34 + tile.index)
+        if richi_discard_index is not None and richi_discard_index[player_id] is not None:
+            append(seat_base + richi_tile_offset * 34 + discard_tiles[richi_discard_index[player_id]].index)
+        for meld in view.all_player_melds[player_id]:
+            for tile in meld.tiles:
+                append(seat_base + meld_offset * 34 + tile.index)
+
+    append(base + field_wind_channel * 34 + 27 + field_wind_names[view.field_wind])
+    append(base + seat_wind_channel * 34 + 27 + (view.player_id - view.banker) % 4)
+    return positions
+
+
+def view_scalars(view):
+    """
+    广播到整个通道的标量特征，和scalar_channels一一对应
+    """
+    player_id = view.player_id
+    points = view.all_player_point_bar
+    return [float(view.richi_flag[(player_id + seat) % 4]) for seat in range(4)] + \
+           [view.n_pon, view.n_richi_bar] + [points[(player_id + seat) % 4] / 1000 for seat in range(4)] + \
+           [view.n_wall_tiles]
+
+
+def check_buffer(out, shape):
+    """
+    检查预先分配的缓冲区，没有传入则分配一个新的
+    """
+    if out is None:
+        return np.empty(shape, dtype=np.float32)
+    if out.shape != shape or out.dtype != np.float32 or not out.flags.c_contiguous:
+        raise ValueError(f"缓冲区应该是形状为{shape}的连续float32数组")
+    return out
+
+
+def encode_view(view, out=None):
+    """
+    把一个view编码成形状为feature_shape的张量
+    :param out: 预先分配的缓冲区，会被覆盖
+    :return: float32的numpy数组
+    """
+    out = check_buffer(out, feature_shape)
+    out.fill(0)
+    # 直接在缓冲区上累加，加上的值和缓冲区同为float32才能走numpy的快速路径
+    np.add.at(out.reshape(-1), np.array(view_positions(view), dtype=np.intp), np.float32(1))
+    out[scalar_channels] = np.array(view_scalars(view), dtype=np.float32)[:, None]
+    return out
+
+
+def encode_views(views, out=None):
+    """
+    把多个view一起编码，所有的计数特征一次散布到缓冲区中
+    :param out: 预先分配的形状为(len(views),) + feature_shape的缓冲区，会被覆盖
+    :return: float32的numpy数组
+    """
+    out = check_buffer(out, (len(views),) + feature_shape)
+    size = n_channels * 34
+    positions = []
+    for i, view in enumerate(views):
+        positions.extend(view_positions(view, i * size))
+    out.fill(0)
+    np.add.at(out.reshape(-1), np.array(positions, dtype=np.intp), np.float32(1))
+    if views:
+        scalars = np.array([view_scalars(view) for view in views], dtype=np.float32)
+        out[:, scalar_channels] = scalars[:, :, None]
+    return out
@@ -0,0 +1,306 @@
+"""
+紧凑的二进制牌谱
+牌桌在对局的过程中把事件逐条写入GameLogWriter，写满缓冲区之后追加到文件，不需要在内存中保存整场对局
+GameLogReader用mmap打开牌谱文件，逐条遍历事件的头部，只有需要的时候才解码事件的附加数据
+
+    with GameLogWriter("games.bin") as log:
+        table.log = log
+        for i in range(1000):
+            table.play_game(agents, seed=i)
+
+    reader = GameLogReader("games.bin")
+    for position, kind, seat, tile, arg in reader:
+        if kind == discard_event:
+            ...
+
+文件以magic开头，之后是连续的事件。每个事件有4个字节的头部(种类, 座次, 牌, 参数)，后面跟着附加数据
+牌用0~135的物理牌编号表示，不适用的座次和牌记为none
+    事件              座次          牌              参数                附加数据
+    game_start_event  东风战0半庄战1  none           0                   4字节，每个座次上agent的位置
+    round_start_event 庄家          场数            场风                本场数、立直棒数各1字节，4个int32点棒，136字节牌山
+    draw_event        摸牌的玩家     摸的牌           是否是岭上牌          无
+    discard_event     切牌的玩家     切的牌           1摸切，2立直宣言牌    无
+    riichi_event      立直成立的玩家  none           是否两立直            无
+    call_event        副露的玩家     鸣的牌           副露的种类            吃、碰2字节，大明杠3字节，手牌中用来副露的牌
+    kan_event         开杠的玩家     杠的牌           暗杠或者加杠          无
+    dora_event        none          新的宝牌指示牌    0                   无
+    round_end_event   和牌的玩家     放铳的玩家(座次)  附加数据的长度         结果的种类、听牌的二进制位各1字节，4个varint点数变化
+    game_end_event    none          none           附加数据的长度         4个varint最终点棒
+varint是zigzag编码之后的LEB128，点数变化通常只需要2到3个字节
+"""
+import mmap
+import struct
+
+from tile import minggang
+
+magic = b"RLOG\x01"
+none = 0xFF
+
+game_start_event = 0
+round_start_event = 1
+draw_event = 2
+discard_event = 3
+riichi_event = 4
+call_event = 5
+kan_event = 6
+dora_event = 7
+round_end_event = 8
+game_end_event = 9
+
+tsumogiri_bit = 1
+lizhi_bit = 2
+
+wind_names = ("east", "south", "west", "north")
+# 一局结果的编码，和牌与荒牌流局是RoundResult的kind，途中流局是reason
+result_names = ("zimo", "rong", "huangpai", "jiuzhongjiupai", "sifenglianda", "sijializhi", "sigangsanle")
+
+round_start_struct = struct.Struct("<BB4i")
+round_start_size = round_start_struct.size + 136
+
+# 附加数据的固定长度，None表示长度记在参数中
+payload_sizes = {
+    game_start_event: 4,
+    round_start_event: round_start_size,
+    draw_event: 0,
+    discard_event: 0,
+    riichi_event: 0,
+    call_event: None,
+    kan_event: 0,
+    dora_event: 0,
+    round_end_event: None,
+    game_end_event: None,
+}
+
+
+def call_payload_size(meld_type):
+    """
+    副露事件的附加数据长度，大明杠3张手牌，吃和碰2张
+    """
+    return 3 if meld_type == minggang else 2
+
+
+def write_varint(buffer, value):
+    """
+    把有符号整数以zigzag编码的varint追加到buffer
+    """
+    value = value * 2 if value >= 0 else -value * 2 - 1
+    while value >= 0x80:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data, position):
+    """
+    从data的position读取一个varint
+    :return: (值, 下一个位置)
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+    return (value >> 1) if not value & 1 else -(value >> 1) - 1, position
+
+
+class GameLogWriter:
+    """
+    流式写入牌谱，事件先写入缓冲区，超过buffer_size之后追加到文件
+    牌桌的log属性设置成GameLogWriter之后，对局中的每个事件都会被记录
+    """
+
+    def __init__(self, file, buffer_size=1 << 16):
+        """
+        :param file: 文件路径，或者以二进制写入模式打开的文件对象
+        :param buffer_size: 缓冲区的大小
+        """
+        self.owns_file = isinstance(file, str)
+        self.file = open(file, "wb") if self.owns_file else file
+        self.buffer = bytearray(magic)
+        self.buffer_size = buffer_size
+
+    def event(self, kind, seat=none, tile=none, arg=0, payload=b""):
+        """
+        写入一个事件的头部和附加数据
+        """
+        buffer = self.buffer
+        buffer.extend((kind, seat, tile, arg))
+        if payload:
+            buffer.extend(payload)
+        if len(buffer) >= self.buffer_size:
+            self.flush()
+
+    def game_start(self, east_or_south, seat_slots):
+        self.event(game_start_event, wind_names.index(east_or_south), none, 0, bytes(seat_slots))
+
+    def round_start(self, table):
+        """
+        一局开始，记录场况和这一局的牌山，从这个事件开始可以独立地重现这一局
+        """
+        payload = round_start_struct.pack(table.n_pon, table.n_richi_bar,
+                                          *(player.point_bar for player in table.players)) + bytes(table.wall.ids)
+        self.event(round_start_event, table.banker, table.field_number, wind_names.index(table.field_wind), payload)
+
+    def draw(self, player_id, tile, lingshang=False):
+        self.event(draw_event, player_id, tile.id, int(lingshang))
+
+    def discard(self, player_id, tile, tsumogiri=False, lizhi=False):
+        self.event(discard_event, player_id, tile.id, tsumogiri * tsumogiri_bit | lizhi * lizhi_bit)
+
+    def riichi(self, player_id, lianglizhi=False):
+        self.event(riichi_event, player_id, none, int(lianglizhi))
+
+    def call(self, player_id, meld_type, tile, hand_tiles):
+        self.event(call_event, player_id, tile.id, meld_type, bytes(t.id for t in hand_tiles))
+
+    def kan(self, player_id, meld_type, tile):
+        self.event(kan_event, player_id, tile.id, meld_type)
+
+    def dora(self, tile):
+        self.event(dora_event, none, tile.id)
+
+    def round_end(self, result):
+        """
+        一局结束，记录结果的种类和四家的点数变化
+        """
+        code = result_names.index(result.reason if result.kind == "liuju" else result.kind)
+        tenpai = sum(1 << player_id for player_id, flag in enumerate(result.tenpai or ()) if flag)
+        payload = bytearray((code, tenpai))
+        for delta in result.deltas:
+            write_varint(payload, delta)
+        self.event(round_end_event, none if result.winner is None else result.winner,
+                   none if result.loser is None else result.loser, len(payload), payload)
+
+    def game_end(self, points):
+        payload = bytearray()
+        for point in points:
+            write_varint(payload, point)
+        self.event(game_end_event, none, none, len(payload), payload)
+
+    def flush(self):
+        """
+        把缓冲区写入文件
+        """
+        self.file.write(self.buffer)
+        self.buffer.clear()
+
+    def close(self):
+        self.flush()
+        if self.owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class GameLogReader:
+    """
+    用mmap读取牌谱，不需要把整个文件读入内存
+    遍历的时候只解析4个字节的头部，产生整数的元组，附加数据通过事件的位置按需解码，牌山直接返回mmap上的memoryview
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data[:len(magic)] != magic:
+            raise ValueError(f"{path}不是牌谱文件")
+
+    def __iter__(self):
+        """
+        依次产生每个事件的(位置, 种类, 座次, 牌, 参数)，位置是事件头部在文件中的偏移
+        """
+        return self.events(len(magic))
+
+    def events(self, position, end=None):
+        """
+        从position开始依次产生事件，到end或者文件末尾为止
+        """
+        data = self.data
+        end = len(data) if end is None else end
+        sizes = payload_sizes
+        while position < end:
+            kind, seat, tile, arg = data[position:position + 4]
+            yield position, kind, seat, tile, arg
+            size = sizes[kind]
+            if size is None:
+                size = call_payload_size(arg) if kind == call_event else arg
+            position += 4 + size
+
+    def games(self):
+        """
+        每一场对局的game_start_event的位置
+        """
+        return [position for position, kind, _, _, _ in self if kind == game_start_event]
+
+    def game_start(self, position):
+        """
+        :return: (东风战或者半庄战, 每个座次上agent的位置)
+        """
+        data = self.data
+        return wind_names[data[position + 1]], list(data[position + 4:position + 8])
+
+    def round_start(self, position):
+        """
+        :return: (庄家, 场数, 场风, 本场数, 立直棒数, 四家的点棒)
+        """
+        data = self.data
+        n_pon, n_richi_bar, *points = round_start_struct.unpack_from(data, position + 4)
+        return data[position + 1], data[position + 2], wind_names[data[position + 3]], n_pon, n_richi_bar, points
+
+    def wall(self, position):
+        """
+        round_start_event记录的牌山，136张牌的物理编号
+        """
+        start = position + 4 + round_start_struct.size
+        return memoryview(self.data)[start:start + 136]
+
+    def call_tiles(self, position):
+        """
+        call_event中手牌里用来副露的牌的物理编号
+        """
+        return list(self.data[position + 4:position + 4 + call_payload_size(self.data[position + 3])])
+
+    def round_end(self, position):
+        """
+        :return: (结果, 和牌的玩家, 放铳的玩家, 四家的点数变化, 每家是否听牌)，和牌的玩家和放铳的玩家可能是None
+        """
+        data = self.data
+        winner, loser = data[position + 1], data[position + 2]
+        code, tenpai = data[position + 4], data[position + 5]
+        deltas = []
+        offset = position + 6
+        for _ in range(4):
+            delta, offset = read_varint(data, offset)
+            deltas.append(delta)
+        return (result_names[code], None if winner == none else winner, None if loser == none else loser, deltas,
+                [bool(tenpai >> player_id & 1) for player_id in range(4)])
+
+    def game_end(self, position):
+        """
+        :return: 四家的最终点棒
+        """
+        points = []
+        offset = position + 4
+        for _ in range(4):
+            point, offset = read_varint(self.data, offset)
+            points.append(point)
+        return points
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
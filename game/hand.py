@@ -0,0 +1,106 @@
+from array import array
+from typing import List, Union
+
+from tile import Tile
+
+
+class Hand:
+    """
+    使用34种牌的数量表示的手牌，counts[i]是牌种编号为i的牌的数量
+    红宝牌和普通牌一起计数，另外用red_mask记录持有哪几张红宝牌(万饼索分别对应第0、1、2位)
+    复制的时候共享同一个counts，直到其中一方被修改才真正复制
+    """
+
+    def __init__(self, tiles=()):
+        self.counts = array('b', bytes(34))
+        self.n_tiles = 0
+        self.red_mask = 0
+        self.shared = False  # counts是否和其他Hand共享
+        for tile in tiles:
+            self.add(tile)
+
+    def copy(self):
+        """
+        写时复制，新的Hand和原来的Hand共享counts
+        :return:
+        """
+        hand = Hand.__new__(Hand)
+        hand.counts = self.counts
+        hand.n_tiles = self.n_tiles
+        hand.red_mask = self.red_mask
+        hand.shared = self.shared = True
+        return hand
+
+    def __detach(self):
+        if self.shared:
+            self.counts = array('b', self.counts)
+            self.shared = False
+
+    def add(self, tile: Tile):
+        """
+        加入一张牌
+        """
+        if self.counts[tile.index] >= 4:
+            raise ValueError("同一种牌不能超过四张")
+        self.__detach()
+        self.counts[tile.index] += 1
+        self.n_tiles += 1
+        if tile.red:
+            self.red_mask |= 1 << tile.category
+
+    def remove(self, tile: Tile):
+        """
+        去掉一张牌，如果去掉的是红宝牌或者最后一张5，同时清除红宝牌标记
+        """
+        if self.counts[tile.index] == 0:
+            raise ValueError("手牌中没有这张牌")
+        self.__detach()
+        self.counts[tile.index] -= 1
+        self.n_tiles -= 1
+        if tile.red or (self.counts[tile.index] == 0 and tile.value == 5 and tile.is_number()):
+            self.red_mask &= ~(1 << tile.category)
+
+    def key(self):
+        """
+        不可变的打包表示，可以用作字典的键
+        """
+        return bytes(self.counts)
+
+    def tiles(self):
+        """
+        还原成牌的列表，按照牌种排序
+        """
+        result = []
+        for index, n in enumerate(self.counts):
+            if n:
+                tile = Tile.from_index(index)
+                if tile.value == 5 and tile.is_number() and self.red_mask >> tile.category & 1:
+                    result.append(Tile.from_index(index, 1))
+                    n -= 1
+                result.extend([tile] * n)
+        return result
+
+    def __len__(self):
+        return self.n_tiles
+
+    def __getitem__(self, index):
+        return self.counts[index]
+
+    def __contains__(self, tile: Tile):
+        return self.counts[tile.index] > 0
+
+    def __eq__(self, other):
+        return self.counts == other.counts
+
+    def __repr__(self):
+        return repr(self.tiles())
+
+
+def to_hand(tiles: Union[Hand, List[Tile]]):
+    """
+    将牌的列表转换成Hand，如果已经是Hand则直接返回
+    :return:
+    """
+    if isinstance(tiles, Hand):
+        return tiles
+    return Hand(tiles)
@@ -0,0 +1,92 @@
+from collections import OrderedDict, namedtuple
+from functools import wraps
+from threading import Lock
+
+from hand import to_hand
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class LRUCache:
+    """
+    线程安全的有界LRU缓存，记录命中和未命中的次数
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """
+        查找缓存，命中的时候把这一项移到最近使用的位置
+        """
+        with self.lock:
+            try:
+                value = self.data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self.data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        加入缓存，超过容量的时候淘汰最久没有使用的项
+        """
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def resize(self, maxsize):
+        """
+        修改容量，如果变小则立即淘汰多余的项
+        """
+        with self.lock:
+            self.maxsize = maxsize
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def clear(self):
+        """
+        清空缓存以及计数
+        """
+        with self.lock:
+            self.data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        with self.lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self.data))
+
+
+def hand_cached(maxsize=4096):
+    """
+    以手牌的打包表示为键缓存函数的结果，被装饰的函数只接收一个Hand
+    装饰之后的函数可以接收牌的列表或者Hand，缓存可以通过函数的cache属性访问
+    缓存的结果在调用者之间共享，不能修改，所以被装饰的函数应该返回不可变的对象
+    """
+
+    def decorator(func):
+        cache = LRUCache(maxsize)
+
+        @wraps(func)
+        def wrapper(tiles):
+            hand = to_hand(tiles)
+            key = hand.key()
+            result = cache.get(key)
+            if result is None:
+                result = func(hand)
+                cache.put(key, result)
+            return result
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
@@ -1,10 +1,12 @@
-from tile import chi, peng, minggang, angang, jiagang
+from tile import chi, peng, minggang, angang, jiagang, next_index
 
 
 class Meld:
     """
     副露的实现
+    tiles是牌的元组，index是其中最小的牌种编号
     """
+    __slots__ = ("tiles", "index", "meld_type", "offer_flag", "offer_player")
 
     def __init__(self, tiles, meld_type, offer_flag, offer_player):
         """
@@ -23,7 +25,7 @@ class Meld:
             if len(tiles) != 3:
                 raise ValueError("吃生成的副露不是三张")
             tile1, tile2, tile3 = tiles
-            if not (tile1 + 1 == tile2 and tile2 + 1 == tile3):
+            if not (next_index[tile1.index] == tile2.index and next_index[tile2.index] == tile3.index):
                 raise ValueError("吃的牌无法组成顺子")
 
         if meld_type == peng:
@@ -34,15 +36,16 @@ class Meld:
                 raise ValueError("碰的牌不相同")
 
         if meld_type in (minggang, angang):
-            if len(tiles) != 3:
-                raise ValueError("杠生成的副露不是三张")
+            if len(tiles) != 4:
+                raise ValueError("杠生成的副露不是四张")
             if not all(x == tiles[0] for x in tiles):
                 raise ValueError("杠的牌不相同")
 
         if meld_type == jiagang:
             raise ValueError("不能直接生成加杠!")
 
-        self.tiles = tiles[:]
+        self.tiles = tuple(tiles)
+        self.index = min(tile.index for tile in tiles)
         self.meld_type = meld_type
         self.offer_player = offer_player
         self.offer_flag = offer_flag
@@ -55,6 +58,6 @@ class Meld:
             raise ValueError("不是碰不能加杠")
         if tile != self.tiles[0]:
             raise ValueError("加杠的牌种类不对")
-        self.tiles.append(tile)
+        self.tiles += (tile,)
         self.meld_type = jiagang
         # 加杠不会改变offer_flag也不会改变offer_player
@@ -7,6 +7,7 @@ class Player:
     def __init__(self):
         self.hand_tiles = []
         self.discard_tiles = []
+        self.tsumogiri_flags = []  # 牌河中的每张牌是否是摸切
         self.melds = []
         self.self_wind = None  # should in (0, 1, 2, 3)
         self.point_bar = None  # should be integer number
@@ -0,0 +1,187 @@
+"""
+从牌谱重现对局，得到任意一个决定时玩家看到的View，用来从牌谱生成训练样本，不需要重新模拟整场对局
+事件通过Table上和对局时相同的方法应用到增量的状态上，所以重现的View和对局时agent看到的完全相同
+
+    reader = GameLogReader("games.bin")
+    for position in reader.games():
+        replay = GameReplay(reader, position)
+        for index, player_id in replay.decisions():
+            features = encode_view(replay.view(index, player_id))
+
+每一局开始的事件记录了场况和牌山，从这里开始就可以重现这一局，此外每隔checkpoint_interval个事件保存一次快照，
+所以跳到对局中间的任意一个事件只需要应用很少的事件
+见逃荣和导致的振听没有记录在牌谱中，所以重现的牌桌上的振听状态不一定准确，不过View中不包括振听
+"""
+import copy
+
+from game_log import GameLogReader, game_start_event, round_start_event, draw_event, discard_event, riichi_event, \
+    call_event, kan_event, dora_event, round_end_event, game_end_event, tsumogiri_bit, lizhi_bit
+from player import Player
+from table import Table, RoundResult
+from tile import Tile, mo, qie, minggang
+
+# 快照中保存的牌桌的状态
+state_fields = ("players", "wall", "east_or_south", "field_wind", "field_number", "n_pon", "banker", "n_richi_bar",
+                "discard_tiles", "richi_flag", "yifa_flag", "lianglizhi_flag", "richi_discard_index", "called_flag",
+                "kan_action", "round_result", "hands", "closed_flag", "n_kan", "discard_counts", "visible_counts",
+                "waits", "discard_furiten_flag", "furiten_flag", "ron_index", "ron_kinds", "seat_slots")
+
+
+class GameReplay:
+    """
+    一场对局的重现
+    事件按照在这场对局中的顺序编号，第0个是game_start_event
+    """
+
+    def __init__(self, reader: GameLogReader, position, checkpoint_interval=32):
+        """
+        :param reader: 牌谱
+        :param position: 这场对局的game_start_event的位置，见GameLogReader.games
+        :param checkpoint_interval: 每隔多少个事件保存一次快照
+        """
+        self.reader = reader
+        self.events = []
+        for event in reader.events(position):
+            self.events.append(event)
+            if event[1] == game_end_event:
+                break
+        if not self.events or self.events[0][1] != game_start_event:
+            raise ValueError(f"位置{position}不是一场对局的开始")
+        self.round_starts = [index for index, event in enumerate(self.events) if event[1] == round_start_event]
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoints = {}  # 事件编号 -> 应用完这个事件之后的快照
+
+        self.table = Table()
+        self.current = -1  # 最后应用的事件的编号
+        self.last_discarder = None  # 最近一次切牌的玩家，副露的牌来自这一家
+
+    def __len__(self):
+        return len(self.events)
+
+    def seek(self, index):
+        """
+        把牌桌的状态变成应用完第index个事件之后的状态
+        从当前状态、最近的快照和最近的一局开始之中选择需要应用的事件最少的一个开始
+        """
+        if not 0 <= index < len(self.events):
+            raise IndexError(f"没有第{index}个事件")
+        checkpoint = max((key for key in self.checkpoints if key <= index), default=-1)
+        round_start = max((start for start in self.round_starts if start <= index), default=0)
+        if not round_start <= self.current <= index or self.current < checkpoint:
+            if checkpoint >= round_start:
+                self.restore(self.checkpoints[checkpoint])
+                self.current = checkpoint
+            else:
+                # 一局开始的事件包括了这一局需要的所有状态，只需要再应用对局开始的事件
+                self.apply(0)
+                self.current = round_start - 1
+        while self.current < index:
+            self.current += 1
+            self.apply(self.current)
+            if self.current % self.checkpoint_interval == 0 and self.current not in self.checkpoints and \
+                    self.current not in self.round_starts:
+                self.checkpoints[self.current] = self.snapshot()
+
+    def apply(self, index):
+        """
+        应用第index个事件
+        """
+        table = self.table
+        reader = self.reader
+        position, kind, seat, tile_id, arg = self.events[index]
+        if kind == draw_event:
+            tile = table.wall.draw_lingshang() if arg else table.wall.draw()
+            if tile.id != tile_id:
+                raise ValueError(f"第{index}个事件摸的牌和牌山不一致")
+            table.add_hand_tile(seat, tile)
+        elif kind == discard_event:
+            table.discard_tile(seat, Tile.from_id(tile_id), bool(arg & lizhi_bit), bool(arg & tsumogiri_bit))
+            self.last_discarder = seat
+        elif kind == riichi_event:
+            table.accept_lizhi(seat)
+        elif kind == call_event:
+            hand_tiles = [Tile.from_id(hand_id) for hand_id in reader.call_tiles(position)]
+            table.form_call(seat, self.last_discarder, arg, Tile.from_id(tile_id), hand_tiles)
+        elif kind == kan_event:
+            table.form_gang(seat, arg, Tile.from_id(tile_id))
+        elif kind == dora_event:
+            previous = self.events[index - 1]
+            if previous[1] == kan_event:
+                table.complete_gang(previous[4])
+            else:
+                table.open_new_dora_indicator()
+        elif kind == round_start_event:
+            banker, field_number, field_wind, n_pon, n_richi_bar, points = reader.round_start(position)
+            table.banker = banker
+            table.field_number = field_number
+            table.field_wind = field_wind
+            table.n_pon = n_pon
+            table.n_richi_bar = n_richi_bar
+            for player, point in zip(table.players, points):
+                player.point_bar = point
+            table.start_round(reader.wall(position))
+        elif kind == round_end_event:
+            name, winner, loser, deltas, tenpai = reader.round_end(position)
+            for player, delta in zip(table.players, deltas):
+                player.point_bar += delta
+            if name in ("zimo", "rong"):
+                table.n_richi_bar = 0
+                table.richi_flag[:] = [False] * 4
+                table.round_result = RoundResult(name, winner=winner, loser=loser, deltas=deltas)
+            elif name == "huangpai":
+                table.collect_richi_bar()
+                table.round_result = RoundResult(name, deltas=deltas, tenpai=tenpai)
+            else:
+                table.collect_richi_bar()
+                table.round_result = RoundResult("liuju", reason=name, deltas=deltas)
+        elif kind == game_start_event:
+            table.east_or_south, table.seat_slots = reader.game_start(position)
+            table.players = [Player() for _ in range(4)]
+
+    def view(self, index, player_id=None):
+        """
+        第index个事件之后需要作出决定的玩家看到的View，和对局时agent收到的View相同
+        View是牌桌状态的只读代理，重现其他事件之后内容会跟着变化，需要保存的话应该自己复制或者立即编码
+        :param player_id: 作出决定的玩家，摸牌和副露之后是事件的玩家，可以不传入，切牌和开杠之后是其他三家之一
+        """
+        position, kind, seat, tile_id, arg = self.events[index]
+        if kind == draw_event:
+            self.seek(index)
+            action = self.table.kan_action if arg else mo
+            return self.table.player_view(seat, seat, action, Tile.from_id(tile_id))
+        if kind == call_event and arg != minggang:
+            self.seek(index)
+            return self.table.player_view(seat, seat, arg, None)
+        if kind in (discard_event, kan_event):
+            if player_id is None or player_id == seat:
+                raise ValueError(f"第{index}个事件之后作出决定的是其他三家，需要指定player_id")
+            self.seek(index)
+            return self.table.player_view(player_id, seat, qie if kind == discard_event else arg, Tile.from_id(tile_id))
+        raise ValueError(f"第{index}个事件之后没有需要作出的决定")
+
+    def decisions(self):
+        """
+        依次产生每个决定的(事件编号, 作出决定的玩家)
+        切牌和开杠之后其他三家都可能作出决定，牌谱中没有记录实际询问了哪几家，所以三家都产生
+        """
+        for index, (_, kind, seat, _, arg) in enumerate(self.events):
+            if kind == draw_event or (kind == call_event and arg != minggang):
+                yield index, seat
+            elif kind in (discard_event, kan_event):
+                for offset in (1, 2, 3):
+                    yield index, (seat + offset) % 4
+
+    def snapshot(self):
+        """
+        当前牌桌状态的快照
+        """
+        table = self.table
+        return copy.deepcopy(({name: getattr(table, name) for name in state_fields}, self.last_discarder))
+
+    def restore(self, snapshot):
+        """
+        恢复到快照的状态，快照本身不会被修改，可以重复使用
+        """
+        fields, self.last_discarder = copy.deepcopy(snapshot)
+        for name, value in fields.items():
+            setattr(self.table, name, value)
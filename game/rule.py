@@ -1,8 +1,13 @@
-from copy import deepcopy
-from typing import List, Dict
+from array import array
+from itertools import product
+from typing import List, Union
 
-from game import View
-from game.tile import *
+from agari_table import is_agari, agari_wait_indices, get_tables, part_ranges, weights
+from hand import Hand, to_hand
+from lru_cache import hand_cached
+from shanten import part_summary, suit_cache, character_cache, yaojiu_indices
+from table import View
+from tile import *
 
 yaojiu_list = (
     Tile(man, 1, 0),
@@ -35,15 +40,15 @@ def list2dict(tiles):
     return d
 
 
-def is_normal_form(tiles: List[Tile]):
+def is_normal_form(tiles: Union[Hand, List[Tile]]):
     """
     判断是否满足麻将的普通牌型，四个面子，一个雀头
     副露的牌可以不传到这里面，因为副露直接作为面子即可
     只需要判断剩下的是否要么是面子，要么是刻子
-    :param tiles: 手牌（不包含副露）
+    :param tiles: 手牌（不包含副露），可以是牌的列表或者Hand
     :return: Bool 是否满足普通规则
     """
-    return is_normal_form_helper(list2dict(tiles))
+    return is_agari(to_hand(tiles).counts)
 
 
 def is_seven_pair_form(tiles: List[Tile]):
@@ -60,114 +65,110 @@ def is_seven_pair_form(tiles: List[Tile]):
     return True
 
 
-def normal_form_split(tiles: List[Tile]):
+# 万、饼、索、字牌在34种牌编号中的范围，字牌不能组成顺子
+suit_ranges = ((0, 9), (9, 18), (18, 27))
+character_range = (27, 34)
+
+
+def normal_form_split(tiles: Union[Hand, List[Tile]]):
     """
     枚举所有可能的普通型的分组
-    :param tiles:
-    :return:
+    每一种花色和字牌分别独立分组，最后组合起来
+    :param tiles: 手牌，可以是牌的列表或者Hand
+    :return: 每一种分组是由若干pack组成的元组，pack是牌的元组
     """
-    d = list2dict(tiles)
-    return normal_form_split_helper(d, (), False)
+    for split_form in normal_form_split_indices(to_hand(tiles).counts):
+        yield tuple(tuple(Tile.from_index(index) for index in pack) for pack in split_form)
 
 
-def normal_form_split_helper(tiles: Dict[Tile, int], tile_packs, has_pair=False):
+def normal_form_split_indices(counts):
     """
-    帮助函数
-    :param tiles:
-    :param tile_packs:
-    :param has_pair
+    和normal_form_split相同，但是直接使用34种牌的数量，pack是牌种编号的元组
+    :param counts: 34种牌的数量
     :return:
     """
-    if not tiles:
-        yield tile_packs
-        # 所有的牌都用光了，完全分割完毕
-
-    # 尝试削减雀头:
-    if not has_pair:
-        for tile, n in tiles.items():
-            if n >= 2:
-                new_tiles = deepcopy(tiles)
-                new_tiles[tile] -= 2
-                if new_tiles[tile] == 0:
-                    new_tiles.pop(tile)
-                    for pack in normal_form_split_helper(new_tiles, tile_packs + ((tile, tile),), True):
-                        yield pack
+    counts = array('b', counts)
+    pair_range = find_pair_range(counts)
+    if pair_range is None:
+        return
 
-    # 尝试削减顺子
-    for tile, n in tiles.items():
-        try:
-            tile_1 = tile + 1
-            tile_2 = tile + 2
-            if tile_1 in tiles.keys() and tile_2 in tiles.keys():
-                new_tiles = deepcopy(tiles)
-                for x in [tile, tile_1, tile_2]:
-                    new_tiles[x] -= 1
-                    if new_tiles[x] == 0:
-                        new_tiles.pop(x)
-                for pack in normal_form_split_helper(new_tiles, tile_packs + ((tile, tile_1, tile_2),), has_pair):
-                    yield pack
-        except ValueError:
-            continue
-
-    # 尝试消减刻子
-    for tile, n in tiles.items():
-        if n >= 3:
-            new_tiles = deepcopy(tiles)
-            new_tiles[tile] -= 3
-            if new_tiles[tile] == 0:
-                new_tiles.pop(tile)
-            for pack in normal_form_split_helper(new_tiles, tile_packs + ((tile, tile, tile),), has_pair):
-                yield pack
-
-
-def is_normal_form_helper(tiles: Dict[Tile, int], has_pair=False):
-    """
-    使用字典格式判断，用于削减面子或者雀头
-    由于这个函数是递归的，所以需要拿出来
-    :param has_pair: 在递归过程中是否已经生成过雀头了
-    :param tiles:
-    :return:
+    part_splits = []
+    for start, end in suit_ranges + (character_range,):
+        packs = set()
+        normal_form_split_helper(counts, start, end, (start, end) == pair_range, end == character_range[1], [],
+                                 packs)
+        if not packs:
+            return
+        part_splits.append(packs)
+
+    for parts in product(*part_splits):
+        yield tuple(pack for part in parts for pack in part)
+
+
+def find_pair_range(counts):
     """
-    if len(tiles) == 0:
-        return True
+    根据每一种花色的牌数除以3的余数，找到雀头所在的花色
+    :param counts: 34种牌的数量
+    :return: 雀头所在花色的编号范围，如果不可能组成一个雀头则返回None
+    """
+    pair_range = None
+    for start, end in suit_ranges + (character_range,):
+        remainder = sum(counts[start:end]) % 3
+        if remainder == 1:
+            return None
+        if remainder == 2:
+            if pair_range is not None:
+                return None
+            pair_range = (start, end)
+    return pair_range
+
+
+def normal_form_split_helper(counts, start, end, need_pair, is_character, tile_packs, result):
+    """
+    在counts上原地削减一种花色中的雀头、刻子、顺子，回溯的时候恢复
+    每一步都必须用掉当前最小的那张牌，所以不会遗漏分组
+    :param counts: 34种牌的数量，会被修改，但是返回时会恢复原状
+    :param start: 当前花色中还没有处理的第一张牌的编号
+    :param end: 当前花色的结束编号
+    :param need_pair: 还需要削减出一个雀头
+    :param is_character: 是否是字牌，字牌不能组成顺子
+    :param tile_packs: 已经削减出的pack，作为栈使用
+    :param result: 收集分组结果的集合
+    """
+    while start < end and counts[start] == 0:
+        start += 1
+    if start == end:
+        if not need_pair:
+            result.add(tuple(sorted(tile_packs)))
+        return
+
     # 尝试削减雀头
-    if not has_pair:
-        for tile, n in tiles.items():
-            if n >= 2:
-                new_tiles = deepcopy(tiles)
-                new_tiles[tile] -= 2
-                if new_tiles[tile] == 0:
-                    new_tiles.pop(tile)
-                if is_normal_form_helper(new_tiles, has_pair=True):
-                    return True
+    if need_pair and counts[start] >= 2:
+        counts[start] -= 2
+        tile_packs.append((start, start))
+        normal_form_split_helper(counts, start, end, False, is_character, tile_packs, result)
+        tile_packs.pop()
+        counts[start] += 2
+
+    # 尝试削减刻子
+    if counts[start] >= 3:
+        counts[start] -= 3
+        tile_packs.append((start, start, start))
+        normal_form_split_helper(counts, start, end, need_pair, is_character, tile_packs, result)
+        tile_packs.pop()
+        counts[start] += 3
 
     # 尝试削减顺子
-    for tile, n in tiles.items():
-        try:
-            tile_1 = tile + 1
-            tile_2 = tile + 2
-            if tile_1 in tiles.keys() and tile_2 in tiles.keys():
-                new_tiles = deepcopy(tiles)
-                for x in [tile, tile_1, tile_2]:
-                    new_tiles[x] -= 1
-                    if new_tiles[x] == 0:
-                        new_tiles.pop(x)
-                if is_normal_form_helper(new_tiles):
-                    return True
-        except ValueError:
-            continue
-
-    # 尝试消减刻子
-    for tile, n in tiles.items():
-        if n >= 3:
-            new_tiles = deepcopy(tiles)
-            new_tiles[tile] -= 3
-            if new_tiles[tile] == 0:
-                new_tiles.pop(tile)
-            if is_normal_form_helper(new_tiles):
-                return True
-
-    return False
+    if not is_character and start + 2 < end and counts[start + 1] and counts[start + 2]:
+        counts[start] -= 1
+        counts[start + 1] -= 1
+        counts[start + 2] -= 1
+        tile_packs.append((start, start + 1, start + 2))
+        normal_form_split_helper(counts, start, end, need_pair, is_character, tile_packs, result)
+        tile_packs.pop()
+        counts[start] += 1
+        counts[start + 1] += 1
+        counts[start + 2] += 1
 
 
 def is_guoshi_form(tiles: List[Tile]):
@@ -183,131 +184,253 @@ def is_guoshi_form(tiles: List[Tile]):
     for yaojiu in yaojiu_list:
         if yaojiu not in d.keys():
             return False
+    # 十三种幺九牌都有，第十四张也必须是幺九牌
+    return all(tile in yaojiu_list for tile in tiles)
 
 
-def normal_form_wait_list(tiles: List[Tile]):
+wait_list_cache_size = 4096  # 每一种听牌计算的缓存容量，可以通过函数的cache.resize修改
+
+
+@hand_cached(wait_list_cache_size)
+def normal_form_wait_list(hand: Hand):
     """
     判断普通牌型在13章牌的时候听哪些牌
-    :param tiles: 手牌
-    :return: 听牌
+    使用查找表，只需要重新查加入的牌所在的花色
+    结果按照手牌缓存，同一手牌重复查询（比如每次有人切牌时判断荣和）直接返回
+    :param hand: 手牌，可以是牌的列表或者Hand
+    :return: 听牌，不可修改
     """
-    d = list2dict(tiles)
-    return normal_form_wait_list_helper(d, has_pair=False)
-
-
-def normal_form_wait_list_helper(tiles: Dict[Tile, int], has_pair=False):
-    """
-    用于递归计算的帮助函数
-    :param has_pair: 在递归过程中是否已经生成过雀头了
-    :param tiles: 从牌映射到牌的数量
-    :return: 听牌列表
-    """
-    if len(tiles) == 1:
-        # 有可能听雀头
-        tile, _ = tiles.keys()
-        if tiles[tile] == 1:
-            assert has_pair
-            return {tile}
-    elif len(tiles) != 2:
-        tile1, tile2, _ = sorted(tiles.keys())
-        if tiles[tile1] == 1 and tiles[tile2] == 1:
-            if tile1.is_same_category(tile2):
-                # 剩下一个搭子
-                if tile1 + 1 == tile2:
-                    if tile1 in yaojiu_list:
-                        return {tile2 + 1}
-                    elif tile2 in yaojiu_list:
-                        return {tile1 - 1}
-                    else:
-                        return {tile1 - 1, tile2 + 1}
-                elif tile1 + 2 == tile2:
-                    return {tile1 + 1}
-
-    result = {}
-
-    # 尝试削减雀头
-    if not has_pair:
-        for tile, n in tiles.items():
-            if n >= 2:
-                new_tiles = deepcopy(tiles)
-                new_tiles[tile] -= 2
-                if new_tiles[tile] == 0:
-                    new_tiles.pop(tile)
-                result |= normal_form_wait_list_helper(new_tiles, has_pair=True)
+    return frozenset(Tile.from_index(index) for index in agari_wait_indices(hand.counts))
 
-    # 尝试削减顺子
-    for tile, n in tiles.items():
-        try:
-            tile_1 = tile + 1
-            tile_2 = tile + 2
-            if tile_1 in tiles.keys() and tile_2 in tiles.keys():
-                new_tiles = deepcopy(tiles)
-                for x in [tile, tile_1, tile_2]:
-                    new_tiles[x] -= 1
-                    if new_tiles[x] == 0:
-                        new_tiles.pop(x)
-                result |= normal_form_wait_list_helper(new_tiles)
-        except ValueError:
-            continue
-
-    # 尝试消减刻子
-    for tile, n in tiles.items():
-        if n >= 3:
-            new_tiles = deepcopy(tiles)
-            new_tiles[tile] -= 3
-            if new_tiles[tile] == 0:
-                new_tiles.pop(tile)
-            result |= normal_form_wait_list_helper(new_tiles)
-
-    return result
 
-
-def seven_pair_wait_list(tiles: List[Tile]):
+@hand_cached(wait_list_cache_size)
+def seven_pair_wait_list(hand: Hand):
     """
     判断七对子型听牌
-    :param tiles: 手牌
-    :return:
+    :param hand: 手牌，可以是牌的列表或者Hand
+    :return: 听牌，不可修改
     """
-    if len(tiles) != 13:
+    if len(hand) != 13:
         # 如果不是门清，那么无法七对子听牌
-        return {}
+        return frozenset()
 
-    d = list2dict(tiles)
-    if len(d) == 7:
-        # 有七种牌，则七对子听牌
-        for k, v in d.items():
-            if v == 1:
-                return {k}
+    counts = hand.counts
+    if counts.count(0) == 34 - 7 and counts.count(1) == 1 and counts.count(2) == 6:
+        # 有七种牌，六个对子，则七对子听剩下的单张
+        return frozenset((Tile.from_index(counts.index(1)),))
 
-    return {}
+    return frozenset()
 
 
-def guoshi_wait_list(tiles: List[Tile]):
+@hand_cached(wait_list_cache_size)
+def guoshi_wait_list(hand: Hand):
     """
     判断国士听牌
-    :param tiles: 手牌
-    :return: 国士听牌的种类
+    :param hand: 手牌，可以是牌的列表或者Hand
+    :return: 国士听牌的种类，不可修改
     """
-    if len(tiles) != 13:
+    if len(hand) != 13:
         # 如果不是门清，则无法国士
-        return {}
+        return frozenset()
 
-    if any(x not in yaojiu_list for x in tiles):
+    counts = hand.counts
+    yaojiu_counts = [counts[tile.index] for tile in yaojiu_list]
+    if sum(yaojiu_counts) != 13:
         # 如果有任何一张牌不是幺九牌，则不是国士
-        return {}
+        return frozenset()
 
-    d = list2dict(tiles)
-
-    if len(d) == 13:
+    n_kinds = 13 - yaojiu_counts.count(0)
+    if n_kinds == 13:
         # 国士十三面
-        return set(yaojiu_list)
-    elif len(d) == 12:
+        return frozenset(yaojiu_list)
+    elif n_kinds == 12 and max(yaojiu_counts) == 2:
         # 国士
-        for yaojiu in yaojiu_list:
-            if yaojiu not in d.keys():
-                return {yaojiu}
+        return frozenset((yaojiu_list[yaojiu_counts.index(0)],))
     else:
-        return {}
+        return frozenset()
+
+
+# 批量判断使用的稠密查找表，下标是和agari_table相同的键，值是雀头位置掩码，-1表示不能分割，第一次使用时生成
+dense_suit_table = None
+dense_character_table = None
+
+
+def batch_tables():
+    """
+    返回数牌和字牌的稠密查找表，numpy只在批量判断的时候才需要导入
+    """
+    global dense_suit_table, dense_character_table
+    import numpy as np
+    if dense_suit_table is None:
+        dense = []
+        for table, n_kinds in zip(get_tables(), (9, 7)):
+            array_table = np.full(5 ** n_kinds, -1, dtype=np.int16)
+            array_table[np.fromiter(table.keys(), dtype=np.int64, count=len(table))] = \
+                np.fromiter(table.values(), dtype=np.int16, count=len(table))
+            dense.append(array_table)
+        dense_suit_table, dense_character_table = dense
+    return dense_suit_table, dense_character_table
+
+
+def batch_hands(hands):
+    """
+    检查并转换批量手牌
+    :param hands: (N, 34)的数组，每一行是一手牌34种牌的数量
+    :return: int8的numpy数组
+    """
+    import numpy as np
+    hands = np.asarray(hands, dtype=np.int8)
+    if hands.ndim != 2 or hands.shape[1] != 34:
+        raise ValueError("批量手牌必须是(N, 34)的数组")
+    return hands
+
+
+def batch_part_keys(hands):
+    """
+    每一手牌的三种数牌和字牌分别编码成查找表的键
+    :return: 四个长度为N的int64数组
+    """
+    import numpy as np
+    keys = []
+    for start, end in part_ranges:
+        keys.append(hands[:, start:end].astype(np.int64) @ np.array(weights[:end - start], dtype=np.int64))
+    return keys
+
+
+def batch_normal_agari(hands, keys=None):
+    """
+    普通牌型的批量和牌判断，每一种花色查一次表，所有花色都能分割并且恰好有一个雀头
+    """
+    import numpy as np
+    if keys is None:
+        keys = batch_part_keys(hands)
+    suit, character = batch_tables()
+    ok = np.ones(len(hands), dtype=bool)
+    n_pair = np.zeros(len(hands), dtype=np.int8)
+    for (start, end), key in zip(part_ranges, keys):
+        pair_mask = (character if start == 27 else suit)[key]
+        ok &= pair_mask >= 0
+        n_pair += pair_mask > 0
+    return ok & (n_pair == 1)
+
+
+def batch_is_agari(hands):
+    """
+    批量判断和牌，包括普通牌型、七对子和国士
+    :param hands: (N, 34)的数组，每一行是一手牌(不包括副露)34种牌的数量
+    :return: 长度为N的bool数组
+    """
+    import numpy as np
+    hands = batch_hands(hands)
+    closed = hands.sum(axis=1) == 14
+    seven_pair = closed & (np.count_nonzero(hands == 2, axis=1) == 7)
+    yaojiu = hands[:, yaojiu_indices]
+    guoshi = closed & (np.count_nonzero(yaojiu, axis=1) == 13) & (yaojiu.sum(axis=1) == 14)
+    return batch_normal_agari(hands) | seven_pair | guoshi
+
+
+def batch_shanten(hands):
+    """
+    批量计算向听数，和单手牌的shanten相同，副露的数目由手牌数目推算
+    每一种花色先对不同的牌型去重，只对去重之后的牌型计算摘要(并且使用shanten中的缓存)，
+    摘要展开成(雀头数 * 5 + 面子数)到最多搭子数的10维向量，-1表示不可能，然后在整个批次上合并四种花色
+    :param hands: (N, 34)的数组，每一行是一手牌(不包括副露)34种牌的数量
+    :return: 长度为N的int8数组，和牌是-1，听牌是0
+    """
+    import numpy as np
+    hands = batch_hands(hands)
+    n = len(hands)
+
+    best = np.full((n, 10), -1, dtype=np.int8)
+    best[:, 0] = 0
+    for (start, end), key in zip(part_ranges, batch_part_keys(hands)):
+        is_character = start == 27
+        unique_keys, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+        vectors = np.full((len(unique_keys), 10), -1, dtype=np.int8)
+        for row, pattern in enumerate(hands[first, start:end].tolist()):
+            for pair, mentsu, taatsu in part_summary(pattern, is_character,
+                                                     character_cache if is_character else suit_cache):
+                vectors[row, pair * 5 + mentsu] = taatsu
+        part = vectors[inverse.reshape(-1)]
+
+        new_best = np.full((n, 10), -1, dtype=np.int8)
+        for slot in range(10):
+            pair, mentsu = divmod(slot, 5)
+            for part_slot in range(10):
+                part_pair, part_mentsu = divmod(part_slot, 5)
+                if pair + part_pair > 1 or mentsu + part_mentsu > 4:
+                    continue
+                target = (pair + part_pair) * 5 + mentsu + part_mentsu
+                candidate = np.where((best[:, slot] >= 0) & (part[:, part_slot] >= 0),
+                                     best[:, slot] + part[:, part_slot], -1)
+                np.maximum(new_best[:, target], candidate, out=new_best[:, target])
+        best = new_best
+
+    n_tiles = hands.sum(axis=1, dtype=np.int16)
+    n_melds = 4 - n_tiles // 3
+    result = np.full(n, 8, dtype=np.int16)
+    for slot in range(10):
+        pair, mentsu = divmod(slot, 5)
+        total = mentsu + n_melds
+        valid = (best[:, slot] >= 0) & (total <= 4)
+        value = 8 - 2 * total - np.minimum(best[:, slot], 4 - total) - pair
+        result = np.where(valid, np.minimum(result, value), result)
+
+    closed = n_tiles >= 13
+    n_kinds = np.count_nonzero(hands, axis=1)
+    seven_pair = 6 - np.count_nonzero(hands >= 2, axis=1) + np.maximum(0, 7 - n_kinds)
+    yaojiu = hands[:, yaojiu_indices]
+    guoshi = 13 - np.count_nonzero(yaojiu, axis=1) - (yaojiu >= 2).any(axis=1)
+    result = np.where(closed, np.minimum(result, np.minimum(seven_pair, guoshi)), result)
+    return result.astype(np.int8)
+
+
+def batch_wait_mask(hands):
+    """
+    批量计算听牌，和normal_form_wait_list、seven_pair_wait_list、guoshi_wait_list的并集相同
+    普通牌型每一种牌只需要重新查加入的牌所在花色的表，其他花色的结果复用
+    :param hands: (N, 34)的数组，每一行是一手牌(不包括副露)34种牌的数量，牌数应该是3n+1
+    :return: 长度为N的int64数组，第i位表示听牌种编号为i的牌
+    """
+    import numpy as np
+    hands = batch_hands(hands)
+    n = len(hands)
+    suit, character = batch_tables()
+    keys = batch_part_keys(hands)
+    pair_masks = [(character if start == 27 else suit)[key] for (start, end), key in zip(part_ranges, keys)]
+    result = np.zeros(n, dtype=np.int64)
+
+    for part, (start, end) in enumerate(part_ranges):
+        # 其他花色必须全部能够分割，并且加上这一种花色之后恰好有一个雀头
+        others_ok = np.ones(n, dtype=bool)
+        n_pair = np.zeros(n, dtype=np.int8)
+        for i, mask in enumerate(pair_masks):
+            if i != part:
+                others_ok &= mask >= 0
+                n_pair += mask > 0
+        others_ok &= n_pair <= 1
+        table = character if start == 27 else suit
+        for i in range(end - start):
+            free = others_ok & (hands[:, start + i] < 4)
+            pair_mask = table[np.where(free, keys[part] + weights[i], 0)]
+            hit = free & (pair_mask >= 0) & (n_pair + (pair_mask > 0) == 1)
+            result |= hit.astype(np.int64) << (start + i)
+
+    n_tiles = hands.sum(axis=1, dtype=np.int16)
+    closed = n_tiles == 13
+    # 七对子: 七种牌，六个对子，听剩下的单张
+    seven_pair = closed & (np.count_nonzero(hands, axis=1) == 7) & (np.count_nonzero(hands == 2, axis=1) == 6)
+    single = np.argmax(hands == 1, axis=1).astype(np.int64)
+    result |= np.where(seven_pair, np.int64(1) << single, 0)
+    # 国士: 全部是幺九牌，十三种则十三面听，十二种并且有一个对子则听缺少的那一种
+    yaojiu = hands[:, yaojiu_indices]
+    all_yaojiu = closed & (yaojiu.sum(axis=1) == 13)
+    n_yaojiu_kinds = np.count_nonzero(yaojiu, axis=1)
+    yaojiu_bits = np.array([1 << index for index in yaojiu_indices], dtype=np.int64)
+    result |= np.where(all_yaojiu & (n_yaojiu_kinds == 13), yaojiu_bits.sum(), 0)
+    missing = yaojiu_bits[np.argmax(yaojiu == 0, axis=1)]
+    result |= np.where(all_yaojiu & (n_yaojiu_kinds == 12) & (yaojiu.max(axis=1) == 2), missing, 0)
+    return result
 
 
 """
@@ -343,6 +466,21 @@ def guoshi_wait_list(tiles: List[Tile]):
 
 # 下面通过玩家的视角判断是否满足胡牌条件，即有役
 # 在调用下面这些函数之前，需要先判断是否满足听牌条件
+# 和手牌的分组有关的役由yaku中注册的判断完成，和evaluate_hand使用同一份实现，这里只保留和牌时的状况役
+def has_yaku(view: View, name):
+    """
+    判断和牌是否满足名字为name的役，只要有一种分组满足即可，不考虑和其他役的排除关系
+    每次调用都重新统计WinContext并且重新分组，只适合偶尔查询一种役，
+    需要判断多种役或者频繁调用的地方应该使用yaku.evaluate_hand，一次分组得到所有的役
+    :param view: 和牌时玩家的view
+    :param name: yaku中注册的役的名字
+    :return:
+    """
+    # 在这里导入，避免和yaku之间循环导入
+    from yaku import yaku_holds
+    return yaku_holds(view, name)
+
+
 def is_richi(view: View):
     """
     是否立直胡牌
@@ -355,190 +493,83 @@ def is_richi(view: View):
 
 def is_duanyao(view: View):
     """
-    :param view: 牌桌的view
+    判断是不是断幺九
+    :param view: 和牌时玩家的view
     :return:
     """
-    last_tile = view.action_tile
-    if last_tile in yaojiu_list:
-        return False
-    for tile in view.hand_tiles:
-        if tile in yaojiu_list:
-            return False
-    melds = view.all_player_melds[view.player_id]
-    for meld in melds:
-        for tile in meld.tiles:
-            if tile in yaojiu_list:
-                return False
-    return True
+    return has_yaku(view, "duanyao")
 
 
-def is_menqianqingzimo(view: View) -> object:
+def is_menqianqingzimo(view: View):
     """
     判断是否门前清自摸
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    # 有两种情况
-    # 1. 自己存在暗杠
-    # 2. 自己没有副露
-    melds = view.all_player_melds[view.player_id]
-    if not (view.action_id == view.player_id and view.action == mo):
-        return False
-    return len(view.hand_tiles) == 13 or all(meld.meld_type == angang for meld in melds)
+    return has_yaku(view, "menqianqingzimo")
 
 
 def is_yipai_zifeng(view: View):
     """
     判断是不是自风刻
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    zifeng = Tile(wind, view.player_id, 0)
-    melds = view.all_player_melds[view.player_id]
-    for meld in melds:
-        if zifeng in meld.tiles:
-            return True
-    cnt = 0
-    for tile in view.hand_tiles:
-        if tile == zifeng:
-            cnt += 1
-    return cnt == 3
+    return has_yaku(view, "yipai_zifeng")
 
 
 def is_yipai_changfeng(view: View):
     """
     判断是不是场风刻
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    changfeng = Tile(wind, view.field_wind, 0)
-    melds = view.all_player_melds[view.player_id]
-    for meld in melds:
-        if changfeng in meld.tiles:
-            return True
-    cnt = 0
-    for tile in view.hand_tiles:
-        if tile == changfeng:
-            cnt += 1
-    return cnt == 3
+    return has_yaku(view, "yipai_changfeng")
 
 
 def is_yipai_honor_white(view: View):
     """
     判断是不是三元刻白
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    white = Tile(honor, 0, 0)
-    melds = view.all_player_melds[view.player_id]
-    for meld in melds:
-        if white in meld.tiles:
-            return True
-    cnt = 0
-    for tile in view.hand_tiles:
-        if tile == white:
-            cnt += 1
-    return cnt == 3
+    return has_yaku(view, "yipai_honor_white")
 
 
 def is_yipai_honor_fortune(view: View):
     """
-    判断是不是三元刻中
-    :param view:
+    判断是不是三元刻发
+    :param view: 和牌时玩家的view
     :return:
     """
-    fortune = Tile(honor, 0, 0)
-    melds = view.all_player_melds[view.player_id]
-    for meld in melds:
-        if fortune in meld.tiles:
-            return True
-    cnt = 0
-    for tile in view.hand_tiles:
-        if tile == fortune:
-            cnt += 1
-    return cnt == 3
+    return has_yaku(view, "yipai_honor_fortune")
 
 
 def is_yipai_honor_center(view: View):
     """
     判断是不是三元刻中
-    :param view:
-    :return:
-    """
-    center = Tile(honor, 0, 0)
-    melds = view.all_player_melds[view.player_id]
-    for meld in melds:
-        if center in meld.tiles:
-            return True
-    cnt = 0
-    for tile in view.hand_tiles:
-        if tile == center:
-            cnt += 1
-    return cnt == 3
-
-
-def pack_is_string(pack):
-    """
-    判断一个pack是不是顺子
-    :param pack:
-    :return:
-    """
-    return len(pack) == 3 and pack[0] + 2 == pack[1] + 1 == pack[2]
-
-
-def pack_is_three(pack):
-    """
-    判断一个pack是不是刻子
-    :param pack:
-    :return:
-    """
-    return len(pack) == 3 and pack[0] == pack[1] == pack[2]
-
-
-def pack_is_pair(pack):
-    """
-    判断一个pack是不是雀头
-    :param pack:
+    :param view: 和牌时玩家的view
     :return:
     """
-    return len(pack) == 2 and pack[0] == pack[1]
+    return has_yaku(view, "yipai_honor_center")
 
 
 def is_pinghu(view: View):
     """
     判断是不是平和
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    melds = view.all_player_melds[view.player_id]
-    if melds:
-        return False  # 平和不能够有任何副露
-    for split_form in normal_form_split(view.hand_tiles):
-        flag = True
-        for pack in split_form:
-            if pack_is_three(pack):
-                flag = False
-                break
-        if flag:
-            return True
-    return False
+    return has_yaku(view, "pinghu")
 
 
 def is_yibeikou(view: View):
     """
     判断是不是一杯口
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    if view.all_player_melds[view.player_id]:
-        return False  # 一杯口不能有副露
-    for split_form in normal_form_split(view.hand_tiles + [view.action_tile]):
-        string_packs = (pack for pack in split_form if pack_is_string(pack))
-        for pack1, index1 in enumerate(string_packs):
-            for pack2, index2 in enumerate(string_packs):
-                if index1 != index2 and pack1 == pack2:
-                    return True
-    return False
+    return has_yaku(view, "yibeikou")
 
 
 def is_qianggang(view: View):
@@ -608,411 +639,127 @@ def is_shuanglizhi(view: View):
 def is_sansetongke(view: View):
     """
     判断是不是三色同刻
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    # 将刻子的牌映射到数
-    for split_form in normal_form_split(view.hand_tiles + [view.action_tile]):
-        pack_flag_tile = []
-        for pack in split_form:
-            if pack_is_three(pack):
-                pack_flag_tile.append(pack[0])
-        # 从1到9，看是否存在三种数牌
-        for i in range(1, 10):
-            cnt = 0
-            for tile in pack_flag_tile:
-                if tile.is_number() and tile.__value == i:
-                    cnt += 1
-            if cnt == 3:
-                return True
-    return False
+    return has_yaku(view, "sansetongke")
 
 
 def is_sangangzi(view: View):
     """
     判断是不是三杠子
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    melds = view.all_player_melds[view.player_id]
-    if len(melds) < 3:
-        return False
-    cnt = 0
-    for meld in melds:
-        if meld.meld_type in (minggang, angang, jiagang):
-            cnt += 1
-    if cnt == 3:
-        return True
+    return has_yaku(view, "sangangzi")
 
 
 def is_duidui(view: View):
     """
     判断是不是对对
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    melds = view.all_player_melds[view.player_id]
-    for meld in melds:
-        if meld.meld_type != peng:
-            return False
-    # 判断所有的手牌是不是可以划分成雀头和刻子
-    all_tiles = view.hand_tiles + [view.action_tile]
-    d = list2dict(all_tiles)
-    # 去掉雀头之后，必定只剩下刻子
-    pair_flag = False
-    for tile, n in d.items():
-        if n == 2:
-            if pair_flag:
-                return False
-            else:
-                pair_flag = True
-        else:
-            if tile != 3:
-                return False
-    return True
+    return has_yaku(view, "duidui")
 
 
 def is_sananke(view: View):
     """
     判断是不是三暗刻
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    all_tiles = view.hand_tiles[:]
-    if view.action == mo and view.action_id == view.player_id:
-        all_tiles.append(view.action_tile)
-
-    # 判断手上的牌能不能组成三个暗刻
-    for split_form in normal_form_split(all_tiles):
-        cnt = 0
-        for pack in split_form:
-            if pack_is_three(pack):
-                cnt += 1
-        if cnt >= 3:
-            return True
+    return has_yaku(view, "sananke")
 
 
 def is_xiaosanyuan(view: View):
     """
     判断是不是小三元
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    all_tiles = view.hand_tiles + [view.action_tile]
-    # 中，发，白，其中有一种是两张的雀头，另外两种都有刻子
-    # 输出三元牌的对子和刻子的数目，分别应该是1和2
-    meld_three_cnt = 0
-
-    melds = view.all_player_melds[view.player_id]
-    for meld in melds:
-        if meld.meld_type is peng and meld.tiles[0].is_honor():
-            meld_three_cnt += 1
-
-    for split_form in normal_form_split(all_tiles):
-        hand_pair_cnt = 0
-        hand_three_cnt = 0
-        for pack in split_form:
-            if pack_is_pair(pack) and pack[0].is_honor():
-                hand_pair_cnt += 1
-            elif pack_is_three(pack) and pack[0].is_honor():
-                hand_three_cnt += 1
-        if hand_pair_cnt == 1 and meld_three_cnt + hand_three_cnt == 2:
-            return True
-    return False
+    return has_yaku(view, "xiaosanyuan")
 
 
 def is_hunlaotou(view: View):
     """
     判断是不是混老头
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    # 必须全部划分为刻子和雀头，全部是幺九牌，并且必须要有19数牌和字牌
-    # 由于一定符合和牌牌型，手牌只需要检查是否都是幺九牌就可以了
-    char_flag = False
-    one_nine_flag = False
-    all_tiles = view.hand_tiles + [view.action_tile]
-    for tile in all_tiles:
-        if tile.is_number():
-            if tile.__value in (1, 9):
-                one_nine_flag = True
-            else:
-                return False
-        elif tile.is_character():
-            char_flag = True
-    if not char_flag or not one_nine_flag:
-        return False
-
-    melds = view.all_player_melds[view.player_id]
-    for meld in melds:
-        if meld.meld_type != peng:
-            return False
-        tile = melds.tiles[0]
-        if tile.is_number():
-            if not tile.is_one_nine():
-                return False
-            one_nine_flag = True
-        else:
-            char_flag = True
-    return one_nine_flag and char_flag
+    return has_yaku(view, "hunlaotou")
 
 
 def is_seven_pair(view: View):
     """
     判断是不是七对子
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    # 二杯口优先级高于七对子
-    if is_erbeikou(view):
-        return False
-    # 如果是自摸的话，14张牌判断字典大小就可以
-    if view.action == mo and view.player_id == view.action_id:
-        d = list2dict(view.hand_tiles)
-        return len(d) == 7 and all(x == 2 for x in d.values())
-
-    # 如果是荣胡的话，判断动作牌是否在七对wait_list里
-    else:
-        return len(view.hand_tiles) == 13 and view.action_tile in seven_pair_wait_list(view.hand_tiles)
+    return has_yaku(view, "seven_pair")
 
 
 def is_hunquandai(view: View):
     """
     判断是否混全带幺
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    all_melds = view.all_player_melds[view.player_id]
-    all_tiles = view.hand_tiles + [view.action_tile]
-
-    # 至少分割出一组顺子，否则变成混老头
-    string_flag = False
-
-    for meld in all_melds:
-        if meld.meld_type == chi:
-            string_flag = True
-            # 顺子必须是123或者789
-            value = tuple(sorted(tile.__value for tile in meld.tiles))
-            if value not in ((1, 2, 3), (7, 8, 9)):
-                return False
-        else:
-            # 必须是幺九牌刻子
-            if meld.tiles[0] not in yaojiu_list:
-                return False
-
-    for split_form in normal_form_split(all_tiles):
-        for pack in split_form:
-            if pack_is_pair(pack):
-                if pack[0] not in yaojiu_list:
-                    return False
-            elif pack_is_string(pack):
-                string_flag = True
-                value = tuple(sorted(tile.__value for tile in pack))
-                if value not in ((1, 2, 3), (7, 8, 9)):
-                    return False
-            elif pack_is_three(pack):
-                if pack[0] not in yaojiu_list:
-                    return False
-
-    return string_flag
+    return has_yaku(view, "hunquandai")
 
 
 def is_yiqitongguan(view: View):
     """
     判断是否是一气通贯
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-
-    melds = view.all_player_melds[view.player_id]
-    all_tiles = view.hand_tiles + [view.action_tile]
-    for t in (man, pin, suo):
-        flag123 = False
-        flag456 = False
-        flag789 = False
-
-        for meld in melds:
-            if meld.meld_type == chi and meld.tiles[0].__category == t:
-                values = tuple(sorted(tile.__value for tile in meld.tiles))
-                if values == (1, 2, 3):
-                    flag123 = True
-                elif values == (4, 5, 6):
-                    flag456 = True
-                elif values == (7, 8, 9):
-                    flag789 = True
-
-        for split_form in normal_form_split(all_tiles):
-            for pack in split_form:
-                if pack_is_string(pack) and pack[0].__category == t:
-                    values = tuple(sorted(tile.__value for tile in pack))
-                    if values == (1, 2, 3):
-                        flag123 = True
-                    elif values == (4, 5, 6):
-                        flag456 = True
-                    elif values == (7, 8, 9):
-                        flag789 = True
-
-        if flag123 and flag456 and flag789:
-            return True
-    return False
+    return has_yaku(view, "yiqitongguan")
 
 
 def is_sansetongshun(view: View):
     """
     判断是否三色同顺
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    # 将顺子的牌映射到数
-    for split_form in normal_form_split(view.hand_tiles + [view.action_tile]):
-        pack_flag_tile = []
-        for pack in split_form:
-            if pack_is_string(pack):
-                pack_flag_tile.append(tuple(sorted(pack))[0])
-        # 从1到7，看是否存在三种数牌
-        for i in range(1, 7):
-            cnt = 0
-            for tile in pack_flag_tile:
-                if tile.is_number() and tile.__value == i:
-                    cnt += 1
-            if cnt == 3:
-                return True
-    return False
+    return has_yaku(view, "sansetongshun")
 
 
 def is_erbeikou(view: View):
     """
     判断是不是二杯口
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    all_tiles = view.hand_tiles + [view.action_tile]
-    if len(all_tiles) != 14:
-        return False
-    for split_form in normal_form_split(all_tiles):
-        faces = sorted(filter(lambda x: len(x) == 3, split_form))
-        if faces[0] == faces[1] and faces[2] == faces[3]:
-            return True
-
-    return False
+    return has_yaku(view, "erbeikou")
 
 
 def is_chunquandai(view: View):
     """
     判断是不是纯全带
-    :param viwe:
+    :param view: 和牌时玩家的view
     :return:
     """
-    all_melds = view.all_player_melds[view.player_id]
-    all_tiles = view.hand_tiles + [view.action_tile]
-
-    # 必须全部都是数牌
-    for tile in all_tiles:
-        if tile.is_character():
-            return False
-
-    for meld in all_melds:
-        for tile in meld.tiles:
-            if tile.is_character():
-                return False
-
-    # 至少分割出一组顺子，否则变成清老头
-    string_flag = False
-
-    for meld in all_melds:
-        if meld.meld_type == chi:
-            string_flag = True
-            # 顺子必须是123或者789
-            value = tuple(sorted(tile.__value for tile in meld.tiles))
-            if value not in ((1, 2, 3), (7, 8, 9)):
-                return False
-        else:
-            # 必须是19刻子
-            if not meld.tiles[0].is_one_nine():
-                return False
-
-    for split_form in normal_form_split(all_tiles):
-        for pack in split_form:
-            if pack_is_pair(pack):
-                if not pack[0].is_one_nine():
-                    return False
-            elif pack_is_string(pack):
-                string_flag = True
-                value = tuple(sorted(tile.__value for tile in pack))
-                if value not in ((1, 2, 3), (7, 8, 9)):
-                    return False
-            elif pack_is_three(pack):
-                if not pack[0].is_one_nine():
-                    return False
-
-    return string_flag
+    return has_yaku(view, "chunquandai")
 
 
 def is_hunyise(view: View):
     """
     判断是不是混一色
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    all_tiles = view.hand_tiles + [view.action_tile]
-    all_melds = view.all_player_melds[view.player_id]
-
-    number_category = None
-    char_flag = False
-
-    for tile in all_tiles:
-        if tile.is_number():
-            if number_category is None:
-                number_category = tile.__category
-            elif tile.__category != number_category:
-                return False
-        else:
-            char_flag = True
-
-    for meld in all_melds:
-        for tile in meld.tiles:
-            if tile.is_number():
-                if number_category is None:
-                    number_category = tile.__category
-                elif tile.__category != number_category:
-                    return False
-            else:
-                char_flag = True
-
-    return char_flag
+    return has_yaku(view, "hunyise")
 
 
 def is_qingyise(view: View):
     """
     判断是不是清一色
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    all_tiles = view.hand_tiles + [view.action_tile]
-    all_melds = view.all_player_melds[view.player_id]
-
-    number_category = None
-
-    for tile in all_tiles:
-        if tile.is_number():
-            if number_category is None:
-                number_category = tile.__category
-            elif tile.__category != number_category:
-                return False
-        else:
-            return False
-
-    for meld in all_melds:
-        for tile in meld.tiles:
-            if tile.is_number():
-                if number_category is None:
-                    number_category = tile.__category
-                elif tile.__category != number_category:
-                    return False
-            else:
-                return False
-
-    return True
+    return has_yaku(view, "qingyise")
 
 
 def is_tianhu(view: View):
@@ -1040,315 +787,116 @@ def is_dihu(view: View):
 def is_dasanyan(view: View):
     """
     判断是否大三元
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    all_tiles = view.hand_tiles + [view.action_tile]
-    # 三元牌的刻子数目应该是
-    meld_three_cnt = 0
-
-    melds = view.all_player_melds[view.player_id]
-    for meld in melds:
-        if meld.meld_type is peng and meld.tiles[0].is_honor():
-            meld_three_cnt += 1
-
-    for split_form in normal_form_split(all_tiles):
-        hand_three_cnt = 0
-        for pack in split_form:
-            if pack_is_three(pack) and pack[0].is_honor():
-                hand_three_cnt += 1
-        if hand_three_cnt + meld_three_cnt == 3:
-            return True
-    return False
+    return has_yaku(view, "dasanyan")
 
 
 def is_sianke(view: View):
     """
     判断是否四暗刻
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    all_tiles = view.hand_tiles + [view.action]
-    all_melds = view.all_player_melds[view.player_id]
-    # 先判断是否门清状态
-
-    # 普通四暗刻必须自己自摸
-    if view.action != mo:
-        return False
-
-    for meld in all_melds:
-        if meld.meld_type != angang:
-            return False
-
-    flag = False
-
-    for split_form in normal_form_split(all_tiles):
-        for pack in split_form:
-            if not pack_is_three(pack):
-                return False
-            if pack[0] == view.action_tile:
-                flag = True
-    return flag
+    return has_yaku(view, "sianke")
 
 
 def is_ziyise(view: View):
     """
     判断是否字一色
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    all_tiles = view.hand_tiles + [view.action]
-    all_melds = view.all_player_melds[view.player_id]
-
-    for tile in all_tiles:
-        if tile.is_number():
-            return False
-
-    for meld in all_melds:
-        for tile in meld.tiles:
-            if tile.is_number():
-                return False
-
-    return True
-
-
-green_list = {
-    Tile(suo, 2, 0),
-    Tile(suo, 3, 0),
-    Tile(suo, 4, 0),
-    Tile(suo, 6, 0),
-    Tile(honor, 1, 0)
-}
+    return has_yaku(view, "ziyise")
 
 
 def is_lvyise(view: View):
     """
     判断是否绿一色
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    all_tiles = view.hand_tiles + [view.action_tile]
-    all_melds = view.all_player_melds[view.player_id]
-
-    for tile in all_tiles:
-        if tile not in green_list:
-            return False
-    for meld in all_melds:
-        for tile in meld.tiles:
-            if tile not in green_list:
-                return False
+    return has_yaku(view, "lvyise")
 
 
 def is_qinglaotou(view: View):
     """
     判断是否青老头
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    all_tiles = view.hand_tiles + [view.action_tile]
-    all_melds = view.all_player_melds[view.player_id]
-
-    for tile in all_tiles:
-        if not tile.is_one_nine():
-            return False
-    for meld in all_melds:
-        for tile in meld.tiles:
-            if not tile.is_one_nine():
-                return False
-    return True
+    return has_yaku(view, "qinglaotou")
 
 
 def is_guoshiwushuang(view: View):
     """
     判断是否国士无双
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    # 首先需要门清状态
-    if view.all_player_melds[view.player_id]:
-        return False
-    all_tiles = view.hand_tiles + [view.action_tile]
-    for tile in all_tiles:
-        if tile not in yaojiu_list:
-            return False
-    d = list2dict(all_tiles)
-    if len(d) != 13:
-        return False
-    # 接下来是国士无双13面的判断
-
-    d = list2dict(view.hand_tiles)
-    if len(d) == 13:
-        return False  # 应当是13面
-    else:
-        return True
+    return has_yaku(view, "guoshiwushuang")
 
 
 def is_xiaosixi(view: View):
     """
     判断是否小四喜
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    all_tiles = view.hand_tiles + [view.action_tile]
-    # 东南西北，中有一种是两张的雀头，另外两种都有刻子
-    # 输出风牌的对子和刻子的数目，分别应该是1和3
-    meld_three_cnt = 0
-
-    melds = view.all_player_melds[view.player_id]
-    for meld in melds:
-        if meld.meld_type is peng and meld.tiles[0].is_wind():
-            meld_three_cnt += 1
-
-    for split_form in normal_form_split(all_tiles):
-        hand_pair_cnt = 0
-        hand_three_cnt = 0
-        for pack in split_form:
-            if pack_is_pair(pack) and pack[0].is_wind():
-                hand_pair_cnt += 1
-            elif pack_is_three(pack) and pack[0].is_wind():
-                hand_three_cnt += 1
-        if hand_pair_cnt == 1 and meld_three_cnt + hand_three_cnt == 3:
-            return True
-    return False
+    return has_yaku(view, "xiaosixi")
 
 
 def is_sigangzi(view: View):
     """
     判断是否四杠子
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    all_melds = view.all_player_melds[view.player_id]
-    return all(meld.meld_type in (minggang, angang, jiagang) for meld in all_melds)
+    return has_yaku(view, "sigangzi")
 
 
 def is_jiulian(view: View):
     """
     判断是否九莲
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    all_tiles = view.hand_tiles + [view.action_tile]
-    if len(all_tiles) != 14:
-        return False
-
-    # 确定是清一色
-    if not is_qingyise(view):
-        return False
-
-    cnt = list(range(10))
-    # 统计所有牌，保证符合基本九莲格式
-    for tile in all_tiles:
-        cnt[tile.__value] += 1
-    if cnt[1] < 3 or cnt[9] < 3 or not all(cnt[2:9]):
-        return False
-    # 统计手牌，保证不是纯九莲
-    cnt = list(range(10))
-    for tile in view.hand_tiles:
-        cnt[tile.__value] += 1
-    if cnt[1] == 3 and cnt[9] == 3 and all(cnt[2:9]):
-        return False
-    else:
-        return True
+    return has_yaku(view, "jiulian")
 
 
 def is_siankedanji(view: View):
     """
     判断是否四暗刻单骑
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    all_tiles = view.hand_tiles + [view.action]
-    all_melds = view.all_player_melds[view.player_id]
-    # 先判断是否门清状态
-
-    for meld in all_melds:
-        if meld.meld_type != angang:
-            return False
-
-    for split_form in normal_form_split(all_tiles):
-        for pack in split_form:
-            if not pack_is_three(pack):
-                return False
-
-    return True
+    return has_yaku(view, "siankedanji")
 
 
 def is_guoshiwuhuangshisanmian(view: View):
     """
     判断是否十三面
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    # 首先需要门清状态
-    if view.all_player_melds[view.player_id]:
-        return False
-    all_tiles = view.hand_tiles + [view.action_tile]
-    for tile in all_tiles:
-        if tile not in yaojiu_list:
-            return False
-    d = list2dict(all_tiles)
-    if len(d) != 13:
-        return False
-    # 接下来是国士无双13面的判断
-
-    d = list2dict(view.hand_tiles)
-    if len(d) == 13:
-        return True  # 应当是13面
-    else:
-        return False
+    return has_yaku(view, "guoshiwuhuangshisanmian")
 
 
 def is_chunzhengjiulian(view: View):
     """
     判断是否纯正九莲
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    all_tiles = view.hand_tiles + [view.action_tile]
-    if len(all_tiles) != 14:
-        return False
-
-    # 确定是清一色
-    if not is_qingyise(view):
-        return False
-
-    cnt = list(range(10))
-    # 统计所有牌，保证符合基本九莲格式
-    for tile in all_tiles:
-        cnt[tile.__value] += 1
-    if cnt[1] < 3 or cnt[9] < 3 or not all(cnt[2:9]):
-        return False
-    # 统计手牌，保证不是纯九莲
-    cnt = list(range(10))
-    for tile in view.hand_tiles:
-        cnt[tile.__value] += 1
-    if cnt[1] == 3 and cnt[9] == 3 and all(cnt[2:9]):
-        return True
-    else:
-        return False
+    return has_yaku(view, "chunzhengjiulian")
 
 
 def is_dasixi(view: View):
     """
     是否大四喜
-    :param view:
+    :param view: 和牌时玩家的view
     :return:
     """
-    all_tiles = view.hand_tiles + [view.action_tile]
-    # 东南西北，都是刻子
-    meld_three_cnt = 0
-
-    melds = view.all_player_melds[view.player_id]
-    for meld in melds:
-        if meld.meld_type is peng and meld.tiles[0].is_wind():
-            meld_three_cnt += 1
-
-    for split_form in normal_form_split(all_tiles):
-        hand_three_cnt = 0
-        for pack in split_form:
-            if pack_is_three(pack) and pack[0].is_wind():
-                hand_three_cnt += 1
-        if meld_three_cnt + hand_three_cnt == 3:
-            return True
-    return False
+    return has_yaku(view, "dasixi")
+
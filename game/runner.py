@@ -0,0 +1,173 @@
+"""
+多进程并行对局
+每个工作进程拥有自己的Table和agents，按照对局编号得到确定的种子，同一组种子无论分给哪个进程结果都相同
+工作进程每完成一批对局就把这批的统计结果发回父进程，父进程边接收边合并
+
+    def make_agents():
+        return [MyAgent(), MyAgent(), BaselineAgent(), BaselineAgent()]
+
+    for stats in run_games(make_agents, 1000000, seed=0):
+        print(stats.n_games, stats.average_placement())
+
+make_agents必须是模块级的函数或者类，才能传给工作进程
+duplicate=True的时候每4场对局使用相同的牌山并且轮转座次，比较agent的时候可以减少运气带来的方差
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from table import Table
+
+
+def game_seed(seed, game_index):
+    """
+    第game_index场对局的种子，只和总的种子和对局编号有关
+    """
+    return seed * 2 ** 32 + game_index
+
+
+def game_setup(seed, game_index, duplicate=False):
+    """
+    第game_index场对局的种子和座次
+    duplicate模式下每4场对局是一组，使用同一个种子，所以每一局的牌山都相同，座次依次轮转，每个agent在每个座次上各坐一次
+    同一组牌山的运气在agent之间抵消，比较agent需要的对局数少很多
+    :return: (种子, 座次)，座次为None表示由shuffle_seat决定
+    """
+    if not duplicate:
+        return game_seed(seed, game_index), None
+    rotation = game_index % 4
+    return game_seed(seed, game_index // 4), [(seat + rotation) % 4 for seat in range(4)]
+
+
+class GameStats:
+    """
+    多场对局的统计结果，按照agents在make_agents返回的列表中的位置(slot)统计，和座次无关
+    """
+
+    def __init__(self):
+        self.n_games = 0
+        self.n_rounds = 0
+        self.placements = [[0] * 4 for _ in range(4)]  # placements[slot][名次]，名次从0开始
+        self.point_deltas = [0] * 4  # 每个slot的点棒变化之和
+        self.n_wins = [0] * 4  # 和牌的局数
+        self.n_zimo = [0] * 4  # 其中自摸的局数
+        self.n_deal_ins = [0] * 4  # 放铳的局数
+
+    def add_game(self, points, round_results, slots):
+        """
+        加入一场对局的结果
+        :param points: 四家最终的点棒，按照座次
+        :param round_results: 每一局的RoundResult
+        :param slots: slots[座次]是坐在这个座次的agent的slot
+        """
+        self.n_games += 1
+        self.n_rounds += len(round_results)
+        # 点棒相同的时候起家近的名次靠前
+        order = sorted(range(4), key=lambda seat: (-points[seat], seat))
+        for placement, seat in enumerate(order):
+            self.placements[slots[seat]][placement] += 1
+        for seat in range(4):
+            self.point_deltas[slots[seat]] += points[seat] - 25000
+        for result in round_results:
+            if result.winner is not None:
+                self.n_wins[slots[result.winner]] += 1
+                if result.loser is None:
+                    self.n_zimo[slots[result.winner]] += 1
+                else:
+                    self.n_deal_ins[slots[result.loser]] += 1
+
+    def merge(self, other):
+        """
+        合并另一份统计结果
+        """
+        self.n_games += other.n_games
+        self.n_rounds += other.n_rounds
+        for slot in range(4):
+            for placement in range(4):
+                self.placements[slot][placement] += other.placements[slot][placement]
+            self.point_deltas[slot] += other.point_deltas[slot]
+            self.n_wins[slot] += other.n_wins[slot]
+            self.n_zimo[slot] += other.n_zimo[slot]
+            self.n_deal_ins[slot] += other.n_deal_ins[slot]
+        return self
+
+    def average_placement(self):
+        """
+        每个slot的平均名次，从1开始
+        """
+        return [sum((placement + 1) * n for placement, n in enumerate(counts)) / max(self.n_games, 1)
+                for counts in self.placements]
+
+    def win_rate(self):
+        """
+        每个slot的和牌率
+        """
+        return [n / max(self.n_rounds, 1) for n in self.n_wins]
+
+    def deal_in_rate(self):
+        """
+        每个slot的放铳率
+        """
+        return [n / max(self.n_rounds, 1) for n in self.n_deal_ins]
+
+    def average_point_delta(self):
+        """
+        每个slot每场对局的平均点棒变化
+        """
+        return [n / max(self.n_games, 1) for n in self.point_deltas]
+
+
+# 工作进程中的桌子和agents，由init_worker创建，之后的对局一直复用
+worker_table = None
+worker_agents = None
+
+
+def init_worker(make_agents):
+    """
+    工作进程的初始化，创建这个进程自己的Table和agents
+    """
+    global worker_table, worker_agents
+    worker_table = Table()
+    worker_agents = list(make_agents())
+
+
+def play_games(seed, start, end, east_or_south="east", shuffle_seat=True, duplicate=False):
+    """
+    在当前进程中进行编号从start到end(不包括)的对局
+    :return: 这些对局的GameStats
+    """
+    stats = GameStats()
+    for game_index in range(start, end):
+        current_seed, seat_order = game_setup(seed, game_index, duplicate)
+        points = worker_table.play_game(worker_agents, east_or_south, current_seed, shuffle_seat, seat_order)
+        stats.add_game(points, worker_table.round_results, worker_table.seat_slots)
+    return stats
+
+
+def run_games(make_agents, n_games, seed=0, east_or_south="east", shuffle_seat=True, processes=None,
+              chunk_size=100, duplicate=False):
+    """
+    并行进行n_games场对局，每完成一批对局就返回一次合并之后的统计结果
+    :param make_agents: 返回四个agent的函数，每个工作进程调用一次
+    :param n_games: 对局数
+    :param seed: 总的随机种子，每场对局的种子由它和对局编号得到
+    :param east_or_south: "east"是东风战，"south"是半庄战
+    :param shuffle_seat: 每场对局是否随机打乱座次
+    :param processes: 工作进程数，默认使用所有的核，1则在当前进程中进行
+    :param chunk_size: 每一批的对局数
+    :param duplicate: 每4场对局使用相同的牌山并且轮转座次，见game_setup，这时shuffle_seat不起作用
+    :return: 生成器，每次产生到目前为止所有完成的对局的GameStats
+    """
+    chunks = [(start, min(start + chunk_size, n_games)) for start in range(0, n_games, chunk_size)]
+    total = GameStats()
+    if processes == 1:
+        init_worker(make_agents)
+        for start, end in chunks:
+            yield total.merge(play_games(seed, start, end, east_or_south, shuffle_seat, duplicate))
+        return
+
+    with ProcessPoolExecutor(processes or os.cpu_count(), initializer=init_worker,
+                             initargs=(make_agents,)) as executor:
+        futures = [executor.submit(play_games, seed, start, end, east_or_south, shuffle_seat, duplicate)
+                   for start, end in chunks]
+        for future in as_completed(futures):
+            yield total.merge(future.result())
@@ -0,0 +1,84 @@
+"""
+批量决策的对局调度
+同时运行很多张牌桌，每张牌桌是一个产生Decision的生成器(Table.game_steps)
+每一步收集所有牌桌上等待的决定，按照agent分组，每个BatchAgent只调用一次batch_response，
+普通的Agent则逐个调用，然后把回应送回各自的牌桌，推进到下一个决定
+
+    scheduler = BatchScheduler([model, model, model, model], n_tables=256)
+    stats = scheduler.run(100000)
+"""
+from agent.BatchAgent import BatchAgent
+from runner import GameStats, game_setup
+from table import Table
+
+
+class BatchScheduler:
+    """
+    批量决策的调度器
+    """
+
+    def __init__(self, agents, n_tables=256, east_or_south="east", seed=0, shuffle_seat=True, duplicate=False):
+        """
+        :param agents: 四个agent，可以是BatchAgent或者Agent，同一个agent可以出现在多个位置
+        :param n_tables: 同时运行的牌桌数，也是每个BatchAgent一次最多收到的决定数的量级
+        :param east_or_south: "east"是东风战，"south"是半庄战
+        :param seed: 总的随机种子，每场对局的种子和runner相同，由它和对局编号得到
+        :param shuffle_seat: 每场对局是否随机打乱座次
+        :param duplicate: 每4场对局使用相同的牌山并且轮转座次，见runner.game_setup
+        """
+        self.agents = list(agents)
+        self.n_tables = n_tables
+        self.east_or_south = east_or_south
+        self.seed = seed
+        self.shuffle_seat = shuffle_seat
+        self.duplicate = duplicate
+        self.n_started = 0  # 已经开始的对局数，也是下一场对局的编号
+
+    def start_game(self, table, n_games):
+        """
+        在一张牌桌上开始下一场对局
+        :return: (牌桌, 生成器, 第一个决定)，所有对局都已经开始则返回None
+        """
+        if self.n_started >= n_games:
+            return None
+        seed, seat_order = game_setup(self.seed, self.n_started, self.duplicate)
+        steps = table.game_steps(self.agents, self.east_or_south, seed, self.shuffle_seat, seat_order)
+        self.n_started += 1
+        return table, steps, next(steps)
+
+    def run(self, n_games):
+        """
+        进行n_games场对局
+        :return: 所有对局的GameStats，按照agents的位置统计
+        """
+        stats = GameStats()
+        self.n_started = 0
+        pending = [self.start_game(Table(), n_games) for _ in range(min(self.n_tables, n_games))]
+        while pending:
+            # 按照agent分组，同一个agent在所有牌桌和座次上的决定放在一起
+            groups = {}
+            for i, (table, steps, decision) in enumerate(pending):
+                agent = table.agents[decision.player_id]
+                groups.setdefault(id(agent), (agent, []))[1].append(i)
+            responses = [None] * len(pending)
+            for agent, indices in groups.values():
+                if isinstance(agent, BatchAgent):
+                    batch = agent.batch_response([pending[i][2] for i in indices])
+                    for i, response in zip(indices, batch):
+                        responses[i] = response
+                else:
+                    for i in indices:
+                        responses[i] = pending[i][2].ask(agent)
+
+            next_pending = []
+            for (table, steps, decision), response in zip(pending, responses):
+                try:
+                    next_pending.append((table, steps, steps.send(response)))
+                except StopIteration as stop:
+                    # 一场对局结束，统计之后在这张牌桌上开始下一场
+                    stats.add_game(stop.value, table.round_results, table.seat_slots)
+                    entry = self.start_game(table, n_games)
+                    if entry is not None:
+                        next_pending.append(entry)
+            pending = next_pending
+        return stats
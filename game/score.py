@@ -0,0 +1,207 @@
+"""
+和牌的番数、符数以及点数计算
+所有番数和符数组合的点数在导入时预先计算成表，结算的时候只需要查表
+"""
+from tile import minggang, angang, jiagang, dora_index
+from yaku import WinContext, decompositions, evaluate_decomposition, is_yakuhai, seven_pair_form, guoshi_form, \
+    ryanmen, shanpon
+from shanten import is_yaojiu
+
+fu_list = (20, 25) + tuple(range(30, 150, 10))
+
+
+def ceil100(points):
+    return (points + 99) // 100 * 100
+
+
+def base_points(han, fu, yakuman=0):
+    """
+    基本点，满贯及以上按番数封顶
+    """
+    if yakuman:
+        return 8000 * yakuman
+    if han >= 13:
+        return 8000  # 累计役满
+    if han >= 11:
+        return 6000  # 三倍满
+    if han >= 8:
+        return 4000  # 倍满
+    if han >= 6:
+        return 3000  # 跳满
+    if han >= 5:
+        return 2000  # 满贯
+    return min(fu * 2 ** (2 + han), 2000)
+
+
+def payment_entry(base):
+    """
+    从基本点计算各种情况下的支付点数
+    :return: (闲家荣和, 庄家荣和, 闲家自摸时庄家支付, 闲家自摸时闲家支付, 庄家自摸时每家支付)
+    """
+    return ceil100(base * 4), ceil100(base * 6), ceil100(base * 2), ceil100(base), ceil100(base * 2)
+
+
+# payment_table[(番数, 符数)]，5番以上和符数无关，符数记为0
+payment_table = {}
+for _han in range(1, 5):
+    for _fu in fu_list:
+        payment_table[(_han, _fu)] = payment_entry(base_points(_han, _fu))
+for _han in range(5, 14):
+    payment_table[(_han, 0)] = payment_entry(base_points(_han, 0))
+
+# yakuman_payment_table[役满倍数]
+yakuman_payment_table = [payment_entry(base_points(0, 0, yakuman)) for yakuman in range(7)]
+
+
+def lookup_payment(han, fu, yakuman=0):
+    """
+    查表得到支付点数
+    """
+    if yakuman:
+        return yakuman_payment_table[yakuman]
+    if han >= 5:
+        return payment_table[(min(han, 13), 0)]
+    return payment_table[(han, fu)]
+
+
+def count_dora(context: WinContext, dora_indicator, inside_dora_indicator=()):
+    """
+    宝牌、里宝牌和红宝牌的数目
+    :param dora_indicator: 已经翻开的宝牌指示牌
+    :param inside_dora_indicator: 里宝牌指示牌，只有立直的时候才传入
+    """
+    n = 0
+    for indicator in list(dora_indicator) + list(inside_dora_indicator):
+        n += context.all_counts[dora_index[indicator.index]]
+    view = context.view
+    tiles = list(view.hand_tiles)
+    if len(tiles) % 3 == 1:
+        tiles.append(view.action_tile)
+    for meld in view.all_player_melds[view.player_id]:
+        tiles.extend(meld.tiles)
+    n += sum(1 for tile in tiles if tile.red)
+    return n
+
+
+def calculate_fu(context: WinContext, decomposition, is_pinghu):
+    """
+    计算符数
+    :param is_pinghu: 这种解释是否有平和
+    """
+    if decomposition.form == seven_pair_form:
+        return 25
+    if decomposition.form == guoshi_form:
+        return 30
+    if is_pinghu:
+        return 20 if context.tsumo else 30
+
+    fu = 20
+    if context.closed and not context.tsumo:
+        fu += 10  # 门前清荣和
+    if context.tsumo:
+        fu += 2
+
+    kans = {index for meld_type, index in context.melds if meld_type in (minggang, angang, jiagang)}
+    for index in decomposition.threes:
+        three_fu = 2
+        if is_yaojiu[index]:
+            three_fu *= 2
+        if index in decomposition.concealed_threes:
+            three_fu *= 2
+        if index in kans:
+            three_fu *= 4
+        fu += three_fu
+
+    pair = decomposition.pair
+    if pair in (context.seat_wind, context.field_wind):
+        fu += 2 * ((pair == context.seat_wind) + (pair == context.field_wind))
+    elif is_yakuhai(context, pair):
+        fu += 2
+
+    if decomposition.wait not in (ryanmen, shanpon):
+        fu += 2
+
+    if fu == 20:
+        return 30  # 副露的平和型
+    return (fu + 9) // 10 * 10
+
+
+def payments(han, fu, yakuman, winner, loser, banker, n_pon=0, n_richi_bar=0):
+    """
+    计算每一家的点数变化
+    :param winner: 和牌的玩家
+    :param loser: 放铳的玩家，自摸为None
+    :param banker: 庄家
+    :param n_pon: 本场数，每本场300点
+    :param n_richi_bar: 和牌者得到的立直棒数目，每根1000点
+    :return: 四家的点数变化
+    """
+    ron_child, ron_banker, tsumo_from_banker, tsumo_from_child, tsumo_banker_each = lookup_payment(han, fu, yakuman)
+    deltas = [0] * 4
+    if loser is None:
+        for player_id in range(4):
+            if player_id == winner:
+                continue
+            if winner == banker:
+                pay = tsumo_banker_each
+            elif player_id == banker:
+                pay = tsumo_from_banker
+            else:
+                pay = tsumo_from_child
+            pay += 100 * n_pon
+            deltas[player_id] -= pay
+            deltas[winner] += pay
+    else:
+        pay = (ron_banker if winner == banker else ron_child) + 300 * n_pon
+        deltas[loser] -= pay
+        deltas[winner] += pay
+    deltas[winner] += 1000 * n_richi_bar
+    return deltas
+
+
+class ScoreResult:
+    """
+    和牌的结算结果
+    """
+
+    def __init__(self, evaluation, han, fu, n_dora, deltas):
+        self.evaluation = evaluation
+        self.yaku = evaluation.yaku  # [(役的名字, 番数)]，不包括宝牌
+        self.yakuman = evaluation.yakuman
+        self.han = han  # 包括宝牌的番数
+        self.fu = fu
+        self.n_dora = n_dora
+        self.deltas = deltas  # 四家的点数变化
+
+
+def score_hand(view, inside_dora_indicator=(), n_richi_bar=0):
+    """
+    计算和牌的番数、符数和四家的点数变化，在所有解释中选择点数最高的
+    :param view: 和牌时玩家的view，action_tile是和了的牌
+    :param inside_dora_indicator: 里宝牌指示牌，立直和牌时传入
+    :param n_richi_bar: 和牌者得到的立直棒数目
+    :return: ScoreResult，如果不是和牌型或者无役则返回None
+    """
+    context = WinContext(view)
+    n_dora = None
+    best = None
+    best_key = None
+    for decomposition in decompositions(context):
+        evaluation = evaluate_decomposition(context, decomposition)
+        if not evaluation.han:
+            continue
+        if n_dora is None:
+            n_dora = count_dora(context, view.dora_indicator, inside_dora_indicator)
+        fu = calculate_fu(context, decomposition, any(name == "pinghu" for name, _ in evaluation.yaku))
+        han = evaluation.han if evaluation.yakuman else evaluation.han + n_dora
+        key = (lookup_payment(han, fu, evaluation.yakuman)[0], han, fu)
+        if best is None or key > best_key:
+            best = (evaluation, han, fu)
+            best_key = key
+    if best is None:
+        return None
+
+    evaluation, han, fu = best
+    loser = None if context.tsumo else view.action_id
+    deltas = payments(han, fu, evaluation.yakuman, view.player_id, loser, view.banker, view.n_pon, n_richi_bar)
+    return ScoreResult(evaluation, han, fu, 0 if evaluation.yakuman else n_dora, deltas)
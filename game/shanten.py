@@ -0,0 +1,506 @@
+"""
+向听数计算
+普通牌型按照 8 - 2 * 面子数 - 搭子数 - 雀头数 计算，其中面子数和搭子数之和不超过4
+每一种花色的牌型只和自身有关，所以对每一种花色计算出所有可能的(雀头数, 面子数)下最多的搭子数，
+缓存在表中，整手牌只需要把三种数牌和字牌的结果合并起来
+
+shanten的热路径只有查表: 手牌的counts转换成bytes之后按花色切片，直接作为牌型记录的键，
+记录中的摘要向量有编号，两个编号合并的结果也缓存，所以普通牌型是三次合并查表，七对子和国士是记录中计数的求和
+运行python shanten.py测量吞吐量：在CPython 3.11的开发机上，缓存预热之后对随机的13张Hand每秒大约30万到50万次，
+随机器负载波动(原来逐次合并摘要字典的实现约5万次)，传入牌的列表时还需要构造Hand，每秒大约12万次。
+每次调用至少有几次函数调用、bytes转换、四次切片和七次字典查询，单次调用的纯Python实现达不到每秒百万次，
+需要更高的吞吐量时应该使用rule.batch_shanten对整个批次计算
+"""
+from typing import List, Union
+
+from agari_table import encode, part_ranges
+from hand import Hand, to_hand
+from lru_cache import LRUCache
+from tile import Tile, angang
+
+yaojiu_indices = (0, 8, 9, 17, 18, 26, 27, 28, 29, 30, 31, 32, 33)
+is_yaojiu = tuple(index in yaojiu_indices for index in range(34))
+
+# 一种花色的摘要是(雀头数, 面子数, 最多的搭子数)的元组，雀头数不超过1，面子数不超过4
+empty_summary = ((0, 0, 0),)
+
+suit_cache = {}  # 数牌牌型到摘要的缓存，键和和牌查找表相同
+character_cache = {}  # 字牌牌型到摘要的缓存
+
+
+def merge_summary(best, summary, n_mentsu, n_taatsu, n_pair):
+    """
+    在摘要的每一项上加上一个面子、搭子或者雀头，合并到best中
+    :param best: 从(雀头数, 面子数)到最多搭子数的字典
+    """
+    for pair, mentsu, taatsu in summary:
+        pair += n_pair
+        mentsu += n_mentsu
+        if pair > 1 or mentsu > 4:
+            continue
+        taatsu += n_taatsu
+        if best.get((pair, mentsu), -1) < taatsu:
+            best[(pair, mentsu)] = taatsu
+
+
+def part_summary(pattern, is_character, cache):
+    """
+    计算一种花色的摘要
+    每一步从最小的那张牌开始，尝试把它作为孤张、雀头、对子搭子、刻子、顺子、两面或边张搭子、坎张搭子，
+    剩下的牌型递归计算，结果缓存在cache中
+    :param pattern: 这种花色每种牌的数量，会被修改，但是返回时会恢复原状
+    :param is_character: 是否是字牌，字牌不能组成顺子和顺子搭子
+    :param cache: 缓存
+    :return: 摘要
+    """
+    n_kinds = len(pattern)
+    key = encode(pattern, 0, n_kinds)
+    summary = cache.get(key)
+    if summary is not None:
+        return summary
+
+    i = 0
+    while i < n_kinds and pattern[i] == 0:
+        i += 1
+    if i == n_kinds:
+        cache[key] = empty_summary
+        return empty_summary
+
+    best = {}
+    # 孤张
+    pattern[i] -= 1
+    merge_summary(best, part_summary(pattern, is_character, cache), 0, 0, 0)
+    pattern[i] += 1
+
+    # 雀头或者对子搭子
+    if pattern[i] >= 2:
+        pattern[i] -= 2
+        rest = part_summary(pattern, is_character, cache)
+        merge_summary(best, rest, 0, 0, 1)
+        merge_summary(best, rest, 0, 1, 0)
+        pattern[i] += 2
+
+    # 刻子
+    if pattern[i] >= 3:
+        pattern[i] -= 3
+        merge_summary(best, part_summary(pattern, is_character, cache), 1, 0, 0)
+        pattern[i] += 3
+
+    if not is_character:
+        # 顺子以及两面、边张搭子
+        if i + 1 < n_kinds and pattern[i + 1]:
+            if i + 2 < n_kinds and pattern[i + 2]:
+                pattern[i] -= 1
+                pattern[i + 1] -= 1
+                pattern[i + 2] -= 1
+                merge_summary(best, part_summary(pattern, is_character, cache), 1, 0, 0)
+                pattern[i] += 1
+                pattern[i + 1] += 1
+                pattern[i + 2] += 1
+            pattern[i] -= 1
+            pattern[i + 1] -= 1
+            merge_summary(best, part_summary(pattern, is_character, cache), 0, 1, 0)
+            pattern[i] += 1
+            pattern[i + 1] += 1
+
+        # 坎张搭子
+        if i + 2 < n_kinds and pattern[i + 2]:
+            pattern[i] -= 1
+            pattern[i + 2] -= 1
+            merge_summary(best, part_summary(pattern, is_character, cache), 0, 1, 0)
+            pattern[i] += 1
+            pattern[i + 2] += 1
+
+    summary = tuple((pair, mentsu, taatsu) for (pair, mentsu), taatsu in best.items())
+    cache[key] = summary
+    return summary
+
+
+# 牌型记录的缓存，键是这种花色每种牌数量的bytes
+# 记录是(摘要向量的编号, 对子数, 种类数, 幺九牌种类数, 幺九牌对子数)，后四项用于七对子和国士
+# 一种数牌最多只有405350种牌型，字牌43130种，所以这两个缓存和suit_cache、character_cache一样不需要淘汰，
+# 实际对局中出现的牌型要少得多，1000场对局之后数牌约5万种、字牌约5500种，连同摘要的缓存每个进程大约30MB，
+# 之后增长得很慢，所有牌型都出现时的上限大约是它的八倍
+suit_records = {}
+character_records = {}
+
+# 摘要展开成(雀头数 * 5 + 面子数)到最多搭子数的10维向量，-1表示不可能
+# 搭子数截断到4 - 面子数，超过的部分不会计入向听数，所以不同的向量很少，每一种分配一个编号
+# 实际出现的向量只有一百多种，合并的结果最多是编号数的平方，这几个缓存也不需要淘汰
+vector_ids = {}  # 向量到编号
+vectors = []  # 编号到向量
+vector_shanten = []  # 编号到副露数为0~4时普通牌型的向听数
+combined_vectors = {}  # (编号, 编号)到合并之后的向量的编号
+# 有效牌使用的缓存，draw_shanten的键是三元组，长时间运行会一直增长，所以两者都是有界的LRU缓存，装满时合计大约60MB
+draw_records = LRUCache(1 << 16)  # 牌型到摸牌之后的牌型记录，见part_draw_records
+draw_shanten = LRUCache(1 << 17)  # (其他花色合并之后的向量编号, 牌型, 副露数)到摸牌之后普通牌型的向听数
+
+
+def vector_id(vector):
+    """
+    向量的编号，第一次出现时分配编号，并且计算各种副露数下的向听数
+    """
+    result = vector_ids.get(vector)
+    if result is None:
+        result = len(vectors)
+        vector_ids[vector] = result
+        vectors.append(vector)
+        shanten_by_melds = []
+        for n_melds in range(5):
+            best = 8
+            for slot, taatsu in enumerate(vector):
+                pair, mentsu = divmod(slot, 5)
+                mentsu += n_melds
+                if taatsu >= 0 and mentsu <= 4:
+                    best = min(best, 8 - 2 * mentsu - min(taatsu, 4 - mentsu) - pair)
+            shanten_by_melds.append(best)
+        vector_shanten.append(tuple(shanten_by_melds))
+    return result
+
+
+def combine_vectors(a, b):
+    """
+    合并两个向量，结果缓存
+    :param a: 向量的编号
+    :param b: 向量的编号
+    :return: 合并之后的向量的编号
+    """
+    result = combined_vectors.get((a, b))
+    if result is None:
+        vector = [-1] * 10
+        for slot, taatsu in enumerate(vectors[a]):
+            if taatsu < 0:
+                continue
+            for part_slot, part_taatsu in enumerate(vectors[b]):
+                if part_taatsu < 0:
+                    continue
+                pair = slot // 5 + part_slot // 5
+                mentsu = slot % 5 + part_slot % 5
+                if pair > 1 or mentsu > 4:
+                    continue
+                target = pair * 5 + mentsu
+                vector[target] = max(vector[target], min(taatsu + part_taatsu, 4 - mentsu))
+        result = combined_vectors[(a, b)] = vector_id(tuple(vector))
+    return result
+
+
+def part_record(key, is_character):
+    """
+    计算一种花色的牌型记录并缓存
+    :param key: 这种花色每种牌数量的bytes
+    :param is_character: 是否是字牌
+    :return: 记录
+    """
+    pattern = list(key)
+    vector = [-1] * 10
+    for pair, mentsu, taatsu in part_summary(pattern, is_character, character_cache if is_character else suit_cache):
+        vector[pair * 5 + mentsu] = min(taatsu, 4 - mentsu)
+    yaojiu = pattern if is_character else (pattern[0], pattern[8])
+    record = (vector_id(tuple(vector)), sum(n >= 2 for n in pattern), sum(n > 0 for n in pattern),
+              sum(n > 0 for n in yaojiu), sum(n >= 2 for n in yaojiu))
+    (character_records if is_character else suit_records)[key] = record
+    return record
+
+
+def part_keys(counts):
+    """
+    三种数牌和字牌每种牌数量的bytes，作为牌型记录的键
+    :param counts: 34种牌的数量
+    :return:
+    """
+    key = bytes(counts)
+    return key[0:9], key[9:18], key[18:27], key[27:34]
+
+
+def part_records(keys):
+    """
+    三种数牌和字牌的牌型记录
+    :param keys: part_keys的结果
+    :return:
+    """
+    return (suit_records.get(keys[0]) or part_record(keys[0], False),
+            suit_records.get(keys[1]) or part_record(keys[1], False),
+            suit_records.get(keys[2]) or part_record(keys[2], False),
+            character_records.get(keys[3]) or part_record(keys[3], True))
+
+
+def part_draw_records(key, is_character):
+    """
+    一种花色的牌型摸到这种花色的每一种牌之后的牌型记录，结果缓存
+    :param key: 这种花色每种牌数量的bytes
+    :param is_character: 是否是字牌
+    :return: 第i项是摸到第i种牌之后的记录，已经有4张则为None
+    """
+    result = draw_records.get(key)
+    if result is None:
+        records = character_records if is_character else suit_records
+        result = []
+        for i, n in enumerate(key):
+            if n == 4:
+                result.append(None)
+                continue
+            draw_key = key[:i] + bytes((n + 1,)) + key[i + 1:]
+            result.append(records.get(draw_key) or part_record(draw_key, is_character))
+        result = tuple(result)
+        draw_records.put(key, result)
+    return result
+
+
+def part_draw_shanten(partial, key, is_character, n_melds):
+    """
+    一种花色摸到这种花色的每一种牌之后整手牌普通牌型的向听数，结果缓存
+    :param partial: 其他三种花色合并之后的向量编号
+    :param key: 这种花色每种牌数量的bytes
+    :param is_character: 是否是字牌
+    :param n_melds: 副露数
+    :return: 第i项是摸到第i种牌之后的向听数，已经有4张则为None
+    """
+    result = draw_shanten.get((partial, key, n_melds))
+    if result is None:
+        result = tuple(None if record is None else vector_shanten[combine_vectors(partial, record[0])][n_melds]
+                       for record in part_draw_records(key, is_character))
+        draw_shanten.put((partial, key, n_melds), result)
+    return result
+
+
+def seven_pair_shanten_from_counts(counts):
+    """
+    七对子的向听数，六减去对子数，种类不足七种的话还需要额外的牌
+    """
+    n_pairs = 0
+    n_kinds = 0
+    for n in counts:
+        if n:
+            n_kinds += 1
+            if n >= 2:
+                n_pairs += 1
+    return 6 - n_pairs + max(0, 7 - n_kinds)
+
+
+def guoshi_shanten_from_counts(counts):
+    """
+    国士的向听数，十三减去幺九牌的种类数，有幺九牌的对子再减一
+    """
+    n_kinds = 0
+    has_pair = False
+    for index in yaojiu_indices:
+        if counts[index]:
+            n_kinds += 1
+            if counts[index] >= 2:
+                has_pair = True
+    return 13 - n_kinds - has_pair
+
+
+def shanten_from_counts(counts, n_tiles):
+    """
+    三种牌型的向听数的最小值，只有门清的时候才计算七对子和国士
+    :param counts: 34种牌的数量
+    :param n_tiles: 手牌数目
+    :return:
+    """
+    key = bytes(counts)
+    man = suit_records.get(key[0:9]) or part_record(key[0:9], False)
+    pin = suit_records.get(key[9:18]) or part_record(key[9:18], False)
+    suo = suit_records.get(key[18:27]) or part_record(key[18:27], False)
+    character = character_records.get(key[27:34]) or part_record(key[27:34], True)
+    result = vector_shanten[combine_vectors(combine_vectors(man[0], pin[0]), combine_vectors(suo[0], character[0]))][
+        4 - n_tiles // 3]
+    if n_tiles >= 13:
+        seven_pair = 6 - man[1] - pin[1] - suo[1] - character[1] + \
+                     max(0, 7 - man[2] - pin[2] - suo[2] - character[2])
+        guoshi = 13 - man[3] - pin[3] - suo[3] - character[3] - (man[4] + pin[4] + suo[4] + character[4] > 0)
+        result = min(result, seven_pair, guoshi)
+    return result
+
+
+def normal_shanten(tiles: Union[Hand, List[Tile]]):
+    """
+    普通牌型的向听数
+    :param tiles: 手牌，可以是牌的列表或者Hand
+    :return: 向听数，和牌是-1，听牌是0
+    """
+    hand = to_hand(tiles)
+    man, pin, suo, character = part_records(part_keys(hand.counts))
+    return vector_shanten[combine_vectors(combine_vectors(man[0], pin[0]), combine_vectors(suo[0], character[0]))][
+        4 - len(hand) // 3]
+
+
+def seven_pair_shanten(tiles: Union[Hand, List[Tile]]):
+    """
+    七对子的向听数，副露之后无法七对子，返回一个足够大的数
+    :param tiles: 手牌，可以是牌的列表或者Hand
+    :return:
+    """
+    hand = to_hand(tiles)
+    if len(hand) < 13:
+        return 8
+    return seven_pair_shanten_from_counts(hand.counts)
+
+
+def guoshi_shanten(tiles: Union[Hand, List[Tile]]):
+    """
+    国士的向听数，副露之后无法国士，返回一个足够大的数
+    :param tiles: 手牌，可以是牌的列表或者Hand
+    :return:
+    """
+    hand = to_hand(tiles)
+    if len(hand) < 13:
+        return 13
+    return guoshi_shanten_from_counts(hand.counts)
+
+
+def shanten(tiles: Union[Hand, List[Tile]]):
+    """
+    向听数，取普通牌型、七对子、国士中的最小值
+    :param tiles: 手牌，可以是牌的列表或者Hand
+    :return: 向听数，和牌是-1，听牌是0
+    """
+    hand = to_hand(tiles)
+    return shanten_from_counts(hand.counts, len(hand))
+
+
+def visible_counts(view):
+    """
+    统计玩家视角能看到的每种牌的数量：自己的手牌、所有人的牌河、所有人的副露、宝牌指示牌
+    被鸣走的牌留在牌河中，副露中的这张牌(offer_flag标记，暗杠除外)不再重复计数，每种牌最多计为4张
+    :param view: 牌桌的view
+    :return: 34种牌的数量
+    """
+    counts = [0] * 34
+    for tile in view.hand_tiles:
+        counts[tile.index] += 1
+    for discard_tiles in view.all_player_discard_tiles:
+        for tile in discard_tiles:
+            counts[tile.index] += 1
+    for melds in view.all_player_melds:
+        for meld in melds:
+            for i, tile in enumerate(meld.tiles):
+                if i != meld.offer_flag or meld.meld_type == angang:
+                    counts[tile.index] += 1
+    for tile in view.dora_indicator:
+        counts[tile.index] += 1
+    return [min(n, 4) for n in counts]
+
+
+def effective_from_keys(keys, records, n_tiles, visible):
+    """
+    计算3n+1张手牌摸哪些牌可以减少向听数
+    摸牌只会改变一种花色，所以先合并其他三种花色的向量，这种花色摸每一种牌之后的向听数从缓存中整体取出
+    七对子和国士只需要维护对子数和种类数，每摸一张牌O(1)更新
+    :param keys: 三种数牌和字牌每种牌数量的bytes，见part_keys
+    :param records: 和keys对应的牌型记录
+    :param n_tiles: 手牌数目
+    :param visible: 34种牌中已经能看到的数量，包括自己的手牌
+    :return: (向听数, 有效牌的编号列表, 有效牌的剩余枚数)
+    """
+    ids = [record[0] for record in records]
+    closed = n_tiles >= 13
+    n_pairs = sum(record[1] for record in records)
+    n_kinds = sum(record[2] for record in records)
+    n_yaojiu_kinds = sum(record[3] for record in records)
+    n_yaojiu_pairs = sum(record[4] for record in records)
+
+    current = vector_shanten[combine_vectors(combine_vectors(ids[0], ids[1]), combine_vectors(ids[2], ids[3]))][
+        4 - n_tiles // 3]
+    if closed:
+        current = min(current, 6 - n_pairs + max(0, 7 - n_kinds), 13 - n_yaojiu_kinds - (n_yaojiu_pairs > 0))
+
+    n_melds = 4 - (n_tiles + 1) // 3
+    # 摸一张牌最多让七对子和国士的向听数减少一，不可能比现在更好的时候不需要逐张计算
+    check_special = closed and min(6 - n_pairs + max(0, 7 - n_kinds),
+                                   13 - n_yaojiu_kinds - (n_yaojiu_pairs > 0)) - 1 < current
+    result = []
+    n_remain = 0
+    for part, (start, end) in enumerate(part_ranges):
+        others = [ids[other] for other in range(4) if other != part]
+        partial = combine_vectors(combine_vectors(others[0], others[1]), others[2])
+        key = keys[part]
+        for i, result_shanten in enumerate(part_draw_shanten(partial, key, start == 27, n_melds)):
+            if result_shanten is None:
+                continue
+            index = start + i
+            if check_special:
+                n = key[i]
+                seven_pair = 6 - n_pairs - (n == 1) + max(0, 7 - n_kinds - (n == 0))
+                if is_yaojiu[index]:
+                    guoshi = 13 - n_yaojiu_kinds - (n == 0) - (n_yaojiu_pairs > 0 or n == 1)
+                else:
+                    guoshi = 13 - n_yaojiu_kinds - (n_yaojiu_pairs > 0)
+                result_shanten = min(result_shanten, seven_pair, guoshi)
+            if result_shanten < current:
+                result.append(index)
+                n_remain += max(0, 4 - visible[index])
+    return current, result, n_remain
+
+
+def effective_tiles(tiles: Union[Hand, List[Tile]], visible=None):
+    """
+    3n+1张手牌的有效牌
+    :param tiles: 手牌，可以是牌的列表或者Hand
+    :param visible: 34种牌中已经能看到的数量，包括自己的手牌，可以由visible_counts得到。默认只考虑自己的手牌
+    :return: (向听数, 有效牌的集合, 有效牌的剩余枚数)
+    """
+    hand = to_hand(tiles)
+    counts = hand.counts
+    if visible is None:
+        visible = counts
+    keys = part_keys(counts)
+    current, result, n_remain = effective_from_keys(keys, part_records(keys), len(hand), visible)
+    return current, {Tile.from_index(index) for index in result}, n_remain
+
+
+def discard_effective_tiles(tiles: Union[Hand, List[Tile]], visible=None):
+    """
+    3n+2张手牌打出每一种牌之后的有效牌
+    打出一张牌只会改变一种花色的牌型，其他花色的记录以及它们合并的结果在所有候选之间共享，
+    只有打出的牌所在的花色需要查打出之后的记录和摸牌之后的记录，这些记录也都是缓存的
+    :param tiles: 手牌，可以是牌的列表或者Hand
+    :param visible: 34种牌中已经能看到的数量，包括自己的手牌，可以由visible_counts得到。默认只考虑自己的手牌
+    :return: 从打出的牌到(打出之后的向听数, 有效牌的集合, 有效牌的剩余枚数)的字典
+    """
+    hand = to_hand(tiles)
+    if visible is None:
+        visible = list(hand.counts)
+    keys = part_keys(hand.counts)
+    records = part_records(keys)
+
+    result = {}
+    for part, (start, end) in enumerate(part_ranges):
+        is_character = start == 27
+        part_table = character_records if is_character else suit_records
+        key = keys[part]
+        for i, n in enumerate(key):
+            if n == 0:
+                continue
+            discard_key = key[:i] + bytes((n - 1,)) + key[i + 1:]
+            discard_record = part_table.get(discard_key) or part_record(discard_key, is_character)
+            current, indices, n_remain = effective_from_keys(keys[:part] + (discard_key,) + keys[part + 1:],
+                                                             records[:part] + (discard_record,) + records[part + 1:],
+                                                             len(hand) - 1, visible)
+            result[Tile.from_index(start + i)] = (current, {Tile.from_index(index) for index in indices}, n_remain)
+    return result
+
+
+if __name__ == "__main__":
+    # 吞吐量的基准测试，模块文档中的数字由这里测得
+    import random
+    import time
+
+    rng = random.Random(0)
+    all_tiles = [Tile.from_index(index) for index in range(34) for _ in range(4)]
+    hands = [Hand(rng.sample(all_tiles, 13)) for _ in range(20000)]
+    lists = [hand.tiles() for hand in hands]
+    for hand in hands:
+        shanten(hand)
+    for name, inputs in (("Hand", hands), ("list", lists)):
+        start = time.perf_counter()
+        for tiles in inputs:
+            shanten(tiles)
+        print(f"shanten({name}): {len(inputs) / (time.perf_counter() - start):.0f}/s")
+    hands = [Hand(rng.sample(all_tiles, 14)) for _ in range(1000)]
+    for hand in hands:
+        discard_effective_tiles(hand)
+    start = time.perf_counter()
+    for hand in hands:
+        discard_effective_tiles(hand)
+    print(f"discard_effective_tiles: {len(hands) / (time.perf_counter() - start):.0f}/s")
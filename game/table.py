@@ -1,16 +1,70 @@
 import random
-from copy import deepcopy
 from typing import List
 
 from agent import Agent
-from game import Tile
+from call_options import discard_call_options, find_call_option
+from hand import Hand
+from meld import Meld
+from tile import Tile, mo, qie, chi, peng, minggang, angang, jiagang
 from player import Player
+from wall import Wall, round_seed
+from shanten import is_yaojiu
+
+
+class ReadOnlyList:
+    """
+    列表的只读代理，不复制原来的列表，原来的列表变化之后代理看到的内容也会变化
+    """
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        return self.data[index]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __contains__(self, item):
+        return item in self.data
+
+    def __eq__(self, other):
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __add__(self, other):
+        # 和列表相加得到新的列表，原来的列表不受影响
+        return list(self.data) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self.data)
+
+    def __repr__(self):
+        return repr(self.data)
+
+    def index(self, item):
+        return self.data.index(item)
+
+    def count(self, item):
+        return self.data.count(item)
 
 
 class View:
     """
     玩家所能够看到的view
+    View是只读的，牌桌生成的View不复制牌桌的状态，列表类型的字段是牌桌上对应列表的只读代理
+    所以View只在作出决定的时候有效，牌桌继续进行之后内容会跟着变化，需要保存的话应该自己复制
     """
+    __slots__ = ("player_id", "action_id", "action", "action_tile", "hand_tiles", "all_player_melds",
+                 "all_player_discard_tiles", "all_player_point_bar", "east_or_south", "field_number", "n_pon",
+                 "field_wind", "banker", "dora_indicator", "n_wall_tiles", "discard_tiles", "n_richi_bar",
+                 "richi_flag", "yifa_flag", "lianglizhi_flag", "all_player_tsumogiri_flags", "richi_discard_index")
 
     def __init__(self,
                  player_id,
@@ -32,27 +86,88 @@ class View:
                  n_richi_bar,
                  richi_flag,
                  yifa_flag,
-                 lianglizhi_flag):
-        self.player_id = player_id
+                 lianglizhi_flag,
+                 all_player_tsumogiri_flags=None,
+                 richi_discard_index=None):
+        # View是只读的，所以只能通过object.__setattr__初始化
+        set_field = object.__setattr__
+        set_field(self, "player_id", player_id)
+        set_field(self, "action_id", action_id)
+        set_field(self, "action", action)
+        set_field(self, "action_tile", action_tile)
+        set_field(self, "hand_tiles", hand_tiles)
+        set_field(self, "all_player_melds", all_player_melds)
+        set_field(self, "all_player_discard_tiles", all_player_discard_tiles)
+        set_field(self, "all_player_point_bar", all_player_point_bar)
+        set_field(self, "east_or_south", east_or_south)
+        set_field(self, "field_number", field_number)
+        set_field(self, "n_pon", n_pon)
+        set_field(self, "field_wind", field_wind)
+        set_field(self, "banker", banker)
+        set_field(self, "dora_indicator", dora_indicator)
+        set_field(self, "n_wall_tiles", n_wall_tiles)
+        set_field(self, "discard_tiles", discard_tiles)
+        set_field(self, "n_richi_bar", n_richi_bar)
+        set_field(self, "richi_flag", richi_flag)
+        set_field(self, "yifa_flag", yifa_flag)
+        set_field(self, "lianglizhi_flag", lianglizhi_flag)
+        set_field(self, "all_player_tsumogiri_flags", all_player_tsumogiri_flags)  # 每一家牌河中的每张牌是否是摸切
+        set_field(self, "richi_discard_index", richi_discard_index)  # 每一家立直宣言牌在牌河中的位置，没有立直为None
+
+    def __setattr__(self, name, value):
+        raise AttributeError("View是只读的")
+
+
+class RoundResult:
+    """
+    一局的结果
+    """
+
+    def __init__(self, kind, reason=None, winner=None, loser=None, score=None, deltas=None, tenpai=None):
+        self.kind = kind  # "zimo"自摸，"rong"荣和，"huangpai"荒牌流局，"liuju"途中流局
+        self.reason = reason  # 途中流局的原因，"jiuzhongjiupai"、"sifenglianda"、"sijializhi"或者"sigangsanle"
+        self.winner = winner
+        self.loser = loser  # 放铳的玩家，自摸为None
+        self.score = score  # score.ScoreResult
+        self.deltas = deltas  # 四家的点数变化，不包括立直时支付的立直棒
+        self.tenpai = tenpai  # 荒牌流局时每家是否听牌
+
+
+class Decision:
+    """
+    一次需要agent作出的决定
+    牌桌在等待决定的时候不会变化，所以view可以在真正需要的时候再构造
+    """
+
+    def __init__(self, table, kind, player_id, action_id, action, tile, lingshang=False, meld=None, options=None):
+        self.table = table
+        self.kind = kind  # "draw"对应draw_response，"discard"对应discard_response，"meld"对应meld_response
+        self.player_id = player_id  # 需要作出决定的玩家
         self.action_id = action_id
         self.action = action
-        self.action_tile = action_tile
-        self.hand_tiles = hand_tiles
-        self.all_player_melds = all_player_melds
-        self.all_player_discard_tiles = all_player_discard_tiles
-        self.all_player_point_bar = all_player_point_bar
-        self.east_or_south = east_or_south
-        self.field_number = field_number
-        self.n_pon = n_pon
-        self.field_wind = field_wind
-        self.banker = banker
-        self.dora_indicator = dora_indicator
-        self.n_wall_tiles = n_wall_tiles
-        self.discard_Tiles = discard_tiles
-        self.n_richi_bar = n_richi_bar
-        self.richi_flag = richi_flag
-        self.yifa_flag = yifa_flag
-        self.lianglizhi_flag = lianglizhi_flag
+        self.tile = tile
+        self.lingshang = lingshang
+        self.meld = meld  # 被抢的杠
+        self.options = options  # 别家切牌时能够进行的副露，格式见call_options.discard_call_options
+
+    def view(self):
+        """
+        需要作出决定的玩家的view
+        """
+        return self.table.player_view(self.player_id, self.action_id, self.action, self.tile)
+
+    def ask(self, agent):
+        """
+        调用agent对应的函数得到决定，只有需要view的agent才构造view
+        """
+        state = self.view() if agent.need_view else None
+        if self.kind == "draw":
+            if self.tile is None:
+                return agent.draw_response(state, None)
+            return agent.draw_response(state, self.tile, lingshang=self.lingshang)
+        if self.kind == "discard":
+            return agent.discard_response(state, self.tile)
+        return agent.meld_response(state, self.meld)
 
 
 class Table:
@@ -63,8 +178,10 @@ class Table:
     Player和Agent放在哪个位置，就坐在哪个位置
     """
 
-    def __init__(self):
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)  # 洗牌和座次使用的随机数生成器，每张桌子独立，相同的种子得到相同的对局
         self.agents: List[Agent] = []  # bot主体，必须是Agent类的实例
+        self.seat_slots: List[int] = [0, 1, 2, 3]  # 每个座次上的agent在传给play_game的agents中的位置
         self.players: List[Player] = []  # 用于模拟对局的Player，必须是Player的实例
 
         self.east_or_south: str = "east"  # 指示是东风局或者南风局。用"east"标注东风局，用"south"标注南风局
@@ -73,19 +190,42 @@ class Table:
         self.n_pon: int = 0  # 本场数，起始应该是0
         self.banker: int = 0  # 当前局的庄家，对应的Player的wind应该是东风
 
-        self.lingshang_tiles: List[Tile] = []  # 岭上牌，初始化的时候共四张
-        self.lingshang_discard_tiles: List[Tile] = []  # 由于开杠，导致牌墙最后一张被移入王牌堆，无法被摸到的牌。初始化的时候是空列表
-
-        self.dora_indicator: List[Tile] = []  # 宝牌指示牌，初始化的时候应当有5张
-        self.inside_dora_indicator: List[Tile] = []  # 里宝牌指示牌，初始化的时候应该有5章
-        self.dora_indicator_flag: List[bool] = []  # 宝牌指示牌是否被翻开
-
-        self.wall_tiles: List[Tile] = []  # 用于摸牌的牌墙
+        self.wall: Wall = Wall()  # 牌山，包括岭上牌、宝牌指示牌和里宝牌指示牌，每局原地打乱
+        self.game_seed: int = None  # 这一场对局的种子，每一局的牌山由它和局的编号决定，None则使用rng当前的状态
+        self.round_walls: List[tuple] = None  # 预先生成的每一局的牌山，优先于game_seed
+        self.log = None  # 牌谱，比如game_log.GameLogWriter，不是None的时候对局中的每个事件都会被记录
         self.discard_tiles: List[Tile] = []  # 每一家弃掉的牌，应当是列表类型，一个列表中包含四个列表，依次排布
         self.n_richi_bar: int = 0  # 除了场上的立直棒，由于流局累积的立直棒数目
         self.richi_flag: List[bool] = []  # 标志每一家是否立直。
         self.yifa_flag: List[bool] = []  # 标记一发
         self.lianglizhi_flag: List[bool] = []  # 标记两立直，如果第一巡有人鸣牌或者超过了第一巡，将flag重置为False
+        self.richi_discard_index: List[int] = []  # 每一家立直宣言牌在牌河中的位置，没有立直为None
+        # 上面的标记在一局之中只原地修改，不替换成新的列表，这样View中的只读代理可以在一局之中共享
+
+        # 每一家的派生状态，在摸牌、切牌、副露和开杠的时候增量更新，规则判断不需要重新遍历手牌、副露和牌河
+        self.hands: List[Hand] = []  # 每一家手牌的计数，和Player的hand_tiles同步
+        self.closed_flag: List[bool] = []  # 每一家是否门清，暗杠不破坏门清
+        self.n_kan: List[int] = []  # 每一家开杠的数目
+        self.discard_counts: List[List[int]] = []  # 每一家牌河中每种牌的数目，用来判断舍牌振听
+        self.visible_counts: List[List[int]] = []  # 每一家能看到的每种牌的数目，和shanten.visible_counts的结果相同
+        self.waits: List[frozenset] = [frozenset()] * 4  # 每一家手牌(3n+1张)的听牌，手牌变化之后更新
+        self.discard_furiten_flag: List[bool] = []  # 舍牌振听，听牌或者牌河变化之后更新
+        self.furiten_flag: List[bool] = []  # 见逃荣和导致的同巡振听，立直之后见逃则一直振听
+        self.ron_index: List[int] = [0] * 34  # 每种牌能够荣和的玩家，用座次的二进制位表示，只包括听这张牌并且没有振听的玩家
+        self.ron_kinds: List[tuple] = [()] * 4  # 每一家在ron_index中登记的牌种
+        self.called_flag: List[bool] = []  # 每一家打出的牌是否被别家鸣过，用来判断流局满贯
+        self.kan_action = None  # 摸岭上牌时对应的杠的种类
+        self.round_result: RoundResult = None  # 最近一局的结果
+        self.round_results: List[RoundResult] = []  # 这一场对局每一局的结果
+
+        # 所有View共享的只读代理，每一局开始的时候由share_views重新生成
+        self.view_players: List[Player] = None
+        self.hand_views = ()
+        self.meld_views = ()
+        self.discard_views = ()
+        self.tsumogiri_views = ()
+        self.flag_views = ()
+        self.discard_tiles_view = None
 
     def player_view(self, player_id, action_id, action, action_tile):
         """
@@ -104,46 +244,124 @@ class Table:
             3. （其他人id，打出牌，打出的牌）
             4. （其他人id，加杠或者暗杠，杠的牌）
 
+        View不复制牌桌的状态，手牌、副露、牌河和各种标记都是共享的只读代理，只有点棒和宝牌指示牌是新的元组
+
         :return: encoded information
         """
+        if self.view_players is not self.players:
+            self.share_views()
+        richi_flag, yifa_flag, lianglizhi_flag, richi_discard_index = self.flag_views
         return View(
             player_id=player_id,
-            hand_tiles=deepcopy(self.players[player_id].hand_tiles),
+            hand_tiles=self.hand_views[player_id],
             action_id=action_id,
             action=action,
             action_tile=action_tile,
-            all_player_melds=[player.melds for player in self.players],
-            all_player_discard_tiles=[player.discard_tiles for player in self.players],
-            all_player_point_bar=[player.point_bar for player in self.players],
+            all_player_melds=self.meld_views,
+            all_player_discard_tiles=self.discard_views,
+            all_player_point_bar=tuple(player.point_bar for player in self.players),
 
             east_or_south=self.east_or_south,
             field_number=self.field_number,
             n_pon=self.n_pon,
             field_wind=self.field_wind,
             banker=self.banker,
-            dora_indicator=[tile for tile, flag in zip(self.dora_indicator, self.dora_indicator_flag) if flag],
-            n_wall_tiles=deepcopy(self.wall_tiles),
-            discard_tiles=deepcopy(self.discard_tiles),
+            dora_indicator=self.wall.dora_indicators(),
+            n_wall_tiles=len(self.wall),
+            discard_tiles=self.discard_tiles_view,
             n_richi_bar=self.n_richi_bar,
-            richi_flag=deepcopy(self.richi_flag),
-            yifa_flag=deepcopy(self.yifa_flag),
-            lianglizhi_flag=deepcopy(self.lianglizhi_flag)
+            richi_flag=richi_flag,
+            yifa_flag=yifa_flag,
+            lianglizhi_flag=lianglizhi_flag,
+            all_player_tsumogiri_flags=self.tsumogiri_views,
+            richi_discard_index=richi_discard_index
         )
 
-    def single_round(self, agents: list):
+    def share_views(self):
+        """
+        生成所有View共享的只读代理
+        玩家的手牌、副露、牌河只在dispence_tiles中替换成新的列表，各种标记只在一局开始的时候替换，
+        所以每一局开始的时候生成一次，一局之中四家的所有View都可以共享
+        """
+        self.view_players = self.players
+        self.hand_views = tuple(ReadOnlyList(player.hand_tiles) for player in self.players)
+        self.meld_views = tuple(ReadOnlyList(player.melds) for player in self.players)
+        self.discard_views = tuple(ReadOnlyList(player.discard_tiles) for player in self.players)
+        self.tsumogiri_views = tuple(ReadOnlyList(player.tsumogiri_flags) for player in self.players)
+        self.flag_views = (ReadOnlyList(self.richi_flag), ReadOnlyList(self.yifa_flag),
+                           ReadOnlyList(self.lianglizhi_flag), ReadOnlyList(self.richi_discard_index))
+        self.discard_tiles_view = ReadOnlyList(self.discard_tiles)
+
+    def drive(self, steps):
+        """
+        使用同步的agent执行一个产生Decision的生成器，每个决定直接调用对应座次的agent
+        :param steps: round_steps、game_steps等生成器
+        :return: 生成器的返回值
+        """
+        try:
+            decision = next(steps)
+            while True:
+                decision = steps.send(decision.ask(self.agents[decision.player_id]))
+        except StopIteration as stop:
+            return stop.value
+
+    def single_round(self, agents: list = None):
         """
         简单的一局，需要完成每家配牌，摸打循环，返回赢家以及赢得点棒数
         需要在上一层中确定当前场风，当前场数，当前庄家，确定agent的座次
-        :param agents: a list of agents
+        :param agents: a list of agents，不传入则使用已经设置好的agents
+        :return: 这一局的结果RoundResult，点棒已经结算完毕
+        """
+        if agents is not None:
+            self.agents = agents
+        return self.drive(self.round_steps())
+
+    def round_steps(self):
+        """
+        一局的生成器，每次需要agent作出决定的时候产生一个Decision，接收agent的回应
+        :return: 这一局的结果RoundResult
+        """
+        self.start_round()
+
+        # 进入摸打循环，每次play_loop返回下一次play_loop的参数，一局结束时返回None
+        loop = (self.banker, True, False)
+        while loop is not None:
+            loop = yield from self.play_loop_steps(*loop)
+        return self.round_result
+
+    def start_round(self, wall_ids=None):
+        """
+        一局开始，分发所有的牌，重置这一局的标记和派生状态
+        :param wall_ids: 指定这一局的牌山，回放牌谱的时候使用，None则由dispence_tiles决定
         """
-        # TODO: Player需要在上一次层创建
         # 分发所有的牌，并且准备好所有人的手牌，初始化岭上牌
-        self.dispence_tiles()
-        # TODO: 点棒的分发需要在上一层完成
-        # 进入摸打循环
+        self.dispence_tiles(wall_ids)
+        self.richi_flag = [False] * 4
+        self.yifa_flag = [False] * 4
+        self.lianglizhi_flag = [False] * 4
+        self.richi_discard_index = [None] * 4
+        self.furiten_flag = [False] * 4
+        self.called_flag = [False] * 4
+        self.kan_action = None
+        self.round_result = None
+        self.share_views()
+        for player_id, player in enumerate(self.players):
+            player.self_wind = (player_id - self.banker) % 4
+        self.init_tracking()
+        if self.log is not None:
+            self.log.round_start(self)
 
     def settlement(self, result, player_id):
-        raise NotImplementedError
+        """
+        和牌结算，按照结算结果修改每家的点棒
+        立直棒在结算结果中已经算给了和牌的玩家，所以清空场上的立直棒
+        :param result: score.score_hand返回的结算结果
+        :param player_id: 和牌的玩家
+        """
+        for player, delta in zip(self.players, result.deltas):
+            player.point_bar += delta
+        self.n_richi_bar = 0
+        self.richi_flag[:] = [False] * 4
 
     def play_loop(self, player_id, draw=True, lingshang=False):
         """
@@ -153,100 +371,549 @@ class Table:
         1. 自摸: 在可以胡牌的情况下直接自摸，结束
            这个可能符合岭上，因为岭上牌摸牌也会进入这个play_loop
         2. 流局: 第一次摸牌，九种九牌，结束
-        3. 开暗杠: 摸到的牌可以开一次暗杠
+        3. 开暗杠或者加杠: 摸到的牌可以开杠
         4. 立直: 打出立直棒宣布立直
         5. 切牌
 
-        开暗杠会导致三种结果:
-        1. 开杠成功，摸一张牌，再次进入play_loop
-        2. 有人抢杠国士，荣胡，结束
+        开杠会导致两种结果:
+        1. 开杠成功，摸一张岭上牌，再次进入play_loop
+        2. 有人抢杠(暗杠只能被国士抢)，荣胡，结束
 
         立直或者切牌会导致四种结果：
         1. 荣胡: 让其他一家胡牌，结束
         2. 流局: 结束
-                四风连打，
-                或者当前已经翻开了四张宝牌指示牌，打出之后无人胡牌，导致四杠散了
+                四风连打，四家立直，
+                或者当前已经开了四个杠(不是同一家)，打出之后无人胡牌，导致四杠散了
                 或者打出了最后一张牌并且没有人胡牌，普通的荒牌，这种情况需要结算流局满贯
-        3. 副露: 让其他一家副露，进入其他人的回合并且不摸牌，再次进入play_loop
+        3. 副露: 让其他一家副露，进入其他人的回合并且不摸牌(大明杠摸岭上牌)，再次进入play_loop
         4. 无事发生，变更到下一个人的回合，再次进入play_loop
 
         如果有人荣胡或者流局，那么立直不成功，不需要放立直棒
 
-        有人副露会导致以下可能:
-        1. 变更到下一个玩家的回合，再次进入其他人的play_loop
-        2. 杠牌摸一张岭上牌，变更到下一个玩家的回合，进入其他人的play_loop
-        2. 有人抢杠和牌，结束
-
         所有的结束都会进入调用结算的函数。
+        为了避免递归，play_loop不直接调用下一次play_loop，而是返回下一次的参数，由single_round循环调用
 
         :param player_id: 当前的进行动作的agent的编号
-        :param draw: 是否摸牌，因为如果是由于副露进入当前玩家回合，是不摸牌的。
-                     一个例外是如果杠牌，那么在进入这个人的回合之前，先把岭上牌放进去
+        :param draw: 是否摸牌，因为如果是由于副露进入当前玩家回合，是不摸牌的，这时agent收到的tile是None，只能切牌
         :param lingshang: 指示摸牌是否是岭上牌
+        :return: 下一次play_loop的参数(player_id, draw, lingshang)，一局结束则返回None，结果保存在round_result中
+        """
+        return self.drive(self.play_loop_steps(player_id, draw, lingshang))
+
+    def play_loop_steps(self, player_id, draw=True, lingshang=False):
+        """
+        play_loop的生成器版本，需要agent作出决定的时候产生Decision
         """
         cur_player: Player = self.players[player_id]
-        cur_agent: Agent = self.agents[player_id]
         if draw:
             # 如果摸牌，从牌山取出一张放入Player的手牌
             # 摸牌顺序是弹出最后一张，实现起来代价低
-            draw_tile = self.wall_tiles.pop()
-            cur_player.hand_tiles.append(draw_tile)
-            response = cur_agent.draw_response(draw_tile, lingshang=lingshang)
-            if response[0] == "zimo":
-                if self.can_zimo(player_id):
-                    # TODO: self.settlement()
-                    return
-                else:
-                    raise ValueError(f"玩家{player_id}诈和自摸")
-            elif response[0] == "liuju":
-                # TODO: 检查是否可以九种九牌流局
-                if ...:
-                    # TODO: self.settlement()
-                    return
-                else:
-                    raise ValueError(f"玩家{player_id}错误九种九牌流局")
-            elif response[0] == "angang":
-                # TODO: 检查是否可以暗杠
-                if ...:
-                    # TODO: self.settlement()
-                    return
-                else:
-                    raise ValueError(f"玩家{player_id}非法开暗杠")
-            elif response[0] == "lizhi":
-                # TODO: 判断是否可以立直
-                if ...:
-                    # TODO: self.settlement()
-                    return
-                else:
-                    raise ValueError(f"玩家{player_id}非法立直")
-            elif response[0] == "qiepai":
-                # TODO: 是不是response[1]
-                cur_player.discard_tiles.append(response[1])
+            if lingshang:
+                draw_tile = self.wall.draw_lingshang()
+                action = self.kan_action
+            else:
+                draw_tile = self.wall.draw()
+                action = mo
+            self.add_hand_tile(player_id, draw_tile)
+            if self.log is not None:
+                self.log.draw(player_id, draw_tile, lingshang)
+            response = yield Decision(self, "draw", player_id, player_id, action, draw_tile, lingshang)
+        else:
+            action = None
+            draw_tile = None
+            response = yield Decision(self, "draw", player_id, player_id, cur_player.melds[-1].meld_type, None)
+
+        operation, target = response
+        if operation == "zimo":
+            can, result = self.can_zimo(player_id, action) if draw else (False, None)
+            if not can:
+                raise ValueError(f"玩家{player_id}诈和自摸")
+            self.settlement(result, player_id)
+            return self.end_round(RoundResult("zimo", winner=player_id, score=result, deltas=result.deltas))
+        elif operation == "liuju":
+            if not draw or not self.can_jiuzhongjiupai(player_id):
+                raise ValueError(f"玩家{player_id}错误九种九牌流局")
+            return self.abort("jiuzhongjiupai")
+        elif operation in ("angang", "jiagang"):
+            if not draw or not self.can_gang(player_id, operation, target):
+                raise ValueError(f"玩家{player_id}非法开杠")
+            return (yield from self.declare_gang_steps(player_id, operation, target))
+        elif operation == "lizhi":
+            if not draw or not self.can_lizhi(player_id, target):
+                raise ValueError(f"玩家{player_id}非法立直")
+            return (yield from self.discard_steps(player_id, target, lizhi=True,
+                                                  tsumogiri=is_same_tile(target, draw_tile)))
+        elif operation == "qiepai":
+            tsumogiri = is_same_tile(target, draw_tile)
+            if self.richi_flag[player_id] and not tsumogiri:
+                raise ValueError(f"玩家{player_id}立直之后只能摸切")
+            return (yield from self.discard_steps(player_id, target, tsumogiri=tsumogiri))
+        raise ValueError(f"玩家{player_id}未知的操作{operation}")
+
+    def discard_steps(self, player_id, tile, lizhi=False, tsumogiri=False):
+        """
+        切牌，然后依次处理荣和、立直成立、途中流局、副露和荒牌流局
+        只询问能够荣和或者副露的玩家，荣和优先于碰和杠，碰和杠优先于吃
+        荣和有多家的时候只有按照座次离放铳者最近的一家和牌
+        :param lizhi: 是否是宣布立直时打出的牌
+        :param tsumogiri: 是否是摸切
+        :return: 下一次play_loop的参数，一局结束则返回None
+        """
+        tile = self.discard_tile(player_id, tile, lizhi, tsumogiri)
+
+        last_tile = not self.wall
+        ron_mask = self.ron_candidates(tile)
+        can_kan = self.can_draw_lingshang()
+        rong_results = {}
+        responses = {}
+        call_options = {}
+        for offset in (1, 2, 3):
+            other_id = (player_id + offset) % 4
+            can_rong = False
+            if ron_mask >> other_id & 1:
+                can_rong, result = self.can_rong(other_id, player_id, qie, tile)
+                if can_rong:
+                    rong_results[other_id] = result
+            options = []
+            if not last_tile and not self.richi_flag[other_id]:
+                options = call_options[other_id] = discard_call_options(self.hands[other_id], tile, offset == 1,
+                                                                        can_kan)
+            if can_rong or options:
+                response = yield Decision(self, "discard", other_id, player_id, qie, tile, options=options)
+                responses[other_id] = response or ("pass", None)
+
+        # 荣和
+        for offset in (1, 2, 3):
+            other_id = (player_id + offset) % 4
+            if other_id in responses and responses[other_id][0] == "rong":
+                if other_id not in rong_results:
+                    raise ValueError(f"玩家{other_id}诈和荣和")
+                result = rong_results[other_id]
+                self.settlement(result, other_id)
+                return self.end_round(RoundResult("rong", winner=other_id, loser=player_id, score=result,
+                                                  deltas=result.deltas))
+        # 听这张牌却没有和牌的玩家都进入同巡振听，包括因为没有役不能荣和的玩家
+        for offset in (1, 2, 3):
+            other_id = (player_id + offset) % 4
+            if ron_mask >> other_id & 1:
+                self.set_furiten(other_id)
+
+        # 没有人荣和，立直成立
+        if lizhi:
+            self.accept_lizhi(player_id)
+            if all(self.richi_flag):
+                return self.abort("sijializhi")
+
+        # 途中流局
+        if all(len(other.discard_tiles) == 1 and not other.melds for other in self.players) and \
+                27 <= tile.index <= 30 and all(other.discard_tiles[0] == tile for other in self.players):
+            return self.abort("sifenglianda")
+        if self.n_gang() == 4 and sum(1 for n in self.n_kan if n) > 1:
+            return self.abort("sigangsanle")
+
+        # 副露，碰和杠优先于吃
+        for operation in ("peng", "minggang", "chi"):
+            for offset in (1, 2, 3):
+                other_id = (player_id + offset) % 4
+                if other_id in responses and responses[other_id][0] == operation:
+                    return self.call(other_id, player_id, operation, tile, responses[other_id][1],
+                                     call_options.get(other_id, ()))
+
+        if last_tile:
+            return self.tie()
+        return (player_id + 1) % 4, True, False
+
+    def discard_tile(self, player_id, tile, lizhi=False, tsumogiri=False):
+        """
+        从手牌中打出一张牌放入牌河，更新这一家的听牌和振听
+        :return: 打出的牌，优先是红宝牌标记也相同的牌
+        """
+        player = self.players[player_id]
+        position = find_tile(player.hand_tiles, tile)
+        if position < 0:
+            raise ValueError(f"玩家{player_id}切的牌不在手牌中")
+        tile = player.hand_tiles.pop(position)
+        self.reveal_hand_tiles(player_id, (tile,))
+        player.discard_tiles.append(tile)
+        player.tsumogiri_flags.append(tsumogiri)
+        if self.log is not None:
+            self.log.discard(player_id, tile, tsumogiri, lizhi)
+        self.discard_counts[player_id][tile.index] += 1
+        self.yifa_flag[player_id] = False
+        if not self.richi_flag[player_id]:
+            self.furiten_flag[player_id] = False
+        self.update_waits(player_id)
+        return tile
+
+    def accept_lizhi(self, player_id):
+        """
+        立直宣言牌没有被荣和，立直成立，支付立直棒
+        """
+        player = self.players[player_id]
+        self.richi_flag[player_id] = True
+        self.richi_discard_index[player_id] = len(player.discard_tiles) - 1
+        self.yifa_flag[player_id] = True
+        self.lianglizhi_flag[player_id] = len(player.discard_tiles) == 1 and \
+            not any(other.melds for other in self.players)
+        player.point_bar -= 1000
+        if self.log is not None:
+            self.log.riichi(player_id, self.lianglizhi_flag[player_id])
+
+    def call(self, player_id, from_id, operation, tile, target, options=None):
+        """
+        吃、碰或者大明杠别家打出的牌
+        :param player_id: 副露的玩家
+        :param from_id: 打出这张牌的玩家
+        :param target: 手牌中用来副露的牌，None则使用这种副露的第一个选项
+        :param options: 这一家能够进行的副露，不传入则重新列举
+        :return: 下一次play_loop的参数，大明杠之后摸岭上牌，否则不摸牌直接切牌
+        """
+        player = self.players[player_id]
+        if options is None:
+            options = discard_call_options(self.hands[player_id], tile, (player_id - from_id) % 4 == 1,
+                                           self.can_draw_lingshang())
+        option = find_call_option(options, operation, target)
+        if option is None:
+            raise ValueError(f"玩家{player_id}非法副露{operation}")
+        meld_type = {"chi": chi, "peng": peng, "minggang": minggang}[operation]
+        self.form_call(player_id, from_id, meld_type, tile, option[1])
+        if meld_type == minggang:
+            self.open_new_dora_indicator()
+            return player_id, True, True
+        return player_id, False, False
+
+    def form_call(self, player_id, from_id, meld_type, tile, hand_tiles):
+        """
+        用手牌中的牌和别家打出的牌组成副露，不检查是否合法
+        :param hand_tiles: 手牌中用来副露的牌，优先取红宝牌标记也相同的牌
+        :return: 组成的副露
+        """
+        player = self.players[player_id]
+        taken = [player.hand_tiles.pop(find_tile(player.hand_tiles, t)) for t in hand_tiles]
+        self.reveal_hand_tiles(player_id, taken)
+        if meld_type == chi:
+            tiles = sorted(taken + [tile], key=lambda t: t.index)
+            meld = Meld(tiles, chi, tiles.index(tile), from_id)
+        else:
+            meld = Meld(taken + [tile], meld_type, len(taken), from_id)
+        player.melds.append(meld)
+        if self.log is not None:
+            self.log.call(player_id, meld_type, tile, taken)
+        self.closed_flag[player_id] = False
+        self.called_flag[from_id] = True
+        self.yifa_flag[:] = [False] * 4
+        if meld_type == minggang:
+            self.n_kan[player_id] += 1
+            self.update_waits(player_id)
+            self.kan_action = minggang
+        return meld
+
+    def declare_gang_steps(self, player_id, operation, tile):
+        """
+        暗杠或者加杠，加杠可以被抢杠，暗杠只能被国士抢杠
+        :return: 下一次play_loop的参数，开杠成功则摸岭上牌
+        """
+        # 在这里导入，避免和rule之间循环导入
+        from rule import guoshi_wait_list
+
+        action = angang if operation == "angang" else jiagang
+        meld, tile = self.form_gang(player_id, action, tile)
+
+        ron_mask = self.ron_candidates(tile)
+        for offset in (1, 2, 3):
+            other_id = (player_id + offset) % 4
+            if not ron_mask >> other_id & 1:
+                continue
+            if action == angang and tile not in guoshi_wait_list(self.players[other_id].hand_tiles):
+                continue
+            can_rong, result = self.can_rong(other_id, player_id, action, tile)
+            if not can_rong:
+                self.set_furiten(other_id)
+                continue
+            if (yield Decision(self, "meld", other_id, player_id, action, tile, meld=meld)):
+                self.settlement(result, other_id)
+                return self.end_round(RoundResult("rong", winner=other_id, loser=player_id, score=result,
+                                                  deltas=result.deltas))
+            self.set_furiten(other_id)
+
+        self.complete_gang(action)
+        return player_id, True, True
+
+    def form_gang(self, player_id, action, tile):
+        """
+        暗杠或者加杠组成副露，这时还没有确定会不会被抢杠
+        :return: (组成的副露, 杠的牌)，加杠的时候杠的牌是手牌中实际取出的牌
+        """
+        player = self.players[player_id]
+        if action == angang:
+            tiles = take_tiles(player.hand_tiles, tile.index, 4)
+            self.reveal_hand_tiles(player_id, tiles)
+            meld = Meld(tiles, angang, 0, player_id)
+            player.melds.append(meld)
+        else:
+            meld = next(meld for meld in player.melds if meld.meld_type == peng and meld.tiles[0] == tile)
+            tile = player.hand_tiles.pop(find_tile(player.hand_tiles, tile))
+            self.reveal_hand_tiles(player_id, (tile,))
+            meld.promote(tile)
+        if self.log is not None:
+            self.log.kan(player_id, action, tile)
+        self.n_kan[player_id] += 1
+        self.update_waits(player_id)
+        return meld, tile
+
+    def complete_gang(self, action):
+        """
+        暗杠或者加杠没有被抢杠，开杠成立，翻开新的宝牌指示牌，接下来摸岭上牌
+        """
+        self.yifa_flag[:] = [False] * 4
+        self.kan_action = action
+        self.open_new_dora_indicator()
+
+    def end_round(self, result):
+        """
+        记录一局的结果，返回None表示这一局结束
+        """
+        self.round_result = result
+        if self.log is not None:
+            self.log.round_end(result)
+        return None
+
+    def abort(self, reason):
+        """
+        途中流局，收集立直棒，点棒不变
+        :param reason: 流局的原因
+        """
+        self.collect_richi_bar()
+        return self.end_round(RoundResult("liuju", reason=reason, deltas=[0] * 4))
+
+    def init_tracking(self):
+        """
+        一局开始的时候从配牌初始化每一家的派生状态，之后只做增量更新
+        """
+        self.hands = [Hand(player.hand_tiles) for player in self.players]
+        self.closed_flag = [True] * 4
+        self.n_kan = [0] * 4
+        self.discard_counts = [[0] * 34 for _ in range(4)]
+        self.visible_counts = [list(hand.counts) for hand in self.hands]
+        for visible in self.visible_counts:
+            visible[self.wall.dora_indicators()[0].index] += 1
+        self.waits = [frozenset()] * 4
+        self.discard_furiten_flag = [False] * 4
+        self.ron_index = [0] * 34
+        self.ron_kinds = [()] * 4
+        for player_id in range(4):
+            self.update_waits(player_id)
+
+    def add_hand_tile(self, player_id, tile):
+        """
+        摸牌，加入手牌并且更新派生状态
+        """
+        self.players[player_id].hand_tiles.append(tile)
+        self.hands[player_id].add(tile)
+        self.visible_counts[player_id][tile.index] += 1
+
+    def reveal_hand_tiles(self, player_id, tiles):
+        """
+        已经从手牌中取出的牌被打出或者组成副露，更新派生状态
+        这些牌对自己来说本来就能看到，对其他三家来说变成了能看到的牌
+        """
+        hand = self.hands[player_id]
+        for tile in tiles:
+            hand.remove(tile)
+            self.reveal_tile(tile.index, player_id)
+
+    def reveal_tile(self, index, owner=None):
+        """
+        一张牌变成所有人都能看到的牌
+        :param owner: 本来就能看到这张牌的玩家，None表示对所有人都是新翻开的牌
+        """
+        for player_id, visible in enumerate(self.visible_counts):
+            if player_id != owner:
+                visible[index] += 1
+
+    def update_waits(self, player_id):
+        """
+        手牌变化之后重新计算听牌以及舍牌振听，结果会被缓存，同一手牌不会重复计算
+        """
+        # 在这里导入，避免和rule之间循环导入
+        from rule import normal_form_wait_list, seven_pair_wait_list, guoshi_wait_list
+
+        hand = self.hands[player_id]
+        if len(hand) % 3 != 1:
+            self.waits[player_id] = frozenset()
+            self.discard_furiten_flag[player_id] = False
+        else:
+            waits = normal_form_wait_list(hand) | seven_pair_wait_list(hand) | guoshi_wait_list(hand)
+            discard_counts = self.discard_counts[player_id]
+            self.waits[player_id] = waits
+            self.discard_furiten_flag[player_id] = any(discard_counts[tile.index] for tile in waits)
+        self.update_ron_index(player_id)
+
+    def update_ron_index(self, player_id):
+        """
+        听牌或者振听变化之后，重新登记这一家在ron_index中能够荣和的牌种
+        """
+        bit = 1 << player_id
+        ron_index = self.ron_index
+        for index in self.ron_kinds[player_id]:
+            ron_index[index] &= ~bit
+        kinds = () if self.is_furiten(player_id) else tuple(tile.index for tile in self.waits[player_id])
+        for index in kinds:
+            ron_index[index] |= bit
+        self.ron_kinds[player_id] = kinds
+
+    def set_furiten(self, player_id):
+        """
+        见逃荣和，进入同巡振听，立直之后一直振听
+        """
+        self.furiten_flag[player_id] = True
+        self.update_ron_index(player_id)
+
+    def is_furiten(self, player_id):
+        """
+        是否振听，舍牌振听或者见逃导致的振听
+        """
+        return self.furiten_flag[player_id] or self.discard_furiten_flag[player_id]
+
+    def ron_candidates(self, tile):
+        """
+        能够荣和这张牌的玩家，不检查有没有役
+        :return: 座次的二进制位
+        """
+        return self.ron_index[tile.index]
+
+    def n_gang(self):
+        """
+        场上杠的总数
+        """
+        return sum(self.n_kan)
+
+    def can_draw_lingshang(self):
+        """
+        是否还能开杠，需要剩下岭上牌，并且牌山还有牌可以移入王牌堆
+        """
+        return self.wall.n_lingshang() > 0 and len(self.wall) > 0
+
+    def can_gang(self, player_id, operation, tile):
+        """
+        判断能否暗杠或者加杠
+        立直之后只能用摸到的牌暗杠，并且不能改变听牌
+        """
+        if tile is None or not self.can_draw_lingshang():
+            return False
+        player = self.players[player_id]
+        if operation == "angang":
+            if self.hands[player_id][tile.index] != 4:
+                return False
+            if self.richi_flag[player_id]:
+                # 在这里导入，避免和rule之间循环导入
+                from rule import normal_form_wait_list
+                rest = [t for t in player.hand_tiles if t.index != tile.index]
+                return player.hand_tiles[-1].index == tile.index and \
+                    normal_form_wait_list(rest) == self.waits[player_id]
+            return True
+        return find_tile(player.hand_tiles, tile) >= 0 and \
+            any(meld.meld_type == peng and meld.tiles[0] == tile for meld in player.melds)
+
+    def can_lizhi(self, player_id, tile):
+        """
+        判断能否打出这张牌立直: 门清，没有立直，点棒足够，牌山至少还有四张，打出之后听牌
+        """
+        # 在这里导入，避免和rule之间循环导入
+        from rule import normal_form_wait_list, seven_pair_wait_list, guoshi_wait_list
+
+        player = self.players[player_id]
+        if tile is None or self.richi_flag[player_id] or player.point_bar < 1000 or len(self.wall) < 4:
+            return False
+        if not self.closed_flag[player_id] or tile not in self.hands[player_id]:
+            return False
+        hand = self.hands[player_id].copy()
+        hand.remove(tile)
+        return bool(normal_form_wait_list(hand) or seven_pair_wait_list(hand) or guoshi_wait_list(hand))
+
+    def can_jiuzhongjiupai(self, player_id):
+        """
+        判断能否九种九牌流局: 第一巡没有人副露，自己还没有切牌，有九种以上的幺九牌
+        """
+        player = self.players[player_id]
+        if player.discard_tiles or any(other.melds for other in self.players):
+            return False
+        hand = self.hands[player_id]
+        return sum(1 for index in range(34) if is_yaojiu[index] and hand[index]) >= 9
 
     def south_round(self):
         """
         南风局
+        东风场结束之后进入南风场，从南一局开始
         """
-        raise NotImplementedError
+        self.field_wind = "south"
+        self.field_number = 1
 
-    def can_zimo(self, player_id):
+    def can_zimo(self, player_id, action=mo):
         """
         判断是否能够自摸
-        :return: 能否自摸，如果可以，同时返回胡牌种类列表和各家需要支付的点数
+        :param action: 摸牌的方式，岭上牌传入对应的杠
+        :return: 能否自摸，如果可以，同时返回结算结果，其中包括胡牌种类列表和各家需要支付的点数
         """
-        raise NotImplementedError
+        player = self.players[player_id]
+        return self.win_result(player_id, player_id, action, player.hand_tiles[-1])
+
+    def can_rong(self, player_id, action_id, action, tile):
+        """
+        判断是否能够荣和，不检查振听
+        :param action_id: 打出这张牌的玩家
+        :param action: 切牌，或者被抢的杠
+        :return: 能否荣和，如果可以，同时返回结算结果
+        """
+        return self.win_result(player_id, action_id, action, tile)
+
+    def win_result(self, player_id, action_id, action, tile):
+        """
+        计算和牌的结算结果，立直的话同时计算里宝牌
+        :return: 能否和牌，以及结算结果
+        """
+        # 在这里导入，避免和rule之间循环导入
+        from score import score_hand
+
+        view = self.player_view(player_id, action_id, action, tile)
+        inside_dora_indicator = ()
+        if self.richi_flag[player_id]:
+            inside_dora_indicator = self.wall.inside_dora_indicators()
+        result = score_hand(view, inside_dora_indicator, self.n_richi_bar + sum(self.richi_flag))
+        return result is not None, result
 
     def tie(self):
         """
         流局
         判断每家是否听牌。
         如果庄家听牌，则本场数+1。
-        如果有人流局满贯，优先结算流局满贯
+        如果有人流局满贯，优先结算流局满贯，不再罚符
         如果庄家没有听牌，闲家也没有听牌，则本场数加1，且进入下一轮。
         如果庄家没有听牌，闲家听牌，则本场数+1，进入下一轮，且罚符。
         进入下一轮的时候，如果场次到4，那么东风局直接结束，南风局判断是否进入南风。
-        :return:
+        本场数和庄家的变化在next_banker中处理，这里只结算点棒
+        :return: None，结果保存在round_result中
         """
+        # 在这里导入，避免和rule之间循环导入
+        from score import payments
+
+        tenpai = [bool(waits) for waits in self.waits]
+        deltas = [0] * 4
+        nagashi = [player_id for player_id, player in enumerate(self.players)
+                   if not self.called_flag[player_id] and player.discard_tiles and
+                   all(is_yaojiu[tile.index] for tile in player.discard_tiles)]
+        if nagashi:
+            for player_id in nagashi:
+                for i, delta in enumerate(payments(5, 0, 0, player_id, None, self.banker)):
+                    deltas[i] += delta
+        elif 0 < sum(tenpai) < 4:
+            n_tenpai = sum(tenpai)
+            for player_id in range(4):
+                deltas[player_id] = 3000 // n_tenpai if tenpai[player_id] else -3000 // (4 - n_tenpai)
+        for player, delta in zip(self.players, deltas):
+            player.point_bar += delta
+        self.collect_richi_bar()
+        return self.end_round(RoundResult("huangpai", deltas=deltas, tenpai=tenpai))
 
     # 南风局的话，如果场数为4
 
@@ -255,34 +922,119 @@ class Table:
         随机设置agent的座次
         这个座次直接和Player绑定
         """
-        random.shuffle(self.agents)
+        order = list(range(len(self.agents)))
+        self.rng.shuffle(order)
+        self.agents = [self.agents[i] for i in order]
+        self.seat_slots = order
 
     def dispence_point_bars(self):
         """分发点棒"""
         for player in self.players:
             player.point_bar = 25000
 
-    def next_banker(self):
-        """一局结束之后，闲家胡牌或者流局情况下庄家未听牌，本场数+1，庄家轮换至下一家"""
+    def next_banker(self, keep_banker=False, tie=False):
+        """
+        一局结束之后，闲家胡牌或者流局情况下庄家未听牌，庄家轮换至下一家
+        庄家连庄或者流局的时候本场数+1，闲家胡牌本场数清零
+        :param keep_banker: 庄家是否连庄
+        :param tie: 是否流局
+        """
+        self.n_pon = self.n_pon + 1 if keep_banker or tie else 0
+        if not keep_banker:
+            self.banker = (self.banker + 1) % 4
+            self.field_number += 1
+
+    def play_game(self, agents, east_or_south="east", seed=None, shuffle_seat=False, seat_order=None, walls=None):
+        """
+        完整的一场对局，东风战或者半庄战
+        一局结束之后按照结果轮换庄家，东风场结束之后半庄战进入南风场，有人被击飞或者最后一局结束时终局
+        剩下的立直棒归第一位
+        :param agents: 四个agent，按照座次排列，0号是起家
+        :param east_or_south: "east"是东风战，"south"是半庄战
+        :param seed: 这一场对局的随机种子，每一局的牌山只由它和局的编号决定，None则继续使用桌子当前的随机数生成器
+        :param shuffle_seat: 是否随机打乱座次，打乱之后的座次可以从self.seat_slots得到
+        :param seat_order: 指定座次，seat_order[座次]是坐在这个座次的agent在agents中的位置，指定之后不再打乱
+        :param walls: 预先生成的每一局的牌山，见wall.generate_walls，局数超过的话报错
+        :return: 四家最终的点棒
+        """
+        return self.drive(self.game_steps(agents, east_or_south, seed, shuffle_seat, seat_order, walls))
 
-    def dispence_tiles(self):
+    def game_steps(self, agents, east_or_south="east", seed=None, shuffle_seat=False, seat_order=None, walls=None):
+        """
+        play_game的生成器版本，需要agent作出决定的时候产生Decision
+        :return: 四家最终的点棒
+        """
+        if seed is not None:
+            self.rng.seed(seed)
+        self.game_seed = seed
+        self.round_walls = walls
+        self.agents = list(agents)
+        self.seat_slots = list(range(len(self.agents)))
+        if seat_order is not None:
+            self.agents = [self.agents[slot] for slot in seat_order]
+            self.seat_slots = list(seat_order)
+        elif shuffle_seat:
+            self.set_seat()
+        if self.log is not None:
+            self.log.game_start(east_or_south, self.seat_slots)
+        self.round_results = []
+        self.players = [Player() for _ in range(4)]
+        self.dispence_point_bars()
+        self.east_or_south = east_or_south
+        self.field_wind = "east"
+        self.field_number = 1
+        self.n_pon = 0
+        self.banker = 0
+        self.init_richi_bar()
+
+        while True:
+            result = yield from self.round_steps()
+            self.round_results.append(result)
+            if result.kind in ("zimo", "rong"):
+                self.next_banker(result.winner == self.banker, False)
+            elif result.kind == "huangpai":
+                self.next_banker(result.tenpai[self.banker], True)
+            else:
+                self.next_banker(True, True)
+            if any(player.point_bar < 0 for player in self.players):
+                break
+            if self.field_number > 4:
+                if self.field_wind == "east" and self.east_or_south == "south":
+                    self.south_round()
+                else:
+                    break
+
+        top = max(range(4), key=lambda player_id: (self.players[player_id].point_bar, -player_id))
+        self.players[top].point_bar += 1000 * self.n_richi_bar
+        self.n_richi_bar = 0
+        points = [player.point_bar for player in self.players]
+        if self.log is not None:
+            self.log.game_end(points)
+        return points
+
+    def dispence_tiles(self, wall_ids=None):
         """
         在一个单局的开始，准备好桌面上的所有的牌
+        牌山原地打乱，王牌堆只是牌山数组中的下标范围，不需要切片
+        有预先生成的牌山则直接使用，有对局的种子则用这一局的种子打乱，两种情况下牌山都和之前各局的过程无关
+        :param wall_ids: 指定这一局的牌山，优先于上面两种情况
         """
-        self.wall_tiles = Tile.generate_all_136_tiles()
-        random.shuffle(self.wall_tiles)
+        round_index = len(self.round_results)
+        if wall_ids is not None:
+            self.wall.load(wall_ids)
+        elif self.round_walls is not None:
+            if round_index >= len(self.round_walls):
+                raise ValueError(f"没有第{round_index}局的牌山")
+            self.wall.load(self.round_walls[round_index])
+        else:
+            if self.game_seed is not None:
+                self.rng.seed(round_seed(self.game_seed, round_index))
+            self.wall.shuffle(self.rng)
         for ind, player in enumerate(self.players):
-            player.hand_tiles = self.wall_tiles[ind * 13:(ind + 1) * 13]  # draw 13 tiles
+            player.hand_tiles = self.wall.hand(ind)
+            player.discard_tiles = []
+            player.tsumogiri_flags = []
             player.melds = []
-
-        self.wall_tiles = self.wall_tiles[13 * 4:]
-
-        # 准备王牌堆
-        self.lingshang_tiles, self.wall_tiles = self.wall_tiles[-4:], self.wall_tiles[:-4]
-        self.lingshang_discard_tiles = []
-        self.dora_indicator, self.wall_tiles = self.wall_tiles[-5:], self.wall_tiles[:-5]
-        self.inside_dora_indicator, self.wall_tiles = self.wall_tiles[-5:], self.wall_tiles[:-5]
-        self.dora_indicator_flag = [True, False, False, False, False]
         self.discard_tiles = []
 
     def init_richi_bar(self):
@@ -297,15 +1049,45 @@ class Table:
         流局时收集所有人的立直棒，重置所有人的立直标记位
         """
         self.n_richi_bar += sum(self.richi_flag)
-        self.richi_flag = [False] * 4
+        self.richi_flag[:] = [False] * 4
 
     def open_new_dora_indicator(self):
         """
         打开新的宝牌指示牌，并且将河底牌移入王牌堆
         """
-        if all(self.dora_indicator_flag):
-            raise ValueError("All dora indicators have already opened!")
-        self.dora_indicator_flag = [True] + self.dora_indicator_flag[:-1]
+        indicator = self.wall.open_dora()
+        self.reveal_tile(indicator.index)
+        if self.log is not None:
+            self.log.dora(indicator)
 
-        # 将原本的河底牌移入王牌堆
-        self.lingshang_discard_tiles.append(self.wall_tiles.pop(-1))
+
+def find_tile(tiles, tile):
+    """
+    在牌的列表中找到一张牌的位置，优先找红宝牌标记也相同的牌
+    :return: 位置，没有则返回-1
+    """
+    position = -1
+    for i, t in enumerate(tiles):
+        if t.index == tile.index:
+            if t.red == tile.red:
+                return i
+            position = i
+    return position
+
+
+def is_same_tile(tile, other):
+    """
+    是否是同一种牌，并且红宝牌标记也相同，other可以是None
+    """
+    return other is not None and tile.index == other.index and tile.red == other.red
+
+
+def take_tiles(tiles, index, n):
+    """
+    从牌的列表中取出n张牌种编号为index的牌
+    :return: 取出的牌
+    """
+    taken = [t for t in tiles if t.index == index][:n]
+    for t in taken:
+        tiles.remove(t)
+    return taken
@@ -21,10 +21,13 @@ class Tile:
     type表示种类，0是万，1是饼，2是索，3是风，是三元
     value表示数牌大小，从1~9。如果是字牌，风牌从0~3是东南西北，三元牌是0~2是白发中
     red表示是否是红宝牌。
+    Tile是不可变的，一共只有136个驻留的对象，Tile(...)直接返回驻留的牌，所以可以用is比较
     """
+    __slots__ = ("base", "category", "value", "red", "index", "id")
+
     # 各种集合，存储类型使用元组，匹配的时候使用base匹配
     numbers = tuple((cate, value, red) for cate in (man, pin, suo) for value in range(1, 10) for red in
-                    ((0, 0, 0, 1) if value == 5 else (0, 0, 0, 0)))  # 数牌
+                    ((1, 0, 0, 0) if value == 5 else (0, 0, 0, 0)))  # 数牌
     chars = tuple((wind, value, red) for value in range(4) for red in (0,) * 4)  # 字牌
     chars += tuple((honor, value, red) for value in range(3) for red in (0,) * 4)  # 字牌
 
@@ -39,64 +42,102 @@ class Tile:
         honor: {0: "🀆", 1: "🀅", 2: "🀄"}
     }
 
-    def __init__(self, category, value, red):
-        self.base = (category, value, red)
+    def __new__(cls, category, value, red=0, tile_id=None):
+        """
+        只有在生成驻留的136张牌的时候传入tile_id，创建新的对象，其他时候返回驻留的牌
+        :param tile_id: 0~135的物理牌编号
+        """
+        index = Tile.category_offset[category] + value  # 0~33的牌种编号，红宝牌和普通牌相同
+        if tile_id is None:
+            return Tile.from_index(index, red)
+        tile = object.__new__(cls)
+        # Tile是不可变的，所以只能通过object.__setattr__初始化
+        set_field = object.__setattr__
+        set_field(tile, "base", (category, value, red))
+        set_field(tile, "category", category)
+        set_field(tile, "value", value)
+        set_field(tile, "red", red)
+        set_field(tile, "index", index)
+        set_field(tile, "id", tile_id)
+        return tile
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Tile是不可变的")
+
+    def __reduce__(self):
+        # 复制或者传给其他进程的时候还原成驻留的牌
+        return Tile.from_id, (self.id,)
+
+    # 每一类牌在34种编号中的起始位置，数牌的value从1开始，所以偏移量减一
+    category_offset = {man: -1, pin: 8, suo: 17, wind: 27, honor: 31}
 
     @staticmethod
     def generate_all_136_tiles():
         """
         产生所有136章牌
+        返回的是驻留的牌，不会产生新的对象
         :return:
         """
-        return list(map(lambda b: Tile(*b), Tile.all))
+        return list(all_136_tiles)
 
-    @property
-    def __category(self):
-        return self.base[0]
-
-    @property
-    def __value(self):
-        return self.base[1]
+    @staticmethod
+    def from_index(index, red=0):
+        """
+        从0~33的牌种编号得到驻留的牌
+        :param index: 牌种编号
+        :param red: 是否是红宝牌，只有三种5才有红宝牌
+        :return:
+        """
+        tile = index_to_tile[red][index]
+        if tile is None:
+            raise ValueError(f"牌种{index}没有红宝牌，只有三种5才有红宝牌")
+        return tile
 
-    @property
-    def __red(self):
-        return self.base[2]
+    @staticmethod
+    def from_id(tile_id):
+        """
+        从0~135的物理牌编号得到驻留的牌
+        编号除以4就是牌种编号，16、52、88是三张红宝牌
+        :param tile_id: 物理牌编号
+        :return:
+        """
+        return all_136_tiles[tile_id]
 
     def is_man(self):
-        return self.__category == man
+        return self.category == man
 
     def is_pin(self):
-        return self.__category == pin
+        return self.category == pin
 
     def is_suo(self):
-        return self.__category == suo
+        return self.category == suo
 
     def is_wind(self):
-        return self.__category == wind
+        return self.category == wind
 
     def is_east(self):
-        return self.is_wind() and self.__value == 0
+        return self.is_wind() and self.value == 0
 
     def is_south(self):
-        return self.is_wind() and self.__value == 1
+        return self.is_wind() and self.value == 1
 
     def is_west(self):
-        return self.is_wind() and self.__value == 2
+        return self.is_wind() and self.value == 2
 
     def is_north(self):
-        return self.is_wind() and self.__value == 3
+        return self.is_wind() and self.value == 3
 
     def is_honor(self):
-        return self.__category == honor
+        return self.category == honor
 
     def is_blank(self):
-        return self.is_honor and self.__value == 0
+        return self.is_honor and self.value == 0
 
     def is_fortune(self):
-        return self.is_honor and self.__value == 1
+        return self.is_honor and self.value == 1
 
     def is_center(self):
-        return self.is_honor() and self.__value == 2
+        return self.is_honor() and self.value == 2
 
     def is_number(self):
         return self.is_man() or self.is_pin() or self.is_suo()
@@ -105,19 +146,26 @@ class Tile:
         return self.is_wind() or self.is_honor()
 
     def is_red(self):
-        return self.__red == 1
+        return self.red == 1
 
     def is_one_nine(self):
-        return self.is_number() and self.__value in (1, 9)
+        return self.is_number() and self.value in (1, 9)
+
+    def next(self):
+        """
+        同一花色中的下一种数牌，9和字牌返回None
+        """
+        return next_tile[self.index]
+
+    def prev(self):
+        """
+        同一花色中的上一种数牌，1和字牌返回None
+        """
+        return prev_tile[self.index]
 
     def __lt__(self, other):
-        assert isinstance(other, Tile)
-        if self.__category != other.__category:
-            return self.__category < other.__category
-        elif self.__value != other.__value:
-            return self.__value < other.__value
-        else:
-            return self.__red < other.__red
+        # 先比较牌种编号，相同的时候红宝牌排在后面
+        return self.index < other.index or (self.index == other.index and self.red < other.red)
 
     def __gt__(self, other):
         return not (self < other)
@@ -127,28 +175,55 @@ class Tile:
 
     def __repr__(self):
         if self.is_red():
-            return f'\033[1;31m{Tile.number_graph[self.__category][5]}\033[0m'
+            return f'\033[1;31m{Tile.number_graph[self.category][5]}\033[0m'
         else:
-            return Tile.number_graph[self.__category][self.__value]
+            return Tile.number_graph[self.category][self.value]
 
     def __add__(self, other: int):
         # This function is for meld calculation. Not dora calculation
-        assert self.is_number()
-        new_value = self.__value + other
-        # assert 1 <= new_value <= 9
-        if new_value < 1 or new_value > 9:
+        # 超出边界会抛出异常，频繁调用的地方应该使用next_index、prev_index这些表
+        new_value = self.value + other
+        if not self.is_number() or new_value < 1 or new_value > 9:
             raise ValueError("add exceed boundary")
-        return Tile(self.__category, new_value, self.__red)
+        return index_to_tile[0][self.index + other]
 
     def __sub__(self, other):
         return self + (-other)
 
     def __eq__(self, other):
         """红宝牌不纳入考虑"""
-        return self.__category == other.__category and self.__value == other.__value
+        return self.index == other.index
+
+    def __hash__(self):
+        # 和__eq__保持一致，红宝牌和普通牌的哈希相同
+        return self.index
 
     def is_same_category(self, other):
-        return self.__category == other.__category
+        return self.category == other.category
+
+
+# 驻留的136张牌，下标就是物理牌编号。同一种牌的四张按编号排列，红宝牌是每种5的第一张
+all_136_tiles = tuple(Tile(*base, tile_id=tile_id) for tile_id, base in enumerate(Tile.all))
+
+# index_to_tile[red][index]，从牌种编号到驻留的牌，非红的取每种牌最后一张
+index_to_tile = (
+    tuple(all_136_tiles[index * 4 + 3] for index in range(34)),
+    tuple(all_136_tiles[index * 4] if all_136_tiles[index * 4].is_red() else None for index in range(34)),
+)
+
+# next_index[牌种编号]是同一花色中下一种数牌的编号，prev_index是上一种，超出数牌的边界或者是字牌则是no_tile
+# 判断顺子的时候查表，不需要做加减法和边界检查。no_tile作为下标查表得到的仍然是no_tile(最后一种牌是字牌)，所以可以连续查表
+no_tile = -1
+next_index = tuple(index + 1 if index < 27 and index % 9 != 8 else no_tile for index in range(34))
+prev_index = tuple(index - 1 if index < 27 and index % 9 != 0 else no_tile for index in range(34))
+next_tile = tuple(None if index == no_tile else index_to_tile[0][index] for index in next_index)
+prev_tile = tuple(None if index == no_tile else index_to_tile[0][index] for index in prev_index)
+
+# dora_index[宝牌指示牌的牌种编号]是宝牌的牌种编号，数牌9之后是1，风牌东南西北循环，三元牌白发中循环
+dora_index = tuple(index - 8 if index < 27 and index % 9 == 8 else
+                   27 if index == 30 else
+                   31 if index == 33 else
+                   index + 1 for index in range(34))
 
 
 if __name__ == "__main__":
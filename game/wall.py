@@ -0,0 +1,134 @@
+import random
+
+from tile import all_136_tiles
+
+# 一局开始时牌山的排列，每局先恢复成这个顺序再打乱，相同的随机数状态得到相同的牌山
+initial_ids = tuple(range(136))
+
+
+def round_seed(seed, round_index):
+    """
+    一场对局中第round_index局的牌山种子，只和对局的种子以及局的编号有关，和座次以及之前各局的过程无关
+    """
+    return seed * 65536 + round_index
+
+
+def generate_walls(seed, n_rounds):
+    """
+    预先生成一场对局每一局的牌山，和使用同一个种子对局时的牌山相同
+    :return: 每一局136张牌的物理编号的元组
+    """
+    wall = Wall()
+    walls = []
+    for round_index in range(n_rounds):
+        wall.shuffle(random.Random(round_seed(seed, round_index)))
+        walls.append(tuple(wall.ids))
+    return walls
+
+
+class Wall:
+    """
+    牌山，136张牌的物理编号放在一个预先分配的列表中，每局原地打乱，不创建新的牌和列表
+    用列表而不是array，因为random.shuffle交换列表元素比交换array元素快
+    配牌、牌山、里宝牌指示牌、宝牌指示牌和岭上牌都是这个列表中的一段下标范围:
+        ids[0:52]     四家的配牌，第i家是ids[13 * i:13 * (i + 1)]
+        ids[52:122]   牌山，从后往前摸牌，cursor指向最后一张还没有摸的牌的后一个位置
+        ids[122:127]  里宝牌指示牌
+        ids[127:132]  宝牌指示牌
+        ids[132:136]  岭上牌，从后往前摸牌
+    开杠之后牌山的一张牌移入王牌堆，只需要移动cursor
+    """
+    live_start = 52
+    inside_dora_start = 122
+    dora_start = 127
+    lingshang_start = 132
+
+    def __init__(self):
+        self.ids = list(initial_ids)
+        self.cursor = Wall.inside_dora_start
+        self.lingshang_cursor = 136
+        self.n_dora = 1  # 已经翻开的宝牌指示牌数目
+
+    def shuffle(self, rng):
+        """
+        一局开始的时候原地打乱牌山
+        :param rng: 随机数生成器
+        """
+        self.ids[:] = initial_ids
+        rng.shuffle(self.ids)
+        self.reset()
+
+    def load(self, ids):
+        """
+        使用预先生成的牌山
+        :param ids: 136张牌的物理编号
+        """
+        if len(ids) != 136 or set(ids) != set(initial_ids):
+            raise ValueError("牌山必须是136张牌的物理编号的排列")
+        self.ids[:] = ids
+        self.reset()
+
+    def reset(self):
+        """
+        重置摸牌的位置和翻开的宝牌指示牌
+        """
+        self.cursor = Wall.inside_dora_start
+        self.lingshang_cursor = 136
+        self.n_dora = 1
+
+    def hand(self, player_id):
+        """
+        第player_id家的配牌
+        """
+        start = player_id * 13
+        return [all_136_tiles[tile_id] for tile_id in self.ids[start:start + 13]]
+
+    def __len__(self):
+        """
+        牌山剩余的牌数
+        """
+        return self.cursor - Wall.live_start
+
+    def draw(self):
+        """
+        从牌山摸一张牌
+        """
+        self.cursor -= 1
+        return all_136_tiles[self.ids[self.cursor]]
+
+    def n_lingshang(self):
+        """
+        剩余的岭上牌数
+        """
+        return self.lingshang_cursor - Wall.lingshang_start
+
+    def draw_lingshang(self):
+        """
+        摸一张岭上牌
+        """
+        self.lingshang_cursor -= 1
+        return all_136_tiles[self.ids[self.lingshang_cursor]]
+
+    def open_dora(self):
+        """
+        翻开新的宝牌指示牌，同时牌山的一张牌移入王牌堆
+        :return: 新的宝牌指示牌
+        """
+        if self.n_dora == 5:
+            raise ValueError("All dora indicators have already opened!")
+        self.n_dora += 1
+        self.cursor -= 1
+        return all_136_tiles[self.ids[Wall.dora_start + self.n_dora - 1]]
+
+    def dora_indicators(self):
+        """
+        已经翻开的宝牌指示牌
+        """
+        return tuple(all_136_tiles[tile_id] for tile_id in self.ids[Wall.dora_start:Wall.dora_start + self.n_dora])
+
+    def inside_dora_indicators(self):
+        """
+        和已经翻开的宝牌指示牌对应的里宝牌指示牌
+        """
+        start = Wall.inside_dora_start
+        return tuple(all_136_tiles[tile_id] for tile_id in self.ids[start:start + self.n_dora])
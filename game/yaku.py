@@ -0,0 +1,656 @@
+"""
+一次性计算和牌的所有役
+和牌时先把整手牌和副露统计成WinContext，再把手牌的每一种分组以及和牌所在的位置整理成Decomposition，
+所有的役都只在这两个记录上判断，不需要每一种役各自重新分组
+最后返回番数最高的解释，番数相同时取符数高的
+"""
+from hand import Hand
+from rule import normal_form_split_indices, is_richi, is_yifa, is_shuanglizhi, is_qianggang, \
+    is_lingshangkaihua, is_haidimoyue, is_hedilaoyu, is_tianhu, is_dihu
+from shanten import yaojiu_indices, is_yaojiu
+from tile import chi, minggang, angang, jiagang
+
+wind_indices = (27, 28, 29, 30)
+dragon_indices = (31, 32, 33)
+green_indices = frozenset((19, 20, 21, 23, 25, 32))  # 二三四六八索和发
+
+# 场风的表示，Table中使用字符串
+field_wind_names = {"east": 0, "south": 1, "west": 2, "north": 3}
+
+# 和牌的牌型
+normal_form = 0
+seven_pair_form = 1
+guoshi_form = 2
+
+# 听牌的形式，用于平和和符数
+ryanmen = 0  # 两面
+kanchan = 1  # 坎张
+penchan = 2  # 边张
+tanki = 3  # 单骑
+shanpon = 4  # 双碰
+
+yakuman_han = 13  # 役满按13番计，双倍役满按26番计
+
+# 和牌的事实，用位掩码表示，役的前提条件使用相同的位
+# WinContext的事实
+fact_closed = 1 << 0  # 门清
+fact_tsumo = 1 << 1  # 自摸
+fact_ron = 1 << 2  # 荣和
+fact_richi = 1 << 3  # 立直
+fact_first_turn = 1 << 4  # 没有人副露，自己还没有切过牌
+fact_last_tile = 1 << 5  # 牌山已经摸完
+fact_kan_action = 1 << 6  # 和牌的动作是杠
+fact_honor = 1 << 7  # 有字牌
+fact_no_honor = 1 << 8  # 没有字牌
+fact_no_terminal = 1 << 9  # 没有老头牌
+fact_no_simple = 1 << 10  # 没有中张牌
+fact_one_suit = 1 << 11  # 数牌至多一种
+fact_all_green = 1 << 12  # 全部是绿色的牌
+fact_three_dragons = 1 << 13  # 三种三元牌都至少有两张
+fact_four_winds = 1 << 14  # 四种风牌都至少有两张
+fact_three_kans = 1 << 15  # 三个杠
+fact_four_kans = 1 << 16  # 四个杠
+# Decomposition的事实
+fact_normal = 1 << 17  # 普通牌型
+fact_seven_pair = 1 << 18  # 七对子
+fact_guoshi = 1 << 19  # 国士
+fact_strings = 1 << 20  # 至少一个顺子
+fact_no_strings = 1 << 21  # 没有顺子
+fact_three_concealed = 1 << 22  # 三暗刻
+fact_four_concealed = 1 << 23  # 四暗刻
+
+form_facts = {normal_form: fact_normal, seven_pair_form: fact_seven_pair, guoshi_form: fact_guoshi}
+
+
+class WinContext:
+    """
+    和牌时整手牌的信息，和分组无关
+    """
+
+    def __init__(self, view):
+        self.view = view
+        self.player_id = view.player_id
+        # 自己摸牌(包括岭上牌)是自摸，否则是荣和(包括抢杠)
+        self.tsumo = view.action_id == view.player_id
+        self.win_index = view.action_tile.index
+
+        hand = Hand(view.hand_tiles)
+        if len(hand) % 3 == 1:
+            hand.add(view.action_tile)
+        self.counts = list(hand.counts)  # 门内的牌，包括和了的牌
+        self.n_tiles = len(hand)
+
+        self.melds = []  # (副露种类, 最小的牌种编号)
+        self.all_counts = self.counts[:]  # 包括副露的所有牌
+        self.closed = True
+        self.n_kans = 0
+        for meld in view.all_player_melds[view.player_id]:
+            self.melds.append((meld.meld_type, min(tile.index for tile in meld.tiles)))
+            for tile in meld.tiles:
+                self.all_counts[tile.index] += 1
+            if meld.meld_type != angang:
+                self.closed = False
+            if meld.meld_type in (minggang, angang, jiagang):
+                self.n_kans += 1
+
+        self.seat_wind = 27 + (view.player_id - view.banker) % 4
+        field_wind = field_wind_names.get(view.field_wind, view.field_wind)
+        self.field_wind = 27 + field_wind
+
+        present = [index for index, n in enumerate(self.all_counts) if n]
+        self.has_honor = any(index >= 27 for index in present)
+        self.has_terminal = any(index < 27 and is_yaojiu[index] for index in present)
+        self.has_simple = any(not is_yaojiu[index] for index in present)
+        self.suits = {index // 9 for index in present if index < 27}
+
+        facts = fact_tsumo if self.tsumo else fact_ron
+        if self.closed:
+            facts |= fact_closed
+        if view.richi_flag[view.player_id]:
+            facts |= fact_richi
+        if all(len(melds) == 0 for melds in view.all_player_melds) and \
+                len(view.all_player_discard_tiles[view.player_id]) == 0:
+            facts |= fact_first_turn
+        if view.n_wall_tiles == 0:
+            facts |= fact_last_tile
+        if view.action in (minggang, angang, jiagang):
+            facts |= fact_kan_action
+        facts |= fact_honor if self.has_honor else fact_no_honor
+        if not self.has_terminal:
+            facts |= fact_no_terminal
+        if not self.has_simple:
+            facts |= fact_no_simple
+        if len(self.suits) <= 1:
+            facts |= fact_one_suit
+        if all(index in green_indices for index in present):
+            facts |= fact_all_green
+        if all(self.all_counts[index] >= 2 for index in dragon_indices):
+            facts |= fact_three_dragons
+        if all(self.all_counts[index] >= 2 for index in wind_indices):
+            facts |= fact_four_winds
+        if self.n_kans >= 3:
+            facts |= fact_three_kans if self.n_kans == 3 else fact_four_kans
+        self.facts = facts
+
+
+class Decomposition:
+    """
+    一种和牌分组的特征记录，包括副露
+    普通牌型的四个面子按照顺子和刻子(包括杠子)分别记录最小的牌种编号
+    """
+
+    def __init__(self, form, pair=None, strings=(), threes=(), concealed_strings=(), concealed_threes=(),
+                 wait=tanki, win_pack=None):
+        self.form = form
+        self.pair = pair
+        self.strings = strings
+        self.threes = threes
+        self.concealed_strings = concealed_strings  # 门内的顺子，用于一杯口和二杯口
+        self.concealed_threes = concealed_threes  # 暗刻，包括暗杠，荣和的刻子不算
+        self.n_concealed_threes = len(concealed_threes)
+        self.wait = wait
+        self.win_pack = win_pack  # 和了的牌所在的pack，(是否是顺子, 最小的牌种编号)
+
+        facts = form_facts[form]
+        if form == normal_form:
+            facts |= fact_strings if strings else fact_no_strings
+            if self.n_concealed_threes == 3:
+                facts |= fact_three_concealed
+            elif self.n_concealed_threes == 4:
+                facts |= fact_four_concealed
+        self.facts = facts
+
+
+def wait_type(string_start, win_index):
+    """
+    判断和了的牌在顺子中的听牌形式
+    """
+    if win_index == string_start + 1:
+        return kanchan
+    if (win_index == string_start and string_start % 9 == 6) or \
+            (win_index == string_start + 2 and string_start % 9 == 0):
+        return penchan
+    return ryanmen
+
+
+def decompositions(context: WinContext):
+    """
+    枚举和牌的所有解释
+    同一个分组中和了的牌可能属于不同的pack，听牌形式和暗刻数目不同，所以分别作为不同的解释
+    """
+    counts = context.counts
+    win_index = context.win_index
+
+    if context.closed and context.n_tiles == 14:
+        if all(n in (0, 2) for n in counts) and counts.count(2) == 7:
+            yield Decomposition(seven_pair_form)
+        if all(counts[index] for index in yaojiu_indices) and sum(counts[index] for index in yaojiu_indices) == 14:
+            yield Decomposition(guoshi_form)
+
+    meld_strings = [index for meld_type, index in context.melds if meld_type == chi]
+    meld_threes = [index for meld_type, index in context.melds if meld_type != chi]
+    angang_threes = [index for meld_type, index in context.melds if meld_type == angang]
+
+    for split_form in normal_form_split_indices(counts):
+        pair = None
+        hand_strings = []
+        hand_threes = []
+        for pack in split_form:
+            if len(pack) == 2:
+                pair = pack[0]
+            elif pack[0] == pack[1]:
+                hand_threes.append(pack[0])
+            else:
+                hand_strings.append(pack[0])
+        strings = tuple(sorted(hand_strings + meld_strings))
+        threes = tuple(sorted(hand_threes + meld_threes))
+        concealed_strings = tuple(sorted(hand_strings))
+
+        win_packs = set()
+        if pair == win_index:
+            win_packs.add((False, pair, tanki))
+        if win_index in hand_threes:
+            win_packs.add((False, win_index, shanpon))
+        for start in hand_strings:
+            if start <= win_index <= start + 2:
+                win_packs.add((True, start, wait_type(start, win_index)))
+
+        for is_string, start, wait in win_packs:
+            concealed_threes = hand_threes + angang_threes
+            if wait == shanpon and not context.tsumo:
+                concealed_threes = [index for index in concealed_threes if index != start]
+            yield Decomposition(normal_form, pair, strings, threes, concealed_strings, tuple(sorted(concealed_threes)),
+                                wait, (is_string, start))
+
+
+def is_yakuhai(context: WinContext, index):
+    return index in dragon_indices or index == context.seat_wind or index == context.field_wind
+
+
+def pack_has_yaojiu(is_string, start):
+    if is_string:
+        return start % 9 in (0, 6)
+    return is_yaojiu[start]
+
+
+def n_identical_strings(decomposition: Decomposition):
+    """
+    门内相同顺子的组数，1是一杯口，2是二杯口
+    """
+    strings = decomposition.concealed_strings
+    n = 0
+    i = 0
+    while i + 1 < len(strings):
+        if strings[i] == strings[i + 1]:
+            n += 1
+            i += 2
+        else:
+            i += 1
+    return n
+
+
+def chanta_kind(context: WinContext, d: Decomposition):
+    """
+    判断全带幺九，所有的面子和雀头都包含幺九牌，并且至少有一个顺子
+    :return: 0不是全带，1混全带幺，2纯全带幺
+    """
+    if d.form != normal_form or not d.strings or not is_yaojiu[d.pair]:
+        return 0
+    if not all(pack_has_yaojiu(True, start) for start in d.strings):
+        return 0
+    if not all(is_yaojiu[start] for start in d.threes):
+        return 0
+    return 1 if context.has_honor else 2
+
+
+def jiulian_kind(context: WinContext):
+    """
+    判断九莲宝灯
+    :return: 0不是九莲，1九莲宝灯，2纯正九莲宝灯
+    """
+    if not context.closed or context.n_kans or context.has_honor or len(context.suits) != 1:
+        return 0
+    start = next(iter(context.suits)) * 9
+    pattern = context.counts[start:start + 9]
+    base = (3, 1, 1, 1, 1, 1, 1, 1, 3)
+    if any(n < b for n, b in zip(pattern, base)):
+        return 0
+    # 去掉和了的牌之后恰好是1112345678999就是纯正九莲
+    pattern[context.win_index - start] -= 1
+    return 2 if tuple(pattern) == base else 1
+
+
+class YakuRule:
+    """
+    一种役的注册信息
+    requires是判断这种役的前提条件，只有WinContext和Decomposition的事实包含了所有的前提条件才会调用判断函数
+    excludes是这种役成立时不再需要判断的役
+    """
+
+    def __init__(self, name, closed_han, open_han, requires, excludes, func, yakuman):
+        self.name = name
+        self.closed_han = closed_han
+        self.open_han = open_han  # None表示必须门清
+        self.requires = requires
+        self.excludes = excludes
+        self.exclude_mask = 0  # 由excludes得到，所有役注册完之后计算
+        self.func = func
+        self.yakuman = yakuman  # 役满的倍数，0表示不是役满
+        self.bit = 0
+
+
+yaku_registry = []  # 普通役，按照注册顺序判断，排除其他役的役需要先注册
+yakuman_registry = []  # 役满
+yakuman_gate = 0  # 所有役满前提条件中的关键事实，一个都不满足就跳过所有役满
+rule_bits = {}  # 役的名字到位的映射
+yaku_rules = {}  # 役的名字到YakuRule的映射
+
+
+def register(name, closed_han, open_han=None, requires=0, excludes=(), yakuman=0, key_fact=0):
+    """
+    注册一种役
+    :param closed_han: 门清的番数，役满则为倍数乘以13
+    :param open_han: 副露的番数，None表示必须门清
+    :param requires: 前提条件的掩码
+    :param excludes: 这种役成立时排除的役的名字
+    :param yakuman: 役满的倍数
+    :param key_fact: 役满的关键事实，必须同时出现在requires中
+    """
+
+    def decorator(func):
+        global yakuman_gate
+        nonlocal requires
+        if open_han is None:
+            requires |= fact_closed
+        rule = YakuRule(name, closed_han, open_han, requires, excludes, func, yakuman)
+        rule.bit = 1 << len(rule_bits)
+        rule_bits[name] = rule.bit
+        yaku_rules[name] = rule
+        if yakuman:
+            yakuman_registry.append(rule)
+            yakuman_gate |= key_fact
+        else:
+            yaku_registry.append(rule)
+        return func
+
+    return decorator
+
+
+@register("shuanglizhi", 2, excludes=("richi",))
+def yaku_shuanglizhi(c, d):
+    return is_shuanglizhi(c.view)
+
+
+@register("richi", 1, requires=fact_richi)
+def yaku_richi(c, d):
+    return is_richi(c.view)
+
+
+@register("yifa", 1, requires=fact_richi)
+def yaku_yifa(c, d):
+    return is_yifa(c.view)
+
+
+@register("menqianqingzimo", 1, requires=fact_tsumo)
+def yaku_menqianqingzimo(c, d):
+    return True
+
+
+@register("duanyao", 1, 1, requires=fact_no_honor | fact_no_terminal)
+def yaku_duanyao(c, d):
+    return True
+
+
+@register("pinghu", 1, requires=fact_normal | fact_strings)
+def yaku_pinghu(c, d):
+    return len(d.strings) == 4 and d.wait == ryanmen and not is_yakuhai(c, d.pair)
+
+
+@register("erbeikou", 3, requires=fact_normal | fact_strings, excludes=("yibeikou",))
+def yaku_erbeikou(c, d):
+    return n_identical_strings(d) == 2
+
+
+@register("yibeikou", 1, requires=fact_normal | fact_strings)
+def yaku_yibeikou(c, d):
+    return n_identical_strings(d) == 1
+
+
+@register("yipai_zifeng", 1, 1, requires=fact_normal | fact_honor)
+def yaku_yipai_zifeng(c, d):
+    return c.seat_wind in d.threes
+
+
+@register("yipai_changfeng", 1, 1, requires=fact_normal | fact_honor)
+def yaku_yipai_changfeng(c, d):
+    return c.field_wind in d.threes
+
+
+@register("yipai_honor_white", 1, 1, requires=fact_normal | fact_honor)
+def yaku_yipai_honor_white(c, d):
+    return 31 in d.threes
+
+
+@register("yipai_honor_fortune", 1, 1, requires=fact_normal | fact_honor)
+def yaku_yipai_honor_fortune(c, d):
+    return 32 in d.threes
+
+
+@register("yipai_honor_center", 1, 1, requires=fact_normal | fact_honor)
+def yaku_yipai_honor_center(c, d):
+    return 33 in d.threes
+
+
+@register("qianggang", 1, 1, requires=fact_ron | fact_kan_action)
+def yaku_qianggang(c, d):
+    return is_qianggang(c.view)
+
+
+@register("lingshangkaihua", 1, 1, requires=fact_tsumo | fact_kan_action)
+def yaku_lingshangkaihua(c, d):
+    return is_lingshangkaihua(c.view)
+
+
+@register("haidimoyue", 1, 1, requires=fact_tsumo | fact_last_tile)
+def yaku_haidimoyue(c, d):
+    return is_haidimoyue(c.view)
+
+
+@register("hedilaoyu", 1, 1, requires=fact_ron | fact_last_tile)
+def yaku_hedilaoyu(c, d):
+    return is_hedilaoyu(c.view)
+
+
+@register("sansetongshun", 2, 1, requires=fact_normal | fact_strings)
+def yaku_sansetongshun(c, d):
+    return any(start < 9 and start + 9 in d.strings and start + 18 in d.strings for start in d.strings)
+
+
+@register("yiqitongguan", 2, 1, requires=fact_normal | fact_strings)
+def yaku_yiqitongguan(c, d):
+    return any(start % 9 == 0 and start + 3 in d.strings and start + 6 in d.strings for start in d.strings)
+
+
+@register("chunquandai", 3, 2, requires=fact_normal | fact_strings | fact_no_honor)
+def yaku_chunquandai(c, d):
+    return chanta_kind(c, d) == 2
+
+
+@register("hunquandai", 2, 1, requires=fact_normal | fact_strings | fact_honor)
+def yaku_hunquandai(c, d):
+    return chanta_kind(c, d) == 1
+
+
+@register("seven_pair", 2, requires=fact_seven_pair)
+def yaku_seven_pair(c, d):
+    return True
+
+
+@register("duidui", 2, 2, requires=fact_normal | fact_no_strings)
+def yaku_duidui(c, d):
+    return True
+
+
+@register("sananke", 2, 2, requires=fact_normal | fact_three_concealed)
+def yaku_sananke(c, d):
+    return True
+
+
+@register("sansetongke", 2, 2, requires=fact_normal)
+def yaku_sansetongke(c, d):
+    return any(start < 9 and start + 9 in d.threes and start + 18 in d.threes for start in d.threes)
+
+
+@register("sangangzi", 2, 2, requires=fact_three_kans)
+def yaku_sangangzi(c, d):
+    return True
+
+
+@register("xiaosanyuan", 2, 2, requires=fact_normal | fact_three_dragons)
+def yaku_xiaosanyuan(c, d):
+    return d.pair in dragon_indices and sum(1 for index in dragon_indices if index in d.threes) == 2
+
+
+@register("hunlaotou", 2, 2, requires=fact_no_simple | fact_honor)
+def yaku_hunlaotou(c, d):
+    return d.form != guoshi_form and c.has_terminal
+
+
+@register("qingyise", 6, 5, requires=fact_one_suit | fact_no_honor, excludes=("hunyise",))
+def yaku_qingyise(c, d):
+    return True
+
+
+@register("hunyise", 3, 2, requires=fact_one_suit | fact_honor)
+def yaku_hunyise(c, d):
+    return bool(c.suits)
+
+
+@register("tianhu", 13, requires=fact_first_turn | fact_tsumo, yakuman=1, key_fact=fact_first_turn)
+def yaku_tianhu(c, d):
+    return is_tianhu(c.view)
+
+
+@register("dihu", 13, requires=fact_first_turn | fact_tsumo, yakuman=1, key_fact=fact_first_turn)
+def yaku_dihu(c, d):
+    return is_dihu(c.view)
+
+
+@register("guoshiwuhuangshisanmian", 26, requires=fact_guoshi, excludes=("guoshiwushuang",), yakuman=2,
+          key_fact=fact_guoshi)
+def yaku_guoshiwuhuangshisanmian(c, d):
+    return c.counts[c.win_index] == 2
+
+
+@register("guoshiwushuang", 13, requires=fact_guoshi, yakuman=1, key_fact=fact_guoshi)
+def yaku_guoshiwushuang(c, d):
+    return True
+
+
+@register("siankedanji", 26, 26, requires=fact_normal | fact_four_concealed, excludes=("sianke",), yakuman=2,
+          key_fact=fact_four_concealed)
+def yaku_siankedanji(c, d):
+    return d.wait == tanki
+
+
+@register("sianke", 13, 13, requires=fact_normal | fact_four_concealed, yakuman=1, key_fact=fact_four_concealed)
+def yaku_sianke(c, d):
+    return True
+
+
+@register("dasanyan", 13, 13, requires=fact_normal | fact_three_dragons, yakuman=1, key_fact=fact_three_dragons)
+def yaku_dasanyan(c, d):
+    return all(index in d.threes for index in dragon_indices)
+
+
+@register("ziyise", 13, 13, requires=fact_no_simple | fact_no_terminal, yakuman=1, key_fact=fact_no_simple)
+def yaku_ziyise(c, d):
+    return True
+
+
+@register("lvyise", 13, 13, requires=fact_all_green, yakuman=1, key_fact=fact_all_green)
+def yaku_lvyise(c, d):
+    return True
+
+
+@register("qinglaotou", 13, 13, requires=fact_no_simple | fact_no_honor, yakuman=1, key_fact=fact_no_simple)
+def yaku_qinglaotou(c, d):
+    return True
+
+
+@register("dasixi", 26, 26, requires=fact_normal | fact_four_winds, excludes=("xiaosixi",), yakuman=2,
+          key_fact=fact_four_winds)
+def yaku_dasixi(c, d):
+    return all(index in d.threes for index in wind_indices)
+
+
+@register("xiaosixi", 13, 13, requires=fact_normal | fact_four_winds, yakuman=1, key_fact=fact_four_winds)
+def yaku_xiaosixi(c, d):
+    return d.pair in wind_indices and sum(1 for index in wind_indices if index in d.threes) == 3
+
+
+@register("sigangzi", 13, 13, requires=fact_four_kans, yakuman=1, key_fact=fact_four_kans)
+def yaku_sigangzi(c, d):
+    return True
+
+
+@register("chunzhengjiulian", 26, requires=fact_one_suit | fact_no_honor, excludes=("jiulian",), yakuman=2,
+          key_fact=fact_one_suit)
+def yaku_chunzhengjiulian(c, d):
+    return jiulian_kind(c) == 2
+
+
+@register("jiulian", 13, requires=fact_one_suit | fact_no_honor, yakuman=1, key_fact=fact_one_suit)
+def yaku_jiulian(c, d):
+    return jiulian_kind(c) == 1
+
+
+for _rule in yaku_registry + yakuman_registry:
+    for _name in _rule.excludes:
+        _rule.exclude_mask |= rule_bits[_name]
+
+
+class Evaluation:
+    """
+    一种解释的计算结果
+    """
+
+    def __init__(self, context, decomposition, yaku, han, yakuman):
+        self.context = context
+        self.decomposition = decomposition
+        self.yaku = yaku  # [(役的名字, 番数)]
+        self.han = han  # 番数，不包括宝牌
+        self.yakuman = yakuman  # 役满的倍数，0表示不是役满
+
+
+def evaluate_rules(context: WinContext, decomposition: Decomposition, registry):
+    """
+    依次判断注册的役，跳过前提条件不满足或者已经被排除的役
+    :return: [(役的名字, 番数)]
+    """
+    facts = context.facts | decomposition.facts
+    yaku = []
+    excluded = 0
+    for rule in registry:
+        if rule.requires & ~facts or rule.bit & excluded:
+            continue
+        if rule.func(context, decomposition):
+            yaku.append((rule.name, rule.closed_han if context.closed else rule.open_han))
+            excluded |= rule.exclude_mask
+    return yaku
+
+
+def evaluate_decomposition(context: WinContext, decomposition: Decomposition):
+    """
+    在一种解释上判断所有的役
+    有役满的时候只计算役满，所有役满的关键事实都不满足的时候跳过整个役满家族
+    """
+    if (context.facts | decomposition.facts) & yakuman_gate:
+        yaku = evaluate_rules(context, decomposition, yakuman_registry)
+        if yaku:
+            han = sum(n for _, n in yaku)
+            return Evaluation(context, decomposition, yaku, han, han // yakuman_han)
+
+    yaku = evaluate_rules(context, decomposition, yaku_registry)
+    return Evaluation(context, decomposition, yaku, sum(n for _, n in yaku), 0)
+
+
+def yaku_holds(view, name):
+    """
+    判断和牌的某一种分组是否满足名字为name的役，不考虑和其他役的排除关系，rule中的is_*函数通过这里判断
+    :param view: 和牌时玩家的view，action_tile是和了的牌
+    :return: 不是和牌型则返回False
+    """
+    rule = yaku_rules[name]
+    context = WinContext(view)
+    for decomposition in decompositions(context):
+        if not rule.requires & ~(context.facts | decomposition.facts) and rule.func(context, decomposition):
+            return True
+    return False
+
+
+def evaluate_hand(view):
+    """
+    计算和牌的所有役，只分组一次，所有的役共享分组结果
+    番数相同的解释取符数高的，和score_hand的选择一致；需要点数的话以score.score_hand为准，它同时考虑了宝牌和点数的上限
+    :param view: 和牌时玩家的view，action_tile是和了的牌
+    :return: 番数最高的Evaluation，如果不是和牌型或者无役则返回None
+    """
+    # 在这里导入，避免和score之间循环导入
+    from score import calculate_fu
+
+    context = WinContext(view)
+    best = None
+    best_key = None
+    for decomposition in decompositions(context):
+        evaluation = evaluate_decomposition(context, decomposition)
+        if not evaluation.han:
+            continue
+        if best is not None and evaluation.han < best_key[0]:
+            continue
+        key = (evaluation.han, calculate_fu(context, decomposition,
+                                            any(name == "pinghu" for name, _ in evaluation.yaku)))
+        if best is None or key > best_key:
+            best = evaluation
+            best_key = key
+    return best
@@ -0,0 +1,93 @@
+"""
+测试用的简单agent
+"""
+from agent.Agent import Agent
+from call_options import discard_call_options, draw_call_options
+from score import score_hand
+from shanten import shanten
+from tile import angang
+
+
+class Tsumogiri(Agent):
+    """
+    摸什么切什么，从不和牌和副露
+    """
+    need_view = False
+
+    def draw_response(self, state, tile, lingshang=False):
+        return "qiepai", tile
+
+    def discard_response(self, state, tile):
+        return None
+
+    def meld_response(self, state, meld):
+        return False
+
+
+class Greedy(Agent):
+    """
+    切掉向听数最小的牌，听牌就立直，能和就和，碰三元牌
+    View中看不到振听，所以荣和之前从牌桌查询
+    """
+
+    def __init__(self, table=None, win=True):
+        """
+        :param table: 这个agent所在的牌桌，None则不知道是否振听，只自摸不荣和
+        :param win: 是否和牌，不和牌的话也不立直，听牌之后会一直见逃，没有役的听牌也会出现
+        """
+        self.table = table
+        self.win = win
+
+    def draw_response(self, state, tile, lingshang=False):
+        if self.win and tile is not None and score_hand(state) is not None:
+            return "zimo", None
+        if state.richi_flag[state.player_id]:
+            return "qiepai", tile
+        hand = list(state.hand_tiles)
+        best = min(range(len(hand)), key=lambda i: shanten(hand[:i] + hand[i + 1:]))
+        closed = all(meld.meld_type == angang for meld in state.all_player_melds[state.player_id])
+        if self.win and tile is not None and closed and shanten(hand[:best] + hand[best + 1:]) == 0 and \
+                state.all_player_point_bar[state.player_id] >= 1000 and state.n_wall_tiles >= 4:
+            return "lizhi", hand[best]
+        return "qiepai", hand[best]
+
+    def discard_response(self, state, tile):
+        if self.can_rong(state) and score_hand(state) is not None:
+            return "rong", None
+        if not state.richi_flag[state.player_id] and tile.index >= 31 and state.hand_tiles.count(tile) >= 2:
+            return "peng", None
+        return None
+
+    def meld_response(self, state, meld):
+        return self.can_rong(state)
+
+    def can_rong(self, state):
+        return self.win and self.table is not None and not self.table.is_furiten(state.player_id)
+
+
+class Caller(Greedy):
+    """
+    在Greedy的基础上尽量开杠、碰和吃，用来覆盖副露和杠相关的事件
+    能够进行的副露由call_options列举，所以不会作出非法的副露
+    """
+
+    def draw_response(self, state, tile, lingshang=False):
+        player_id = state.player_id
+        if tile is not None and not state.richi_flag[player_id]:
+            options = draw_call_options(self.table.hands[player_id], state.all_player_melds[player_id],
+                                        self.table.can_draw_lingshang())
+            if options and (not self.win or score_hand(state) is None):
+                return options[0]
+        return super().draw_response(state, tile, lingshang)
+
+    def discard_response(self, state, tile):
+        response = super().discard_response(state, tile)
+        if response is not None or state.richi_flag[state.player_id] or not state.n_wall_tiles:
+            return response
+        options = discard_call_options(self.table.hands[state.player_id], tile,
+                                       (state.player_id - state.action_id) % 4 == 1, self.table.can_draw_lingshang())
+        for operation in ("minggang", "peng", "chi"):
+            for option in options:
+                if option[0] == operation:
+                    return option
+        return None
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# game中的模块互相直接导入，agent在仓库的根目录，测试时把两者都加入搜索路径
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(root, "game"), root]
@@ -0,0 +1,131 @@
+"""
+查找表的和牌和听牌判断与暴力分组的结果比较
+"""
+import random
+
+import pytest
+
+from agari_table import build_table, encode, is_agari, agari_wait_indices, get_tables
+
+
+def brute_force_agari(counts, need_pair=True):
+    """
+    暴力递归分组，判断是否能分成若干面子和一个雀头
+    """
+    counts = list(counts)
+    first = next((index for index, n in enumerate(counts) if n), None)
+    if first is None:
+        return not need_pair
+    if need_pair and counts[first] >= 2:
+        counts[first] -= 2
+        if brute_force_agari(counts, False):
+            return True
+        counts[first] += 2
+    if counts[first] >= 3:
+        counts[first] -= 3
+        if brute_force_agari(counts, need_pair):
+            return True
+        counts[first] += 3
+    if first < 27 and first % 9 <= 6 and counts[first + 1] and counts[first + 2]:
+        for index in (first, first + 1, first + 2):
+            counts[index] -= 1
+        if brute_force_agari(counts, need_pair):
+            return True
+    return False
+
+
+def brute_force_waits(counts):
+    waits = []
+    for index in range(34):
+        if counts[index] < 4:
+            counts[index] += 1
+            if brute_force_agari(counts):
+                waits.append(index)
+            counts[index] -= 1
+    return waits
+
+
+def random_counts(rng, n_tiles, n_kinds=34):
+    """
+    从前n_kinds种牌中随机取n_tiles张，种类少的时候更容易和牌
+    """
+    counts = [0] * 34
+    while sum(counts) < n_tiles:
+        index = rng.randrange(n_kinds)
+        if counts[index] < 4:
+            counts[index] += 1
+    return counts
+
+
+def random_agari_counts(rng):
+    """
+    随机组合四个面子和一个雀头
+    """
+    while True:
+        counts = [0] * 34
+        for _ in range(4):
+            if rng.random() < 0.5:
+                start = rng.choice([index for index in range(27) if index % 9 <= 6])
+                for index in (start, start + 1, start + 2):
+                    counts[index] += 1
+            else:
+                counts[rng.randrange(34)] += 3
+        counts[rng.randrange(34)] += 2
+        if max(counts) <= 4:
+            return counts
+
+
+def test_suit_table_matches_brute_force():
+    suit, character = get_tables()
+    assert suit == build_table(9, True)
+    assert character == build_table(7, False)
+    rng = random.Random(0)
+    for _ in range(2000):
+        counts = random_counts(rng, rng.choice((3, 5, 6, 8, 9, 11, 12, 14)), 9)
+        pattern = encode(counts, 0, 9)
+        key_ok = pattern in suit
+        assert key_ok == (brute_force_agari(counts, False) or brute_force_agari(counts, True))
+        if key_ok:
+            mask = suit[pattern]
+            if sum(counts) % 3 == 0:
+                assert mask == 0
+            else:
+                for pair in range(9):
+                    expected = counts[pair] >= 2 and brute_force_agari(
+                        [n - 2 * (index == pair) for index, n in enumerate(counts)], False)
+                    assert bool(mask >> pair & 1) == expected
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_is_agari_matches_brute_force(seed):
+    rng = random.Random(seed)
+    n_agari = 0
+    for _ in range(1500):
+        counts = random_agari_counts(rng) if rng.random() < 0.5 else random_counts(rng, 14, rng.choice((9, 18, 34)))
+        expected = brute_force_agari(counts)
+        assert is_agari(counts) == expected, counts
+        n_agari += expected
+    assert n_agari > 500
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_wait_indices_match_brute_force(seed):
+    rng = random.Random(seed)
+    for _ in range(500):
+        counts = random_agari_counts(rng)
+        counts[rng.choice([index for index in range(34) if counts[index]])] -= 1
+        assert sorted(agari_wait_indices(counts)) == brute_force_waits(counts), counts
+        counts = random_counts(rng, 13, rng.choice((9, 18)))
+        assert sorted(agari_wait_indices(counts)) == brute_force_waits(counts), counts
+
+
+def test_known_waits():
+    # 1112345678999万是九面听
+    counts = [3, 1, 1, 1, 1, 1, 1, 1, 3] + [0] * 25
+    assert sorted(agari_wait_indices(counts)) == list(range(9))
+    # 只有字牌的单骑
+    counts = [0] * 34
+    counts[27] = counts[28] = counts[29] = 3
+    counts[31] = 3
+    counts[33] = 1
+    assert agari_wait_indices(counts) == [33]
@@ -0,0 +1,89 @@
+"""
+吃碰杠选项的列举，包括数牌边界上的吃和红宝牌组成的不同选项
+"""
+import pytest
+
+from call_options import chi_neighbors, tile_variants, discard_call_options, draw_call_options, find_call_option
+from hand import Hand
+from tiles import parse
+
+
+def index(text):
+    return parse(text)[0].index
+
+
+def names(tiles):
+    """
+    牌的写法，红宝牌写作0
+    """
+    return "".join("0" if tile.red else str(tile.index % 9 + 1) for tile in tiles) + "mpsz"[tiles[0].index // 9]
+
+
+@pytest.mark.parametrize("tile, neighbors", [
+    ("1m", ["2m3m"]),
+    ("2p", ["1p3p", "3p4p"]),
+    ("5s", ["3s4s", "4s6s", "6s7s"]),
+    ("8m", ["6m7m", "7m9m"]),
+    ("9p", ["7p8p"]),
+    ("9s", ["7s8s"]),
+    ("1z", []),
+    ("7z", []),
+])
+def test_chi_neighbors_at_edges(tile, neighbors):
+    assert [(low, high) for low, high in chi_neighbors[index(tile)]] == \
+           [(index(text[:2]), index(text[2:])) for text in neighbors]
+
+
+@pytest.mark.parametrize("hand, tile, expected", [
+    # 1和9只能在顺子的一端，不能和别的花色连起来
+    ("23m89m1p", "1m", ["23m"]),
+    ("78p12s", "9p", ["78p"]),
+    ("89m12p", "9m", []),
+    ("12z34z", "3z", []),
+    ("34s67s", "5s", ["34s", "46s", "67s"]),
+])
+def test_chi_options(hand, tile, expected):
+    options = discard_call_options(Hand(parse(hand)), parse(tile)[0], from_left=True)
+    assert [names(tiles) for operation, tiles in options if operation == "chi"] == expected
+    assert not discard_call_options(Hand(parse(hand)), parse(tile)[0], from_left=False)
+
+
+@pytest.mark.parametrize("hand, tile, n, expected", [
+    ("5m", "5m", 1, ["5m"]),
+    ("0m", "5m", 1, ["0m"]),
+    ("05m", "5m", 1, ["0m", "5m"]),
+    ("05m", "5m", 2, ["05m"]),
+    ("055p", "5p", 2, ["05p", "55p"]),
+    ("055p", "5p", 3, ["055p"]),
+    ("0555s", "5s", 3, ["055s", "555s"]),
+    ("55s", "5s", 3, []),
+    ("0m55p", "5p", 2, ["55p"]),
+    ("0m44m", "4m", 2, ["44m"]),
+])
+def test_tile_variants(hand, tile, n, expected):
+    assert [names(tiles) for tiles in tile_variants(Hand(parse(hand)), index(tile), n)] == expected
+
+
+@pytest.mark.parametrize("hand, tile, expected", [
+    ("46m05m", "5m", [("chi", "46m"), ("peng", "05m")]),
+    ("46m055m", "5m", [("chi", "46m"), ("peng", "05m"), ("peng", "55m"), ("minggang", "055m")]),
+    ("0p6p9s", "4p", [("chi", "06p")]),
+    ("03s47s", "6s", [("chi", "40s"), ("chi", "07s")]),
+    ("3405m", "6m", [("chi", "40m"), ("chi", "45m")]),
+    ("34m56m", "5m", [("chi", "34m"), ("chi", "46m")]),
+    ("055m5p", "5m", [("peng", "05m"), ("peng", "55m"), ("minggang", "055m")]),
+    ("0555m", "5m", [("peng", "05m"), ("peng", "55m"), ("minggang", "055m"), ("minggang", "555m")]),
+])
+def test_red_five_variants(hand, tile, expected):
+    options = discard_call_options(Hand(parse(hand)), parse(tile)[0], from_left=True)
+    assert [(operation, names(tiles)) for operation, tiles in options] == expected
+    for operation, tiles in options:
+        assert find_call_option(options, operation, list(reversed(tiles)))[1] == tiles
+
+
+def test_kan_options():
+    assert not discard_call_options(Hand(parse("555m")), parse("5m")[0], can_kan=False)[1:]
+    hand = Hand(parse("0555m1p"))
+    assert [(operation, tile.index, tile.red) for operation, tile in draw_call_options(hand, [])] == \
+           [("angang", index("5m"), 0)]
+    assert draw_call_options(hand, [], can_kan=False) == []
@@ -0,0 +1,74 @@
+"""
+View编码的形状和已知通道的取值
+"""
+import numpy as np
+import pytest
+
+from encoder import encode_view, encode_views, feature_shape, hand_channel, red_channel, action_tile_channel, \
+    dora_indicator_channel, dora_channel, seat_channel, seat_stride, discard_offset, richi_offset, \
+    field_wind_channel, seat_wind_channel, n_pon_channel, point_channel, n_wall_tiles_channel
+from table import View
+from tile import mo
+from tiles import parse
+
+
+def make_view(player_id=1, banker=0, field_wind="south"):
+    discards = [parse("1z"), parse("9m9m"), parse("5p"), []]
+    return View(player_id=player_id, action_id=player_id, action=mo, action_tile=parse("3s")[0],
+                hand_tiles=parse("1122m0p55p3s"), all_player_melds=[[] for _ in range(4)],
+                all_player_discard_tiles=discards, all_player_point_bar=[25000, 30000, 20000, 25000],
+                east_or_south="south", field_number=2, n_pon=1, field_wind=field_wind, banker=banker,
+                dora_indicator=parse("9p"), n_wall_tiles=60, discard_tiles=[], n_richi_bar=0,
+                richi_flag=[False, False, True, False], yifa_flag=[False] * 4, lianglizhi_flag=[False] * 4,
+                all_player_tsumogiri_flags=[[False], [True, False], [False], []],
+                richi_discard_index=[None, None, 0, None])
+
+
+def index(text):
+    return parse(text)[0].index
+
+
+def test_known_channels():
+    view = make_view()
+    features = encode_view(view)
+    assert features.shape == feature_shape == (37, 34) and features.dtype == np.float32
+    # 手牌计数: 1m和2m各两张，5p有三张(其中一张红)，3s一张
+    assert features[hand_channel:hand_channel + 4, index("1m")].tolist() == [1, 1, 0, 0]
+    assert features[hand_channel:hand_channel + 4, index("5p")].tolist() == [1, 1, 1, 0]
+    assert features[hand_channel:hand_channel + 4].sum() == len(view.hand_tiles)
+    assert features[red_channel].tolist() == [float(i == index("5p")) for i in range(34)]
+    assert features[action_tile_channel, index("3s")] == 1
+    # 宝牌指示牌9p，宝牌1p
+    assert features[dora_indicator_channel].nonzero()[0].tolist() == [index("9p")]
+    assert features[dora_channel].nonzero()[0].tolist() == [index("1p")]
+    # 相对座次: 第0家是自己(1号)，第1家是2号，第3家是0号
+    assert features[seat_channel + discard_offset, index("9m")] == 2
+    assert features[seat_channel + seat_stride * 3 + discard_offset, index("1z")] == 1
+    assert (features[seat_channel + seat_stride + richi_offset] == 1).all()
+    assert (features[seat_channel + richi_offset] == 0).all()
+    # 场风南，1号是庄家0号的下家，自风南
+    assert features[field_wind_channel].nonzero()[0].tolist() == [index("2z")]
+    assert features[seat_wind_channel].nonzero()[0].tolist() == [index("2z")]
+    assert (features[n_pon_channel] == 1).all()
+    assert features[point_channel:point_channel + 4, 0].tolist() == [30, 20, 25, 25]
+    assert (features[n_wall_tiles_channel] == 60).all()
+
+
+@pytest.mark.parametrize("player_id, banker, field_wind, seat_wind", [(0, 0, "east", "1z"), (3, 1, "west", "3z")])
+def test_winds(player_id, banker, field_wind, seat_wind):
+    features = encode_view(make_view(player_id, banker, field_wind))
+    assert features[field_wind_channel].nonzero()[0].tolist() == [index({"east": "1z", "west": "3z"}[field_wind])]
+    assert features[seat_wind_channel].nonzero()[0].tolist() == [index(seat_wind)]
+
+
+def test_buffers_are_overwritten():
+    views = [make_view(player_id) for player_id in range(4)]
+    out = np.full((4,) + feature_shape, 7, dtype=np.float32)
+    assert encode_views(views, out=out) is out
+    for i, view in enumerate(views):
+        assert (out[i] == encode_view(view)).all()
+    single = np.full(feature_shape, 7, dtype=np.float32)
+    assert encode_view(views[0], out=single) is single and (single == out[0]).all()
+    assert encode_views([]).shape == (0,) + feature_shape
+    with pytest.raises(ValueError):
+        encode_view(views[0], out=np.zeros((36, 34), dtype=np.float32))
@@ -0,0 +1,109 @@
+"""
+牌谱的写入和读取，对局时写入的每个事件都应该能从mmap读回
+"""
+import random
+
+import pytest
+
+from agents import Tsumogiri, Greedy, Caller
+from game_log import GameLogWriter, GameLogReader, write_varint, read_varint, game_start_event, \
+    round_start_event, call_event, round_end_event, game_end_event, payload_sizes, call_payload_size, none
+from table import Table
+
+
+class RecordingWriter(GameLogWriter):
+    """
+    同时在内存中保存写入的每个事件
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.records = []
+
+    def event(self, kind, seat=none, tile=none, arg=0, payload=b""):
+        self.records.append((kind, seat, tile, arg, bytes(payload)))
+        super().event(kind, seat, tile, arg, payload)
+
+
+def play_logged(path, n_games, buffer_size=1 << 16):
+    """
+    把n_games场对局写入path
+    :return: (写入的事件, 每场对局每一局的结果, 每场对局的最终点棒)
+    """
+    table = Table()
+    results = []
+    finals = []
+    with RecordingWriter(path, buffer_size=buffer_size) as log:
+        table.log = log
+        for seed in range(n_games):
+            agents = [Caller(table), Greedy(table), Caller(table), Tsumogiri()]
+            finals.append(table.play_game(agents, "south", seed=seed, shuffle_seat=True))
+            results.append([(result.kind if result.kind != "liuju" else result.reason, result.winner, result.loser,
+                             list(result.deltas)) for result in table.round_results])
+    return log.records, results, finals
+
+
+def test_varint_round_trip():
+    rng = random.Random(0)
+    values = [0, 1, -1, 63, -64, 64, -65, 32000, -48000, 1 << 40] + [rng.randint(-10 ** 6, 10 ** 6)
+                                                                   for _ in range(200)]
+    buffer = bytearray()
+    for value in values:
+        write_varint(buffer, value)
+    position = 0
+    for value in values:
+        decoded, position = read_varint(buffer, position)
+        assert decoded == value
+    assert position == len(buffer)
+
+
+@pytest.mark.parametrize("buffer_size", [64, 1 << 16])
+def test_events_round_trip(tmp_path, buffer_size):
+    path = str(tmp_path / "games.bin")
+    records, _, _ = play_logged(path, 3, buffer_size)
+    with GameLogReader(path) as reader:
+        data = reader.data
+        read = []
+        for position, kind, seat, tile, arg in reader:
+            size = payload_sizes[kind]
+            if size is None:
+                size = call_payload_size(arg) if kind == call_event else arg
+            read.append((kind, seat, tile, arg, bytes(data[position + 4:position + 4 + size])))
+        assert read == records
+        assert len(reader.games()) == 3
+
+
+def test_decoded_results(tmp_path):
+    path = str(tmp_path / "games.bin")
+    _, results, finals = play_logged(path, 3)
+    with GameLogReader(path) as reader:
+        decoded_results = []
+        decoded_finals = []
+        n_calls = 0
+        for position, kind, seat, tile, arg in reader:
+            if kind == game_start_event:
+                east_or_south, seat_slots = reader.game_start(position)
+                assert east_or_south == "south" and sorted(seat_slots) == [0, 1, 2, 3]
+                decoded_results.append([])
+            elif kind == round_start_event:
+                wall = bytes(reader.wall(position))
+                assert sorted(wall) == list(range(136))
+                assert sum(reader.round_start(position)[5]) + 1000 * reader.round_start(position)[4] == 100000
+            elif kind == call_event:
+                assert len(reader.call_tiles(position)) == call_payload_size(arg)
+                n_calls += 1
+            elif kind == round_end_event:
+                name, winner, loser, deltas, _ = reader.round_end(position)
+                decoded_results[-1].append((name, winner, loser, deltas))
+            elif kind == game_end_event:
+                decoded_finals.append(reader.game_end(position))
+    assert decoded_results == results
+    assert decoded_finals == finals
+    assert n_calls > 0
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a log")
+    with pytest.raises(ValueError):
+        GameLogReader(str(path))
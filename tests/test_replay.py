@@ -0,0 +1,107 @@
+"""
+从牌谱重现对局，重现的View应该和对局时agent看到的完全相同，随机访问和顺序重现的结果也应该相同
+"""
+import random
+
+import pytest
+
+from agents import Tsumogiri, Greedy, Caller
+from encoder import encode_view
+from game_log import GameLogWriter, GameLogReader, game_start_event
+from replay import GameReplay
+from table import Table
+
+
+class CountingWriter(GameLogWriter):
+    """
+    记录最后写入的事件在这场对局中的编号
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.index = -1
+
+    def event(self, kind, *args, **kwargs):
+        self.index = 0 if kind == game_start_event else self.index + 1
+        super().event(kind, *args, **kwargs)
+
+
+def dump(view):
+    """
+    View的所有内容，包括红宝牌标记和编码之后的张量
+    """
+    return (view.player_id, view.action_id, view.action, view.action_tile,
+            None if view.action_tile is None else view.action_tile.red,
+            [(tile.index, tile.red) for tile in view.hand_tiles],
+            [[(meld.meld_type, [tile.id for tile in meld.tiles], meld.offer_player) for meld in melds]
+             for melds in view.all_player_melds],
+            [list(tiles) for tiles in view.all_player_discard_tiles],
+            [list(flags) for flags in view.all_player_tsumogiri_flags], list(view.all_player_point_bar),
+            list(view.richi_flag), list(view.yifa_flag), list(view.lianglizhi_flag), list(view.richi_discard_index),
+            view.east_or_south, view.field_wind, view.field_number, view.banker, view.n_pon, view.n_richi_bar,
+            list(view.dora_indicator), view.n_wall_tiles, list(view.discard_tiles), encode_view(view).tobytes())
+
+
+@pytest.fixture(scope="module")
+def logged_games(tmp_path_factory):
+    """
+    写入几场对局，同时记录每个决定时agent看到的View
+    :return: (牌谱路径, 每场对局中(事件编号, 作出决定的玩家) -> View的内容)
+    """
+    path = str(tmp_path_factory.mktemp("replay") / "games.bin")
+    table = Table()
+    live = []
+    with CountingWriter(path) as log:
+        table.log = log
+        for seed in range(3):
+            agents = [Caller(table), Greedy(table), Caller(table), Tsumogiri()]
+            steps = table.game_steps(agents, seed=seed, shuffle_seat=True)
+            views = {}
+            try:
+                decision = next(steps)
+                while True:
+                    views.setdefault((log.index, decision.player_id), dump(decision.view()))
+                    decision = steps.send(decision.ask(table.agents[decision.player_id]))
+            except StopIteration:
+                pass
+            live.append(views)
+    return path, live
+
+
+def test_replay_matches_live_views(logged_games):
+    path, live = logged_games
+    with GameLogReader(path) as reader:
+        games = reader.games()
+        assert len(games) == len(live)
+        for position, views in zip(games, live):
+            replay = GameReplay(reader, position)
+            assert set(views) <= set(replay.decisions())
+            for index, player_id in sorted(views):
+                assert dump(replay.view(index, player_id)) == views[index, player_id]
+
+
+def test_random_access_matches_sequential(logged_games):
+    path, _ = logged_games
+    with GameLogReader(path) as reader:
+        for position in reader.games():
+            sequential = GameReplay(reader, position)
+            keys = list(sequential.decisions())
+            expected = {key: dump(sequential.view(*key)) for key in keys}
+
+            replay = GameReplay(reader, position, checkpoint_interval=8)
+            for key in random.Random(position).sample(keys, min(len(keys), 200)):
+                assert dump(replay.view(*key)) == expected[key]
+            assert replay.checkpoints
+
+
+def test_view_errors(logged_games):
+    path, _ = logged_games
+    with GameLogReader(path) as reader:
+        position = reader.games()[0]
+        replay = GameReplay(reader, position)
+        with pytest.raises(ValueError):
+            replay.view(0)
+        with pytest.raises(IndexError):
+            replay.seek(len(replay))
+        with pytest.raises(ValueError):
+            GameReplay(reader, position + 4)
@@ -0,0 +1,82 @@
+"""
+多进程对局和批量调度的测试，同样的种子无论怎样分配对局，统计结果都应该相同
+"""
+from agent.BatchAgent import BatchAgent
+from agents import Tsumogiri, Greedy
+from runner import GameStats, run_games, game_setup, game_seed
+from scheduler import BatchScheduler
+from table import Table
+
+
+def make_agents():
+    """
+    工作进程中创建agents，没有牌桌的Greedy只自摸不荣和
+    """
+    return [Greedy(), Greedy(), Tsumogiri(), Tsumogiri()]
+
+
+class BatchGreedy(BatchAgent):
+    """
+    逐个用没有牌桌的Greedy回应，和make_agents中的Greedy相同，记录调用的次数
+    """
+
+    def __init__(self):
+        self.agent = Greedy()
+        self.n_calls = 0
+        self.n_decisions = 0
+
+    def batch_response(self, decisions):
+        self.n_calls += 1
+        self.n_decisions += len(decisions)
+        return [decision.ask(self.agent) for decision in decisions]
+
+
+def stats_tuple(stats: GameStats):
+    return (stats.n_games, stats.n_rounds, stats.placements, stats.point_deltas, stats.n_wins, stats.n_zimo,
+            stats.n_deal_ins)
+
+
+def play_sequentially(agents, n_games, seed, duplicate=False):
+    """
+    不经过runner，在一张牌桌上按照同样的种子和座次依次进行对局
+    """
+    table = Table()
+    stats = GameStats()
+    for game_index in range(n_games):
+        current_seed, seat_order = game_setup(seed, game_index, duplicate)
+        points = table.play_game(agents, "east", current_seed, True, seat_order)
+        stats.add_game(points, table.round_results, table.seat_slots)
+    return stats
+
+
+def test_processes_give_identical_stats():
+    *_, single = run_games(make_agents, 12, seed=5, processes=1, chunk_size=5)
+    *_, parallel = run_games(make_agents, 12, seed=5, processes=2, chunk_size=3)
+    assert single.n_games == 12
+    assert stats_tuple(single) == stats_tuple(parallel)
+    assert stats_tuple(single) == stats_tuple(play_sequentially(make_agents(), 12, 5))
+
+
+def test_duplicate_rotates_every_seat():
+    for group in range(3):
+        setups = [game_setup(7, group * 4 + rotation, duplicate=True) for rotation in range(4)]
+        assert {seed for seed, _ in setups} == {game_seed(7, group)}
+        for seat in range(4):
+            assert sorted(order[seat] for _, order in setups) == [0, 1, 2, 3]
+
+    table = Table()
+    for game_index in range(4):
+        seed, seat_order = game_setup(7, game_index, duplicate=True)
+        table.play_game(make_agents(), seed=seed, seat_order=seat_order)
+        assert table.seat_slots == seat_order
+
+    *_, stats = run_games(make_agents, 8, seed=7, processes=1, duplicate=True)
+    assert all(sum(counts) == 8 for counts in stats.placements)
+
+
+def test_scheduler_matches_play_game():
+    agent = BatchGreedy()
+    agents = [agent, agent, Tsumogiri(), Tsumogiri()]
+    stats = BatchScheduler(agents, n_tables=4, seed=3).run(10)
+    assert stats_tuple(stats) == stats_tuple(play_sequentially(make_agents(), 10, 3))
+    assert agent.n_calls < agent.n_decisions
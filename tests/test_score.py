@@ -0,0 +1,135 @@
+"""
+已知和牌的役、番数、符数和点数
+"""
+import pytest
+
+from meld import Meld
+from score import score_hand
+from table import View
+from yaku import evaluate_hand
+from tile import mo, qie, chi, peng
+from tiles import parse
+
+
+def make_view(hand, win, tsumo, melds=(), player_id=0, banker=1, richi=False, dora=(), n_pon=0):
+    """
+    构造和牌时的view，手牌不包括和了的牌，牌河中放一张牌表示已经不是第一巡
+    """
+    all_player_melds = [[] for _ in range(4)]
+    all_player_melds[player_id] = list(melds)
+    richi_flag = [False] * 4
+    richi_flag[player_id] = richi
+    return View(player_id=player_id, action_id=player_id if tsumo else (player_id + 1) % 4,
+                action=mo if tsumo else qie, action_tile=parse(win)[0], hand_tiles=parse(hand),
+                all_player_melds=all_player_melds, all_player_discard_tiles=[parse("1m") for _ in range(4)],
+                all_player_point_bar=[25000] * 4, east_or_south="east", field_number=1, n_pon=n_pon,
+                field_wind="east", banker=banker, dora_indicator=parse(dora) if dora else [], n_wall_tiles=50,
+                discard_tiles=[], n_richi_bar=0, richi_flag=richi_flag, yifa_flag=[False] * 4,
+                lianglizhi_flag=[False] * 4)
+
+
+def yaku_names(result):
+    return sorted(name for name, _ in result.yaku)
+
+
+def test_pinghu_ron():
+    result = score_hand(make_view("23m456p789p234s55s", "1m", tsumo=False))
+    assert yaku_names(result) == ["pinghu"]
+    assert (result.han, result.fu) == (1, 30)
+    assert result.deltas == [1000, -1000, 0, 0]
+
+
+def test_pinghu_tsumo_tanyao():
+    result = score_hand(make_view("234m567m34p567s88s", "5p", tsumo=True))
+    assert yaku_names(result) == ["duanyao", "menqianqingzimo", "pinghu"]
+    assert (result.han, result.fu) == (3, 20)
+    # 庄家支付1300，闲家各支付700
+    assert result.deltas == [2700, -1300, -700, -700]
+
+
+def test_dealer_yakuhai_ron():
+    result = score_hand(make_view("123m456p78s99s777z", "6s", tsumo=False, banker=0))
+    assert yaku_names(result) == ["yipai_honor_center"]
+    # 20符底符，门前清荣和10符，字牌暗刻8符
+    assert (result.han, result.fu) == (1, 40)
+    assert result.deltas == [2000, -2000, 0, 0]
+
+
+def test_seven_pair_tsumo():
+    result = score_hand(make_view("1133m5577p99s112z", "2z", tsumo=True))
+    assert yaku_names(result) == ["menqianqingzimo", "seven_pair"]
+    assert (result.han, result.fu) == (3, 25)
+    assert result.deltas == [3200, -1600, -800, -800]
+
+
+def test_open_tanyao_ron():
+    meld = Meld(parse("678m"), chi, 0, 3)
+    result = score_hand(make_view("234m567p3345s", "6s", tsumo=False, melds=[meld]))
+    assert yaku_names(result) == ["duanyao"]
+    # 副露的平和型记为30符
+    assert (result.han, result.fu) == (1, 30)
+    assert result.deltas == [1000, -1000, 0, 0]
+
+
+def test_toitoi_open_fu():
+    meld = Meld(parse("222p"), peng, 0, 2)
+    result = score_hand(make_view("999m444s77s55z", "5z", tsumo=False, melds=[meld]))
+    # 荣和的白刻子是明刻，不算暗刻，所以没有三暗刻
+    assert yaku_names(result) == ["duidui", "yipai_honor_white"]
+    # 20 + 幺九暗刻8 + 中张暗刻4 + 荣和的幺九明刻4 + 中张明刻2 = 38符，进位到40符
+    assert (result.han, result.fu) == (3, 40)
+    assert result.deltas == [5200, -5200, 0, 0]
+
+
+def test_guoshi_yakuman():
+    result = score_hand(make_view("19m19p19s1234566z", "7z", tsumo=False))
+    assert yaku_names(result) == ["guoshiwushuang"]
+    assert result.yakuman == 1
+    assert result.deltas == [32000, -32000, 0, 0]
+    # 十三面听是双倍役满
+    result = score_hand(make_view("19m19p19s1234567z", "1m", tsumo=False))
+    assert yaku_names(result) == ["guoshiwuhuangshisanmian"]
+    assert result.deltas == [64000, -64000, 0, 0]
+
+
+def test_dora_honba_and_richi_bar():
+    view = make_view("23m456p789p234s55s", "1m", tsumo=False, richi=True, dora="1m", n_pon=2)
+    result = score_hand(view, inside_dora_indicator=parse("4s"), n_richi_bar=1)
+    assert yaku_names(result) == ["pinghu", "richi"]
+    # 宝牌指示牌1万对应2万一张，里宝牌指示牌4索对应5索两张
+    assert result.n_dora == 3
+    assert (result.han, result.fu) == (5, 30)
+    # 满贯8000，两本场600，一根立直棒1000
+    assert result.deltas == [9600, -8600, 0, 0]
+    # 红宝牌也算宝牌
+    result = score_hand(make_view("23m456p789p234s50s", "1m", tsumo=False))
+    assert result.n_dora == 1
+
+
+def test_no_yaku_and_not_agari():
+    # 副露之后没有役
+    meld = Meld(parse("123m"), chi, 0, 3)
+    assert score_hand(make_view("456p789p234s55s", "1s", tsumo=False, melds=[meld])) is None
+    assert score_hand(make_view("23m456p789p234s55s", "9m", tsumo=False)) is None
+
+
+@pytest.mark.parametrize("hand, win, expected", [
+    ("123m123m456p789s5s", "5s", "yibeikou"),
+    ("123m123p123s789s5s", "5s", "sansetongshun"),
+    ("123456789m234p5p", "5p", "yiqitongguan"),
+    ("1113456789m999p", "2m", None),
+])
+def test_decomposition_yaku(hand, win, expected):
+    result = score_hand(make_view(hand, win, tsumo=False))
+    if expected is None:
+        assert result is not None
+    else:
+        assert expected in yaku_names(result)
+
+
+def test_evaluate_hand_breaks_ties_on_fu():
+    # 三暗刻断幺和平和断幺一杯口都是3番，三暗刻的符数更高
+    view = make_view("333444555m45m88p", "6m", tsumo=False)
+    result = score_hand(view)
+    assert yaku_names(result) == ["duanyao", "sananke"] and result.fu == 50
+    assert evaluate_hand(view).yaku == result.yaku
@@ -0,0 +1,223 @@
+"""
+向听数和有效牌的测试，和整手牌的暴力搜索比较
+"""
+import random
+from functools import lru_cache
+
+import pytest
+
+import shanten as shanten_module
+from hand import Hand
+from shanten import shanten, normal_shanten, seven_pair_shanten, guoshi_shanten, effective_tiles, \
+    discard_effective_tiles
+from shanten import yaojiu_indices
+from test_agari_table import random_agari_counts
+from tile import Tile
+from tiles import parse
+
+all_tiles = [Tile.from_index(index) for index in range(34) for _ in range(4)]
+
+
+@lru_cache(maxsize=None)
+def brute_force_normal(counts, n_melds):
+    """
+    对整手牌暴力搜索面子、搭子和雀头的组合，返回普通牌型的向听数
+    """
+    best = 8
+
+    def search(counts, mentsu, taatsu, pair):
+        nonlocal best
+        first = next((index for index, n in enumerate(counts) if n), None)
+        if first is None:
+            total = mentsu + n_melds
+            best = min(best, 8 - 2 * total - min(taatsu, 4 - total) - pair)
+            return
+        counts = list(counts)
+        counts[first] -= 1
+        search(counts, mentsu, taatsu, pair)
+        counts[first] += 1
+        shapes = [((first, first), 0, 0, 1), ((first, first), 0, 1, 0), ((first,) * 3, 1, 0, 0)]
+        if first < 27:
+            if first % 9 <= 6:
+                shapes.append(((first, first + 1, first + 2), 1, 0, 0))
+                shapes.append(((first, first + 2), 0, 1, 0))
+            if first % 9 <= 7:
+                shapes.append(((first, first + 1), 0, 1, 0))
+        for shape, n_mentsu, n_taatsu, n_pair in shapes:
+            if pair + n_pair > 1 or mentsu + n_mentsu + n_melds > 4:
+                continue
+            rest = list(counts)
+            for index in shape:
+                rest[index] -= 1
+            if min(rest) < 0:
+                continue
+            search(rest, mentsu + n_mentsu, taatsu + n_taatsu, pair + n_pair)
+
+    search(counts, 0, 0, 0)
+    return best
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("123m456p789s11122z", -1),  # 和牌
+    ("123m456p789s1112z", 0),  # 单骑听牌
+    ("19m19p19s1234567z", 0),  # 国士十三面
+    ("113355779m1122z", 0),  # 七对子听牌
+    ("1133557799m1122z", -1),
+    ("147m258p369s1234z", 6),  # 七对子6向听比普通牌型的8向听少
+    ("1112345678999m", 0),  # 九莲宝灯九面听
+    ("11123456789999m", -1),
+])
+def test_known_hands(text, expected):
+    tiles = parse(text)
+    assert shanten(tiles) == expected
+    assert shanten(Hand(tiles)) == expected
+
+
+@pytest.mark.parametrize("n_tiles", [13, 14, 10, 11, 7, 8, 4, 5, 1, 2])
+def test_normal_shanten_matches_brute_force(n_tiles):
+    rng = random.Random(n_tiles)
+    for _ in range(150):
+        tiles = rng.sample(all_tiles, n_tiles)
+        hand = Hand(tiles)
+        expected = brute_force_normal(tuple(hand.counts), 4 - n_tiles // 3)
+        assert normal_shanten(hand) == expected, tiles
+        assert shanten(tiles) == min(expected, seven_pair_shanten(hand), guoshi_shanten(hand))
+
+
+def test_shanten_matches_batch():
+    import numpy as np
+    from rule import batch_shanten
+    rng = random.Random(0)
+    hands = [Hand(rng.sample(all_tiles, rng.choice((13, 14, 10, 5)))) for _ in range(500)]
+    expected = [shanten(hand) for hand in hands]
+    assert batch_shanten(np.array([list(hand.counts) for hand in hands])).tolist() == expected
+
+
+def random_batch_counts(rng):
+    """
+    随机的14张或者少于14张的3n+2张牌型，包括普通和牌型、七对子、国士、替换一张牌之后的牌型和完全随机的牌型
+    """
+    kind = rng.randrange(5)
+    if kind == 0:
+        counts = random_agari_counts(rng)
+    elif kind == 1:
+        counts = [0] * 34
+        for index in rng.sample(range(34), 7):
+            counts[index] = 2
+    elif kind == 2:
+        counts = [0] * 34
+        for index in yaojiu_indices:
+            counts[index] = 1
+        counts[rng.choice(yaojiu_indices)] += 1
+    else:
+        counts = list(Hand(rng.sample(all_tiles, rng.choice((14, 11, 8)))).counts)
+    if kind < 3 and rng.random() < 0.3:
+        # 换掉一张牌，得到接近和牌的牌型
+        counts[rng.choice([index for index, n in enumerate(counts) if n])] -= 1
+        counts[rng.choice([index for index, n in enumerate(counts) if n < 4])] += 1
+    return counts
+
+
+def counts_to_tiles(counts):
+    return [Tile.from_index(index) for index, n in enumerate(counts) for _ in range(n)]
+
+
+def test_batch_is_agari_matches_scalar():
+    import numpy as np
+    from rule import batch_is_agari, is_normal_form, is_seven_pair_form, is_guoshi_form
+    rng = random.Random(1)
+    hands = [random_batch_counts(rng) for _ in range(3000)]
+    expected = []
+    for counts in hands:
+        tiles = counts_to_tiles(counts)
+        expected.append(is_normal_form(tiles) or is_seven_pair_form(tiles) or is_guoshi_form(tiles))
+    assert batch_is_agari(np.array(hands)).tolist() == expected
+    assert 0 < sum(expected) < len(expected)
+
+
+def test_batch_wait_mask_matches_scalar():
+    import numpy as np
+    from rule import batch_wait_mask, normal_form_wait_list, seven_pair_wait_list, guoshi_wait_list
+    rng = random.Random(2)
+    hands = []
+    for _ in range(3000):
+        counts = random_batch_counts(rng)
+        counts[rng.choice([index for index, n in enumerate(counts) if n])] -= 1
+        hands.append(counts)
+    expected = []
+    for counts in hands:
+        tiles = counts_to_tiles(counts)
+        waits = normal_form_wait_list(tiles) | seven_pair_wait_list(tiles) | guoshi_wait_list(tiles)
+        expected.append(sum(1 << tile.index for tile in waits))
+    assert batch_wait_mask(np.array(hands)).tolist() == expected
+    assert any(expected)
+
+
+def brute_force_effective(counts, visible):
+    """
+    逐张尝试摸牌，用shanten重新计算
+    """
+    n_tiles = sum(counts)
+    current = shanten_counts(counts)
+    result = set()
+    n_remain = 0
+    for index in range(34):
+        if counts[index] < 4:
+            counts[index] += 1
+            if shanten_counts(counts) < current:
+                result.add(Tile.from_index(index))
+                n_remain += max(0, 4 - visible[index])
+            counts[index] -= 1
+    assert sum(counts) == n_tiles
+    return current, result, n_remain
+
+
+def shanten_counts(counts):
+    hand = Hand()
+    for index, n in enumerate(counts):
+        for _ in range(n):
+            hand.add(Tile.from_index(index))
+    return shanten(hand)
+
+
+@pytest.mark.parametrize("n_tiles", [14, 11, 8, 5, 2])
+def test_discard_effective_tiles_matches_brute_force(n_tiles):
+    rng = random.Random(n_tiles)
+    for _ in range(40):
+        tiles = rng.sample(all_tiles, n_tiles)
+        counts = list(Hand(tiles).counts)
+        visible = [min(4, n + rng.randrange(3)) for n in counts]
+        result = discard_effective_tiles(tiles, visible)
+        assert set(result) == {tile for tile in tiles}
+        for tile, effective in result.items():
+            counts[tile.index] -= 1
+            assert effective == brute_force_effective(counts, visible)
+            assert effective == effective_tiles(Hand([Tile.from_index(index) for index, n in enumerate(counts)
+                                                      for _ in range(n)]), visible)
+            counts[tile.index] += 1
+
+
+def test_draw_caches_are_bounded():
+    # 容量很小的时候缓存不断被淘汰，结果仍然应该和暴力搜索一致
+    caches = (shanten_module.draw_records, shanten_module.draw_shanten)
+    sizes = [cache.maxsize for cache in caches]
+    try:
+        for cache in caches:
+            cache.resize(8)
+        test_discard_effective_tiles_matches_brute_force(14)
+        assert all(len(cache.data) <= 8 for cache in caches)
+    finally:
+        for cache, size in zip(caches, sizes):
+            cache.resize(size)
+
+
+def test_effective_tiles_seven_pair_and_guoshi():
+    # 七对子一向听: 打出单张之后有五个对子和三张单张，摸到任何一张单张都能听牌
+    shanten_value, tiles, n_remain = effective_tiles(parse("1133m5577p99s123z"))
+    assert shanten_value == 1
+    assert set(parse("123z")) <= tiles
+    # 国士十三面听牌，任何幺九牌都能和牌
+    shanten_value, tiles, n_remain = effective_tiles(parse("19m19p19s1234567z"))
+    assert shanten_value == 0
+    assert tiles == set(parse("19m19p19s1234567z"))
+    assert n_remain == 13 * 3
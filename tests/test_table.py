@@ -0,0 +1,223 @@
+"""
+牌桌状态机的测试，完整地进行对局，检查点棒守恒、确定性以及荣和和振听的处理
+"""
+import inspect
+
+import pytest
+
+import rule
+from agents import Tsumogiri, Greedy, Caller
+from hand import Hand
+from score import score_hand
+from shanten import visible_counts
+from table import Table, ReadOnlyList
+from tile import minggang, angang, jiagang
+
+# 以View为参数的役的判断
+view_predicates = {name[3:]: func for name, func in vars(rule).items()
+                   if name.startswith("is_") and list(inspect.signature(func).parameters) == ["view"]}
+
+
+class AlwaysRong(Tsumogiri):
+    """
+    被询问的时候总是回应荣和，不管能不能荣和
+    """
+
+    def discard_response(self, state, tile):
+        return "rong", None
+
+
+class PredicateCheck(Greedy):
+    """
+    能和牌的时候对牌桌生成的View调用所有的rule.is_*，和score_hand算出的役比较
+    """
+
+    def __init__(self, table):
+        super().__init__(table)
+        self.n_checked = 0
+
+    def check(self, state):
+        result = score_hand(state)
+        if result is not None:
+            holds = {name for name, func in view_predicates.items() if func(state)}
+            for name, _ in result.yaku:
+                assert name not in view_predicates or name in holds, name
+            self.n_checked += 1
+
+    def draw_response(self, state, tile, lingshang=False):
+        if tile is not None:
+            self.check(state)
+        return super().draw_response(state, tile, lingshang)
+
+    def discard_response(self, state, tile):
+        self.check(state)
+        return super().discard_response(state, tile)
+
+
+class TrackingCheck(Caller):
+    """
+    每次作出决定的时候把牌桌增量维护的派生状态和从头重新计算的结果比较
+    """
+
+    def __init__(self, table):
+        super().__init__(table)
+        self.n_checked = 0
+        self.saw_kan = False  # 检查的时候是否有人开过杠
+
+    def check(self, state):
+        table = self.table
+        self.saw_kan |= any(table.n_kan)
+        assert table.visible_counts[state.player_id] == visible_counts(state)
+        for player_id, player in enumerate(table.players):
+            hand = Hand(player.hand_tiles)
+            assert table.hands[player_id] == hand and table.hands[player_id].red_mask == hand.red_mask
+            assert table.closed_flag[player_id] == all(meld.meld_type == angang for meld in player.melds)
+            assert table.n_kan[player_id] == sum(meld.meld_type in (minggang, angang, jiagang)
+                                                 for meld in player.melds)
+            discard_counts = [0] * 34
+            for tile in player.discard_tiles:
+                discard_counts[tile.index] += 1
+            assert table.discard_counts[player_id] == discard_counts
+            # 摸牌之后听牌保持摸牌之前的结果，只在3n+1张的时候比较
+            if len(hand) % 3 == 1:
+                waits = rule.normal_form_wait_list(hand) | rule.seven_pair_wait_list(hand) | \
+                    rule.guoshi_wait_list(hand)
+                assert table.waits[player_id] == waits
+                assert table.discard_furiten_flag[player_id] == any(discard_counts[tile.index] for tile in waits)
+        self.n_checked += 1
+
+    def draw_response(self, state, tile, lingshang=False):
+        self.check(state)
+        return super().draw_response(state, tile, lingshang)
+
+    def discard_response(self, state, tile):
+        self.check(state)
+        return super().discard_response(state, tile)
+
+    def meld_response(self, state, meld):
+        self.check(state)
+        return super().meld_response(state, meld)
+
+
+class FuritenCheckTable(Table):
+    """
+    每次切牌之前检查上一次切牌时听这张牌的其他玩家是否都进入了振听
+    """
+
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self.last_discard = None
+        self.n_checked = 0
+
+    def discard_tile(self, player_id, tile, lizhi=False, tsumogiri=False):
+        if self.last_discard is not None:
+            furiten_flag, discarder, mask = self.last_discard
+            # 一局开始的时候furiten_flag会被替换成新的列表
+            if furiten_flag is self.furiten_flag:
+                for other_id in range(4):
+                    if other_id != discarder and mask >> other_id & 1:
+                        assert self.furiten_flag[other_id]
+                        self.n_checked += 1
+        tile = super().discard_tile(player_id, tile, lizhi, tsumogiri)
+        self.last_discard = self.furiten_flag, player_id, self.ron_candidates(tile)
+        return tile
+
+
+class RonIndexCheckTable(Table):
+    """
+    每次切牌之前和之后检查ron_index是否正好是没有振听的玩家的听牌
+    """
+
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self.n_checked = 0
+
+    def check_ron_index(self):
+        expected = [0] * 34
+        for player_id in range(4):
+            if not self.is_furiten(player_id):
+                for tile in self.waits[player_id]:
+                    expected[tile.index] |= 1 << player_id
+        assert self.ron_index == expected
+        self.n_checked += any(expected)
+
+    def discard_tile(self, player_id, tile, lizhi=False, tsumogiri=False):
+        self.check_ron_index()
+        tile = super().discard_tile(player_id, tile, lizhi, tsumogiri)
+        self.check_ron_index()
+        return tile
+
+
+def play(seed, east_or_south="east"):
+    table = Table()
+    points = table.play_game([Greedy(table), Greedy(table), Greedy(table), Tsumogiri()], east_or_south, seed=seed)
+    return table, points
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_game_finishes_and_conserves_points(seed):
+    table, points = play(seed)
+    assert sum(points) == 100000
+    assert table.n_richi_bar == 0
+    assert table.round_results
+    for result in table.round_results:
+        if result.kind in ("zimo", "rong"):
+            assert result.score is not None and result.deltas[result.winner] > 0
+    assert any(result.kind in ("zimo", "rong") for result in table.round_results)
+
+
+def test_same_seed_same_game():
+    first, first_points = play(7, "south")
+    second, second_points = play(7, "south")
+    assert first_points == second_points
+    assert [(result.kind, result.reason, result.winner, result.deltas) for result in first.round_results] == \
+        [(result.kind, result.reason, result.winner, result.deltas) for result in second.round_results]
+
+
+def test_illegal_rong_raises():
+    table = Table()
+    with pytest.raises(ValueError, match="诈和荣和"):
+        for seed in range(20):
+            table.play_game([AlwaysRong(), AlwaysRong(), AlwaysRong(), AlwaysRong()], seed=seed)
+
+
+def test_missed_rong_sets_furiten():
+    table = FuritenCheckTable()
+    for seed in range(4):
+        table.play_game([Greedy(table, win=False) for _ in range(4)], seed=seed)
+    assert table.n_checked > 0
+
+
+def test_read_only_list():
+    data = [1, 2]
+    view = ReadOnlyList(data)
+    assert view + [3] == [1, 2, 3]
+    assert [0] + view == [0, 1, 2]
+    assert (view + view) == [1, 2, 1, 2]
+    assert view == [1, 2] and view == (1, 2) and view != 1
+    data.append(3)
+    assert view == [1, 2, 3] and view[1:] == [2, 3]
+
+
+def test_predicates_on_table_views():
+    table = Table()
+    agents = [PredicateCheck(table) for _ in range(4)]
+    for seed in range(3):
+        table.play_game(agents, seed=seed)
+    assert sum(agent.n_checked for agent in agents) > 0
+
+
+def test_incremental_state_matches_recomputation():
+    table = Table()
+    agents = [TrackingCheck(table), TrackingCheck(table), TrackingCheck(table), Greedy(table)]
+    for seed in range(6):
+        table.play_game(agents, seed=seed)
+    assert sum(agent.n_checked for agent in agents[:3]) > 0
+    assert any(agent.saw_kan for agent in agents[:3])
+
+
+def test_ron_index_matches_waits():
+    table = RonIndexCheckTable()
+    for seed in range(4):
+        table.play_game([Caller(table), Greedy(table), Greedy(table, win=False), Tsumogiri()], seed=seed)
+    assert table.n_checked > 0
@@ -0,0 +1,69 @@
+"""
+驻留的牌和红宝牌的构造，以及相邻牌和宝牌的查找表
+"""
+import pytest
+
+from tile import Tile, man, pin, suo, wind, honor, no_tile, next_index, prev_index, dora_index
+from tiles import parse
+
+
+def test_tiles_are_interned():
+    for tile in Tile.generate_all_136_tiles():
+        assert Tile.from_id(tile.id) is tile
+        assert Tile(tile.category, tile.value, tile.red).index == tile.index
+    assert Tile(man, 5, 1) is Tile.from_id(16)
+    assert Tile(pin, 5, 1).red and not Tile(pin, 5).red
+
+
+@pytest.mark.parametrize("category, value", [(man, 1), (pin, 4), (suo, 9), (wind, 0), (honor, 2)])
+def test_red_only_for_fives(category, value):
+    with pytest.raises(ValueError):
+        Tile(category, value, 1)
+    with pytest.raises(ValueError):
+        Tile.from_index(Tile(category, value).index, 1)
+
+
+def index(text):
+    return parse(text)[0].index
+
+
+@pytest.mark.parametrize("tile, next_text, prev_text", [
+    ("1m", "2m", None),
+    ("5m", "6m", "4m"),
+    ("9m", None, "8m"),
+    ("1p", "2p", None),
+    ("9p", None, "8p"),
+    ("1s", "2s", None),
+    ("9s", None, "8s"),
+    ("1z", None, None),
+    ("4z", None, None),
+    ("7z", None, None),
+])
+def test_successor_tables(tile, next_text, prev_text):
+    assert next_index[index(tile)] == (no_tile if next_text is None else index(next_text))
+    assert prev_index[index(tile)] == (no_tile if prev_text is None else index(prev_text))
+    tile = parse(tile)[0]
+    assert tile.next() == (None if next_text is None else parse(next_text)[0])
+    assert tile.prev() == (None if prev_text is None else parse(prev_text)[0])
+
+
+def test_no_tile_stays_out_of_bounds():
+    # 连续查表越过边界之后一直是no_tile
+    assert next_index[next_index[index("8m")]] == no_tile
+    assert prev_index[prev_index[index("2s")]] == no_tile
+    assert next_index[no_tile] == prev_index[no_tile] == no_tile
+
+
+@pytest.mark.parametrize("indicator, dora", [
+    ("1m", "2m"), ("8m", "9m"), ("9m", "1m"),
+    ("4p", "5p"), ("9p", "1p"),
+    ("1s", "2s"), ("9s", "1s"),
+    ("1z", "2z"), ("2z", "3z"), ("3z", "4z"), ("4z", "1z"),
+    ("5z", "6z"), ("6z", "7z"), ("7z", "5z"),
+])
+def test_dora_index(indicator, dora):
+    assert dora_index[index(indicator)] == index(dora)
+
+
+def test_dora_index_is_a_permutation():
+    assert sorted(dora_index) == list(range(34))
@@ -0,0 +1,107 @@
+"""
+牌山的下标范围，配牌、摸牌、岭上牌和宝牌指示牌都应该取自对应的一段
+每一局的牌山只由对局的种子和局的编号决定
+"""
+import random
+
+import pytest
+
+from agents import Greedy, Tsumogiri
+from table import Table
+from wall import Wall, round_seed, generate_walls
+
+
+@pytest.fixture
+def wall():
+    wall = Wall()
+    wall.shuffle(random.Random(0))
+    return wall
+
+
+def ids(tiles):
+    return [tile.id for tile in tiles]
+
+
+def test_shuffle_is_a_permutation(wall):
+    assert sorted(wall.ids) == list(range(136))
+    assert wall.ids != list(range(136))
+    dealt = [tile_id for player_id in range(4) for tile_id in ids(wall.hand(player_id))]
+    assert dealt == wall.ids[:52]
+    assert len(wall) == 70 and wall.n_lingshang() == 4
+
+
+def test_draw_ranges(wall):
+    drawn = [wall.draw().id for _ in range(3)]
+    assert drawn == wall.ids[119:122][::-1] and len(wall) == 67
+    assert ids(wall.dora_indicators()) == wall.ids[127:128]
+    assert ids(wall.inside_dora_indicators()) == wall.ids[122:123]
+
+    assert wall.draw_lingshang().id == wall.ids[135]
+    assert wall.open_dora().id == wall.ids[128]
+    # 开杠之后牌山的最后一张牌移入王牌堆
+    assert len(wall) == 66 and wall.n_lingshang() == 3
+    assert ids(wall.dora_indicators()) == wall.ids[127:129]
+    assert ids(wall.inside_dora_indicators()) == wall.ids[122:124]
+
+    for _ in range(3):
+        wall.draw_lingshang()
+        wall.open_dora()
+    assert wall.n_lingshang() == 0 and wall.n_dora == 5 and len(wall) == 63
+    with pytest.raises(ValueError):
+        wall.open_dora()
+    # 剩下的牌从后往前摸到配牌之前为止
+    rest = [wall.draw().id for _ in range(len(wall))]
+    assert rest == wall.ids[Wall.live_start:Wall.live_start + 63][::-1] and not wall
+
+
+def test_shuffle_resets(wall):
+    wall.draw()
+    wall.draw_lingshang()
+    wall.open_dora()
+    wall.shuffle(random.Random(1))
+    assert len(wall) == 70 and wall.n_lingshang() == 4 and wall.n_dora == 1
+    assert sorted(wall.ids) == list(range(136))
+
+
+def test_load(wall):
+    reversed_ids = list(range(135, -1, -1))
+    wall.draw()
+    wall.load(reversed_ids)
+    assert wall.ids == reversed_ids and len(wall) == 70
+    assert wall.hand(0)[0].id == 135
+    for bad in ([0] * 136, list(range(135)), list(range(1, 137))):
+        with pytest.raises(ValueError):
+            wall.load(bad)
+
+
+def test_round_seed_is_unique():
+    seeds = {round_seed(seed, round_index) for seed in range(20) for round_index in range(16)}
+    assert len(seeds) == 20 * 16
+    assert round_seed(3, 2) == round_seed(3, 2)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 12345])
+def test_generate_walls_is_deterministic(seed):
+    walls = generate_walls(seed, 8)
+    assert walls == generate_walls(seed, 8)
+    assert walls[:3] == generate_walls(seed, 3)
+    assert len(set(walls)) == 8
+    assert all(sorted(wall) == list(range(136)) for wall in walls)
+    assert all(a != b for a, b in zip(walls, generate_walls(seed + 1, 8)))
+    wall = Wall()
+    wall.shuffle(random.Random(round_seed(seed, 5)))
+    assert tuple(wall.ids) == walls[5]
+
+
+def test_generated_walls_match_seeded_game():
+    seed = 9
+    table = Table()
+    seeded = table.play_game([Greedy(table), Greedy(table), Tsumogiri(), Tsumogiri()], "south", seed=seed)
+    results = [(result.kind, result.winner, list(result.deltas)) for result in table.round_results]
+    # 桌子的随机数状态不同，牌山仍然相同
+    table = Table()
+    table.rng.seed(1)
+    walls = generate_walls(seed, len(results))
+    replayed = table.play_game([Greedy(table), Greedy(table), Tsumogiri(), Tsumogiri()], "south", walls=walls)
+    assert replayed == seeded
+    assert [(result.kind, result.winner, list(result.deltas)) for result in table.round_results] == results
@@ -0,0 +1,21 @@
+"""
+测试中使用的手牌写法
+"""
+from tile import Tile
+
+
+def parse(text):
+    """
+    "123m456p789s11z"形式的手牌，0表示红宝牌5
+    """
+    tiles = []
+    digits = []
+    for c in text:
+        if c.isdigit():
+            digits.append(int(c))
+        else:
+            base = "mpsz".index(c) * 9
+            tiles.extend(Tile.from_index(base + 4, 1) if digit == 0 else Tile.from_index(base + digit - 1)
+                         for digit in digits)
+            digits = []
+    return tiles